@@ -4,44 +4,80 @@ Extrae los seguidores de un perfil y analiza la distribución de sus números de
 según la Ley de Benford para detectar comportamientos artificiales o bots.
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+import argparse
 import time
 import csv
 import os
 import math
-from collections import Counter
 from datetime import datetime
 import matplotlib.pyplot as plt
 import matplotlib
 matplotlib.use('Agg')  # Para guardar gráficos sin mostrar ventanas
+from pool_navegadores import NOT_VISITED, visit_profiles_with_pool
+from http_rapido import fill_follower_counts_http
+from cache_seguidores import FollowerCountCache, DEFAULT_CACHE_PATH
+from checkpoint_seguidores import ExtractionJournal
+from limitador import get_rate_limiter, pause
+from cuentas import AccountPool
+from captura_red import enable_network_capture, NetworkCapture, get_network_capture
+from sesion_navegador import create_chrome, restore_session, save_session
+from grabacion import start_session, stop_session, wrap_driver
+from navegador_ligero import apply_lean_options, enable_request_blocking, get_page_stats
+from motor_benford import benford_tests, print_tests_summary
+from benford_secuencial import BenfordAccumulator
+from valores_criticos import get_critical_values, verdict_for_p_value
+from bootstrap_benford import BOOTSTRAP_CONFIDENCE, bootstrap_benford
+from metricas import start_run, finish_run, get_metrics, timed, count_strategy
 
-def setup_driver():
-    """Configura el navegador Chrome"""
+def setup_driver(capture_network=False, lean=False):
+    """Configura el navegador Chrome.
+
+    capture_network=True captura los JSON que descarga la página (ver captura_red.py)
+    lean=True usa el modo ligero: sin ventana, carga 'eager' y sin imágenes,
+    vídeo, fuentes ni analítica (ver navegador_ligero.py)
+    Con una grabación o reproducción activa el driver va envuelto (ver grabacion.py)
+    """
     chrome_options = Options()
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
     chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
     
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=chrome_options
-    )
+    if capture_network:
+        enable_network_capture(chrome_options)
+    if lean:
+        apply_lean_options(chrome_options)
+    
+    driver = create_chrome(chrome_options)
+    driver.lean = lean
+    if lean:
+        enable_request_blocking(driver)
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    return driver
+    if capture_network:
+        driver.network_capture = NetworkCapture(driver)
+    return wrap_driver(driver)
 
+@timed('login')
 def login_instagram(driver, username, password):
     """Inicia sesión en Instagram"""
+    # Reproducción de una grabación: no hay nada en lo que iniciar sesión
+    if getattr(driver, 'replaying', False):
+        print("✓ Reproduciendo grabación (sin login)\n")
+        return True
+    
+    # Sesión guardada de una ejecución anterior: no hace falta volver a hacer login
+    if restore_session(driver, username):
+        print("✓ Sesión restaurada (sin login)\n")
+        return True
+    
     print("🔐 Iniciando sesión en Instagram...")
     driver.get("https://www.instagram.com/accounts/login/")
-    time.sleep(3)
+    pause(3)
     
     try:
         username_input = WebDriverWait(driver, 10).until(
@@ -50,15 +86,15 @@ def login_instagram(driver, username, password):
         password_input = driver.find_element(By.NAME, "password")
         
         username_input.send_keys(username)
-        time.sleep(1)
+        pause(1)
         password_input.send_keys(password)
-        time.sleep(1)
+        pause(1)
         
         login_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
         login_button.click()
         
         print("⏳ Esperando confirmación de login...")
-        time.sleep(8)
+        pause(8)
         
         # Manejar popups
         try:
@@ -66,7 +102,7 @@ def login_instagram(driver, username, password):
                 EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Ahora no') or contains(text(), 'Not now')]"))
             )
             not_now.click()
-            time.sleep(2)
+            pause(2)
         except:
             pass
         
@@ -75,10 +111,11 @@ def login_instagram(driver, username, password):
                 EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Ahora no') or contains(text(), 'Not now')]"))
             )
             not_now.click()
-            time.sleep(2)
+            pause(2)
         except:
             pass
         
+        save_session(driver, username)
         print("✓ Login exitoso\n")
         return True
         
@@ -114,7 +151,7 @@ def get_profile_followers_count(driver, profile_username):
     print(f"📊 Obteniendo información de @{profile_username}...")
     
     driver.get(f"https://www.instagram.com/{profile_username}/")
-    time.sleep(4)
+    pause(4)
     
     try:
         # Buscar el elemento que contiene "seguidores" o "followers"
@@ -165,7 +202,14 @@ def get_follower_count_from_profile(driver, username):
         try:
             WebDriverWait(driver, 8).until(EC.presence_of_element_located((By.TAG_NAME, 'header')))
         except:
-            time.sleep(2)
+            pause(2)
+
+        # Estrategia 0: JSON capturado de la red (número exacto, sin leer el DOM)
+        capture = get_network_capture(driver)
+        if capture:
+            count = capture.follower_count(username)
+            if count is not None:
+                return count_strategy('red', count)
 
         # Estrategia 1: buscar en el header -> ul > li
         try:
@@ -183,13 +227,13 @@ def get_follower_count_from_profile(driver, username):
                             text = span.get_attribute('title') or span.text
                             num = extract_number_from_text(text)
                             if num > 0:
-                                return num
+                                return count_strategy('header', num)
                         except:
                             # intentar en el li mismo
                             text = li.text
                             num = extract_number_from_text(text)
                             if num > 0:
-                                return num
+                                return count_strategy('header', num)
                 except:
                     # continuar con siguiente li
                     continue
@@ -204,12 +248,12 @@ def get_follower_count_from_profile(driver, username):
                 text = span.get_attribute('title') or span.text
                 num = extract_number_from_text(text)
                 if num > 0:
-                    return num
+                    return count_strategy('enlace_followers', num)
             except:
                 text = el.text
                 num = extract_number_from_text(text)
                 if num > 0:
-                    return num
+                    return count_strategy('enlace_followers', num)
         except:
             pass
 
@@ -221,7 +265,7 @@ def get_follower_count_from_profile(driver, username):
                     text = e.get_attribute('aria-label') or e.get_attribute('title') or e.text
                     num = extract_number_from_text(text)
                     if num > 0:
-                        return num
+                        return count_strategy('aria_title', num)
                 except:
                     continue
         except:
@@ -235,7 +279,7 @@ def get_follower_count_from_profile(driver, username):
                     text = span.get_attribute('title') or span.text
                     num = extract_number_from_text(text)
                     if num > 10:
-                        return num
+                        return count_strategy('spans', num)
                 except:
                     continue
         except:
@@ -244,18 +288,89 @@ def get_follower_count_from_profile(driver, username):
     except Exception:
         pass
 
-    return 0
+    return count_strategy('ninguna', 0)
+
+def fill_follower_counts(driver, followers_data, num_browsers=1, use_http=True, cache=None,
+                         journal=None, accounts=None, stop_confidence=None):
+    """Obtiene el número de seguidores de cada seguidor: checkpoint → caché → HTTP → navegador
+
+    Con stop_confidence (p. ej. 0.95) se dejan de visitar perfiles en cuanto el
+    veredicto de Benford es estable con esa confianza (ver benford_secuencial.py).
+    """
+    print(f"\n🔄 Visitando perfiles para obtener número de seguidores...")
+    
+    pending = followers_data
+    if journal:
+        pending = journal.fill_followers(pending)
+    print(f"   Esto puede tomar {len(pending) * 2 // 60 // max(1, num_browsers)}+ minutos...")
+    
+    # Primero caché y HTTP (sin renderizar); solo lo que falle va al navegador
+    if cache:
+        resolved = cache.fill_followers(pending)
+        if journal:
+            journal.record_resolved(pending, resolved)
+        pending = resolved
+    if use_http:
+        resolved = fill_follower_counts_http(driver, pending, cache=cache)
+        if journal:
+            journal.record_resolved(pending, resolved)
+        pending = resolved
+    
+    # Los conteos ya conocidos (checkpoint, caché, HTTP) cuentan para la regla de parada
+    accumulator = None
+    if stop_confidence:
+        accumulator = BenfordAccumulator(stop_confidence)
+        accumulator.extend(follower['follower_count'] for follower in followers_data)
+        if accumulator.settled:
+            get_metrics().incr('skipped_visits', len(pending), endpoint='profile')
+            pending = []
+    
+    def on_count(username, count):
+        if journal:
+            journal.record_count(username, count)
+        if accumulator:
+            accumulator.add(count)
+    
+    # Pool de navegadores con pausa mínima entre visitas para no parecer bot
+    visit_profiles_with_pool(driver, pending, get_follower_count_from_profile,
+                             lambda: setup_driver(get_network_capture(driver) is not None,
+                                                  getattr(driver, 'lean', False)),
+                             num_browsers, cache=cache, on_count=on_count,
+                             accounts=accounts, login_fn=login_instagram,
+                             stop=(lambda: accumulator.settled) if accumulator else None)
+    
+    if accumulator and accumulator.settled:
+        low, high = accumulator.interval
+        print(f"⏹ Veredicto estable con {accumulator.total} números ({stop_confidence:.0%} de confianza): "
+              f"{accumulator.verdict} (desviación entre {low:.2%} y {high:.2%})")
+    
+    return followers_data
 
-def extract_followers_data(driver, profile_username, max_followers=100):
+def extract_followers_data(driver, profile_username, max_followers=100, num_browsers=1,
+                           use_http=True, cache=None, journal=None, accounts=None,
+                           stop_confidence=None):
     """
-    Extrae la lista de seguidores y el número de seguidores de cada uno
+    Extrae la lista de seguidores y el número de seguidores de cada uno.
+    num_browsers > 1 visita los perfiles con varios navegadores en paralelo.
+    Con un journal (ExtractionJournal) cada avance queda anotado y se puede reanudar.
+    Con accounts (AccountPool) las visitas a perfiles se reparten entre varias cuentas.
+    Con stop_confidence se dejan de visitar perfiles cuando el veredicto ya es estable.
     """
     print(f"👥 Extrayendo datos de seguidores de @{profile_username}...")
     print(f"   Límite: {max_followers} seguidores\n")
     
+    # Reanudación: la lista ya estaba completa, solo quedan perfiles por visitar
+    if journal and journal.harvest_complete:
+        followers_data = [{'follower_username': username, 'follower_count': 0}
+                          for username in journal.final_usernames]
+        fill_follower_counts(driver, followers_data, num_browsers, use_http, cache, journal, accounts,
+                             stop_confidence)
+        print(f"\n✓ Datos de seguidores completados\n")
+        return followers_data
+    
     # Ir al perfil
     driver.get(f"https://www.instagram.com/{profile_username}/")
-    time.sleep(4)
+    pause(4)
     
     try:
         # Buscar y hacer click en el enlace de "seguidores"
@@ -316,7 +431,7 @@ def extract_followers_data(driver, profile_username, max_followers=100):
         
         print("✓ Abriendo lista de seguidores...")
         followers_button.click()
-        time.sleep(6)
+        pause(6)
         
         # Esperar a que cargue el diálogo de seguidores
         followers_dialog = WebDriverWait(driver, 10).until(
@@ -327,8 +442,14 @@ def extract_followers_data(driver, profile_username, max_followers=100):
         print("📜 Scrolleando para cargar seguidores...\n")
         
         # Scroll dentro del diálogo para cargar más seguidores
+        # (al reanudar se parte de los usernames ya anotados en el checkpoint)
         followers_data = []
         seen_usernames = set()
+        metrics = get_metrics()
+        if journal:
+            for username in journal.harvested[:max_followers]:
+                seen_usernames.add(username)
+                followers_data.append({'follower_username': username, 'follower_count': 0})
         scroll_attempts = 0
         max_scroll_attempts = 100  # Aumentado para permitir más scrolls
         
@@ -376,8 +497,22 @@ def extract_followers_data(driver, profile_username, max_followers=100):
             
             # Buscar elementos de seguidores en el diálogo
             try:
+                # Usernames que llegaron en los JSON de la lista (si hay captura de red)
+                capture = get_network_capture(driver)
+                if capture:
+                    capture.drain()
+                    for username in capture.follower_usernames:
+                        if len(followers_data) >= max_followers:
+                            break
+                        if username not in seen_usernames:
+                            seen_usernames.add(username)
+                            followers_data.append({'follower_username': username, 'follower_count': 0})
+                            if journal:
+                                journal.record_username(username)
+                
                 # NUEVA ESTRATEGIA: Buscar directamente todos los enlaces dentro del diálogo
                 # y filtrar solo los que apuntan a perfiles de usuario
+                parse_started = time.perf_counter()
                 all_links = followers_dialog.find_elements(By.TAG_NAME, "a")
                 
                 # Filtrar enlaces que son perfiles de usuario
@@ -436,14 +571,18 @@ def extract_followers_data(driver, profile_username, max_followers=100):
                             'follower_username': username,
                             'follower_count': 0  # Lo obtendremos después visitando el perfil
                         })
+                        if journal:
+                            journal.record_username(username)
                         
                         if len(followers_data) % 10 == 0:
                             print(f"  ✓ Extraídos {len(followers_data)}/{max_followers} seguidores...")
                         
                     except Exception as e:
                         continue
+                metrics.observe('phase_seconds', time.perf_counter() - parse_started, phase='username_parse')
                 
                 # Hacer scroll hacia abajo
+                scroll_started = time.perf_counter()
                 try:
                     driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scrollable_div)
                 except:
@@ -453,33 +592,26 @@ def extract_followers_data(driver, profile_username, max_followers=100):
                 # Esperar a que carguen nuevos seguidores
                 # Usar tiempo variable: menos tiempo si ya hay muchos extraídos
                 if len(followers_data) < 20:
-                    time.sleep(2.5)  # Más tiempo al inicio
+                    pause(2.5)  # Más tiempo al inicio
                 else:
-                    time.sleep(1.5)  # Menos tiempo después
+                    pause(1.5)  # Menos tiempo después
+                metrics.observe('phase_seconds', time.perf_counter() - scroll_started, phase='dialog_scroll')
                 
             except Exception as e:
                 print(f"  ⚠ Error en iteración: {e}")
-                time.sleep(2)
+                pause(2)
                 continue
         
         print(f"\n✓ Total de usernames extraídos: {len(followers_data)}")
+        metrics.incr('followers_harvested', len(followers_data))
         
         # Ahora visitar cada perfil para obtener el número de seguidores
         if len(followers_data) > 0:
-            print(f"\n🔄 Visitando perfiles para obtener número de seguidores...")
-            print(f"   Esto puede tomar {len(followers_data) * 2 // 60}+ minutos...\n")
+            if journal:
+                journal.record_harvest_complete(f['follower_username'] for f in followers_data)
             
-            for idx, follower in enumerate(followers_data, 1):
-                username = follower['follower_username']
-                print(f"  [{idx}/{len(followers_data)}] Visitando @{username}...", end=" ")
-                
-                follower_count = get_follower_count_from_profile(driver, username)
-                follower['follower_count'] = follower_count
-                
-                print(f"{follower_count:,} seguidores")
-                
-                # Pequeña pausa para no parecer bot
-                time.sleep(1.5)
+            fill_follower_counts(driver, followers_data, num_browsers, use_http, cache, journal, accounts,
+                                 stop_confidence)
             
             print(f"\n✓ Datos de seguidores completados\n")
         
@@ -522,37 +654,28 @@ def benford_expected_distribution():
     """Retorna la distribución esperada según la Ley de Benford"""
     return {i: math.log10(1 + 1/i) * 100 for i in range(1, 10)}
 
+@timed('analysis')
 def analyze_first_digits(followers_data):
     """Analiza la distribución del primer dígito"""
     print("="*70)
     print("📊 ANÁLISIS DE LEY DE BENFORD - PRIMER DÍGITO")
     print("="*70 + "\n")
     
-    # Extraer primeros dígitos
-    first_digits = []
-    for follower in followers_data:
-        count = follower['follower_count']
-        if count > 0:
-            digit = get_first_digit(count)
-            if digit:
-                first_digits.append(digit)
+    # Primer, segundo, dos primeros y dos últimos dígitos de una vez (motor_benford)
+    tests = benford_tests([follower['follower_count'] or 0 for follower in followers_data])
+    first = tests['first']
     
-    if not first_digits:
+    if not first['total']:
         print("❌ No hay datos suficientes para analizar")
         return None
     
-    print(f"✓ Total de números válidos para análisis: {len(first_digits)}\n")
+    total = first['total']
+    print(f"✓ Total de números válidos para análisis: {total}\n")
     
-    # Contar frecuencias
-    digit_counts = Counter(first_digits)
-    total = len(first_digits)
+    digit_counts = {int(d): int(c) for d, c in zip(first['digits'], first['counts']) if c}
     
-    # Calcular distribución observada (porcentajes)
-    observed_dist = {}
-    for digit in range(1, 10):
-        count = digit_counts.get(digit, 0)
-        percentage = (count / total) * 100
-        observed_dist[digit] = percentage
+    # Distribución observada (porcentajes)
+    observed_dist = {int(d): float(p) * 100 for d, p in zip(first['digits'], first['observed'])}
     
     # Distribución esperada (Benford)
     expected_dist = benford_expected_distribution()
@@ -573,52 +696,65 @@ def analyze_first_digits(followers_data):
     
     avg_deviation = total_deviation / 9
     
+    # Intervalos de confianza bootstrap (réplicas del histograma, todas a la vez)
+    bootstrap = bootstrap_benford(first['counts'])
+    deviation_low, deviation_high = (float(value) * 100 for value in bootstrap['mad'])
+    
     print("-"*70)
-    print(f"Desviación promedio: {avg_deviation:.2f}%")
+    print(f"Desviación promedio: {avg_deviation:.2f}% "
+          f"(IC {BOOTSTRAP_CONFIDENCE:.0%}: {deviation_low:.2f}% - {deviation_high:.2f}%)")
     print("-"*70 + "\n")
     
-    # Calcular Chi-cuadrado
-    chi_squared = 0
-    for digit in range(1, 10):
-        expected_count = (expected_dist[digit] / 100) * total
-        observed_count = digit_counts.get(digit, 0)
-        if expected_count > 0:
-            chi_squared += ((observed_count - expected_count) ** 2) / expected_count
+    # Chi-cuadrado y resto de pruebas (segundo dígito, dos primeros, dos últimos)
+    chi_squared = first['chi_squared']
+    
+    # p-valores con el tamaño de muestra real (tabla Monte Carlo de valores_criticos.py)
+    critical_values = get_critical_values()
+    critical_values.add_p_values(tests)
+    p_value = first['mad_p_value']
+    
+    print_tests_summary(tests)
+    print(f"\nMAD crítica con n={total}: {critical_values.critical_value('first', 'mad', total, 0.05):.2%} (p=0.05), "
+          f"{critical_values.critical_value('first', 'mad', total, 0.01):.2%} (p=0.01)")
+    print(f"p-valor de la desviación: {p_value:.3f} (probabilidad de una desviación así o mayor con seguidores orgánicos)\n")
     
     # Interpretación
     print("📊 INTERPRETACIÓN:\n")
     
-    if avg_deviation < 5:
+    verdict = verdict_for_p_value(p_value)
+    if verdict == "REAL":
         print("✅ Distribución MUY CERCANA a la Ley de Benford")
         print("   → Los seguidores parecen ser REALES y ORGÁNICOS\n")
-        verdict = "REAL"
-    elif avg_deviation < 10:
+    elif verdict == "PROBABLEMENTE REAL":
         print("✅ Distribución CERCANA a la Ley de Benford")
         print("   → Los seguidores probablemente son REALES\n")
-        verdict = "PROBABLEMENTE REAL"
-    elif avg_deviation < 15:
+    elif verdict == "SOSPECHOSO":
         print("⚠️  Distribución MODERADAMENTE DESVIADA de Benford")
         print("   → Posible mezcla de seguidores reales y artificiales\n")
-        verdict = "SOSPECHOSO"
     else:
         print("🚨 Distribución MUY DESVIADA de la Ley de Benford")
         print("   → Alta probabilidad de seguidores FALSOS o BOTS\n")
-        verdict = "ALTA PROBABILIDAD DE BOTS"
     
     print(f"🎯 CONCLUSIÓN: {verdict}")
     print("="*70 + "\n")
     
     return {
-        'first_digits': first_digits,
         'digit_counts': dict(digit_counts),
         'observed_dist': observed_dist,
         'expected_dist': expected_dist,
         'avg_deviation': avg_deviation,
+        'avg_deviation_interval': (deviation_low, deviation_high),
         'chi_squared': chi_squared,
+        'chi_squared_interval': tuple(float(value) for value in bootstrap['chi_squared']),
+        'p_value': p_value,
+        'chi_squared_p_value': first['chi_squared_p_value'],
         'verdict': verdict,
-        'total_analyzed': total
+        'total_analyzed': total,
+        'tests': tests,
+        'bootstrap': bootstrap
     }
 
+@timed('chart')
 def create_benford_chart(analysis, profile_name):
     """Crea un gráfico comparando la distribución observada vs esperada"""
     print("📊 Generando gráfico comparativo...")
@@ -638,9 +774,17 @@ def create_benford_chart(analysis, profile_name):
     bar_width = 0.35
     x_pos = range(len(digits))
     
+    # Barras de error: intervalo bootstrap de la frecuencia de cada dígito
+    bootstrap = analysis.get('bootstrap')
+    errors = None
+    if bootstrap:
+        errors = [[max(obs - low * 100, 0) for obs, low in zip(observed, bootstrap['observed_low'])],
+                  [max(high * 100 - obs, 0) for obs, high in zip(observed, bootstrap['observed_high'])]]
+    
     # Crear barras
     bars1 = plt.bar([x - bar_width/2 for x in x_pos], observed, bar_width, 
-                     label='Distribución Observada', color='#FF6B6B', alpha=0.8)
+                     label='Distribución Observada' + (f" (IC {BOOTSTRAP_CONFIDENCE:.0%})" if errors else ""),
+                     color='#FF6B6B', alpha=0.8, yerr=errors, capsize=4, ecolor='#8B1A1A')
     bars2 = plt.bar([x + bar_width/2 for x in x_pos], expected, bar_width,
                      label='Ley de Benford (Esperada)', color='#4ECDC4', alpha=0.8)
     
@@ -648,7 +792,8 @@ def create_benford_chart(analysis, profile_name):
     plt.xlabel('Primer Dígito', fontsize=12, fontweight='bold')
     plt.ylabel('Frecuencia (%)', fontsize=12, fontweight='bold')
     plt.title(f'Análisis de Ley de Benford - @{profile_name}\n' + 
-              f'Desviación Promedio: {analysis["avg_deviation"]:.2f}% | Conclusión: {analysis["verdict"]}',
+              f'Desviación Promedio: {analysis["avg_deviation"]:.2f}% (p={analysis["p_value"]:.3f}) | '
+              f'Conclusión: {analysis["verdict"]}',
               fontsize=14, fontweight='bold', pad=20)
     
     plt.xticks(x_pos, digits)
@@ -689,6 +834,9 @@ def save_results_to_csv(profile_name, profile_followers, followers_data, analysi
         for follower in followers_data:
             username = follower['follower_username']
             count = follower['follower_count']
+            if count is None:  # no se pudo visitar (todas las cuentas aparcadas)
+                writer.writerow([username, NOT_VISITED, "N/A"])
+                continue
             first_digit = get_first_digit(count) if count > 0 else "N/A"
             writer.writerow([username, count, first_digit])
     
@@ -706,18 +854,27 @@ def save_results_to_csv(profile_name, profile_followers, followers_data, analysi
             writer.writerow(["Seguidores analizados:", len(followers_data)])
             writer.writerow(["Números válidos analizados:", analysis['total_analyzed']])
             writer.writerow([])
-            writer.writerow(["Dígito", "Cantidad", "Frecuencia Observada (%)", "Frecuencia Esperada (%)", "Desviación (%)"])
+            writer.writerow(["Dígito", "Cantidad", "Frecuencia Observada (%)", "Frecuencia Esperada (%)", "Desviación (%)",
+                             "IC bajo (%)", "IC alto (%)"])
             
             for digit in range(1, 10):
                 count = analysis['digit_counts'].get(digit, 0)
                 obs = analysis['observed_dist'][digit]
                 exp = analysis['expected_dist'][digit]
                 dev = abs(obs - exp)
-                writer.writerow([digit, count, f"{obs:.2f}", f"{exp:.2f}", f"{dev:.2f}"])
+                low = analysis['bootstrap']['observed_low'][digit - 1] * 100
+                high = analysis['bootstrap']['observed_high'][digit - 1] * 100
+                writer.writerow([digit, count, f"{obs:.2f}", f"{exp:.2f}", f"{dev:.2f}", f"{low:.2f}", f"{high:.2f}"])
             
             writer.writerow([])
             writer.writerow(["Desviación Promedio:", f"{analysis['avg_deviation']:.2f}%"])
+            writer.writerow([f"IC {BOOTSTRAP_CONFIDENCE:.0%} desviación (bootstrap):",
+                             "{:.2f}% - {:.2f}%".format(*analysis['avg_deviation_interval'])])
             writer.writerow(["Chi-cuadrado:", f"{analysis['chi_squared']:.4f}"])
+            writer.writerow([f"IC {BOOTSTRAP_CONFIDENCE:.0%} chi-cuadrado (bootstrap):",
+                             "{:.4f} - {:.4f}".format(*analysis['chi_squared_interval'])])
+            writer.writerow(["p-valor (desviación):", f"{analysis['p_value']:.4f}"])
+            writer.writerow(["p-valor (chi-cuadrado):", f"{analysis['chi_squared_p_value']:.4f}"])
             writer.writerow(["Conclusión:", analysis['verdict']])
         
         print(f"✓ Análisis de distribución: {distribution_filename}")
@@ -738,14 +895,19 @@ def save_results_to_csv(profile_name, profile_followers, followers_data, analysi
             writer.writerow(["=== RESULTADOS DEL ANÁLISIS DE BENFORD ==="])
             writer.writerow(["Números válidos analizados:", analysis['total_analyzed']])
             writer.writerow(["Desviación promedio:", f"{analysis['avg_deviation']:.2f}%"])
+            writer.writerow([f"IC {BOOTSTRAP_CONFIDENCE:.0%} desviación (bootstrap):",
+                             "{:.2f}% - {:.2f}%".format(*analysis['avg_deviation_interval'])])
             writer.writerow(["Valor Chi-cuadrado:", f"{analysis['chi_squared']:.4f}"])
+            writer.writerow([f"IC {BOOTSTRAP_CONFIDENCE:.0%} chi-cuadrado (bootstrap):",
+                             "{:.4f} - {:.4f}".format(*analysis['chi_squared_interval'])])
+            writer.writerow(["p-valor de la desviación:", f"{analysis['p_value']:.4f}"])
             writer.writerow([])
             writer.writerow(["🎯 CONCLUSIÓN:", analysis['verdict']])
             writer.writerow([])
             
-            if analysis['avg_deviation'] < 10:
+            if analysis['verdict'] in ("REAL", "PROBABLEMENTE REAL"):
                 writer.writerow(["Interpretación:", "Los seguidores parecen ser REALES y ORGÁNICOS"])
-            elif analysis['avg_deviation'] < 15:
+            elif analysis['verdict'] == "SOSPECHOSO":
                 writer.writerow(["Interpretación:", "Posible mezcla de seguidores reales y artificiales"])
             else:
                 writer.writerow(["Interpretación:", "Alta probabilidad de seguidores FALSOS o BOTS"])
@@ -753,76 +915,139 @@ def save_results_to_csv(profile_name, profile_followers, followers_data, analysi
     print(f"✓ Resumen ejecutivo: {summary_filename}")
     print()
 
-def main():
-    """Función principal"""
-    # CONFIGURACIÓN
-    INSTAGRAM_USERNAME = ""
-    INSTAGRAM_PASSWORD = ""  # ⚠️ Cambia esto
-    PROFILE_TO_ANALYZE = ""
-    MAX_FOLLOWERS = 100  # Cuántos seguidores analizar (más = más tiempo)
-    
-    if INSTAGRAM_PASSWORD == "TU_CONTRASEÑA_AQUI":
-        print("❌ ERROR: Configura tu contraseña")
-        return
-    
+def run_profile(profile, username="", password="", max_followers=100, num_browsers=1, use_http=True,
+                capture_network=False, lean=False, resume=False, cache_ttl_hours=24 * 7,
+                cache_max_entries=100000, accounts_file="cuentas.json", profile_interval=1.5,
+                record_mode=None, metrics_textfile=None, stop_confidence=None):
+    """Analiza los seguidores de un perfil y devuelve el resumen del análisis.
+
+    Lanza RuntimeError si no se puede iniciar sesión o no se extraen seguidores,
+    para que quien la llame (main o el ejecutor por lotes, lotes.py) decida si reintentar.
+    """
+    start_session(record_mode, profile)
+    start_run(profile, 'seguidores_benford')
     driver = None
+    limiter = get_rate_limiter()
+    limiter.configure('profile', rate=1 / profile_interval)
+    accounts = AccountPool.from_file(accounts_file)
+    if accounts:
+        accounts.configure('profile', rate=1 / profile_interval)
+    # Al grabar o reproducir, caché vacía en memoria: todas las visitas pasan por el archivo
+    cache = FollowerCountCache(":memory:" if record_mode else DEFAULT_CACHE_PATH,
+                               ttl_hours=cache_ttl_hours, max_entries=cache_max_entries)
+    journal = ExtractionJournal(profile, resume=resume)
     
     try:
         print("="*70)
         print("🔍 ANÁLISIS DE SEGUIDORES - LEY DE BENFORD")
         print("="*70)
-        print(f"Perfil a analizar: @{PROFILE_TO_ANALYZE}")
-        print(f"Máximo de seguidores a analizar: {MAX_FOLLOWERS}")
+        print(f"Perfil a analizar: @{profile}")
+        print(f"Máximo de seguidores a analizar: {max_followers}")
         print("="*70 + "\n")
         
         # Iniciar navegador
         print("🌐 Iniciando navegador Chrome...")
-        driver = setup_driver()
+        started_at = time.time()
+        driver = setup_driver(capture_network, lean)
         
         # Login
-        if not login_instagram(driver, INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD):
-            print("❌ No se pudo iniciar sesión")
-            return
+        if accounts:
+            logged_in = accounts.login_main(driver, login_instagram)
+        else:
+            logged_in = login_instagram(driver, username, password)
+        if not logged_in:
+            raise RuntimeError("No se pudo iniciar sesión")
+        print(f"⏱ Navegador listo y sesión iniciada en {time.time() - started_at:.1f}s\n")
         
         # Obtener número de seguidores del perfil principal
-        profile_followers = get_profile_followers_count(driver, PROFILE_TO_ANALYZE)
+        profile_followers = get_profile_followers_count(driver, profile)
         
         # Extraer datos de seguidores
-        followers_data = extract_followers_data(driver, PROFILE_TO_ANALYZE, MAX_FOLLOWERS)
+        followers_data = extract_followers_data(driver, profile, max_followers, num_browsers,
+                                                use_http, cache, journal, accounts, stop_confidence)
         
         if not followers_data:
-            print("❌ No se extrajeron datos de seguidores")
-            return
+            raise RuntimeError("No se extrajeron datos de seguidores")
         
         # Analizar con Benford
         analysis = analyze_first_digits(followers_data)
         
         # Crear gráfico
-        create_benford_chart(analysis, PROFILE_TO_ANALYZE)
+        create_benford_chart(analysis, profile)
         
         # Guardar CSVs
-        save_results_to_csv(PROFILE_TO_ANALYZE, profile_followers, followers_data, analysis)
+        save_results_to_csv(profile, profile_followers, followers_data, analysis)
         
         print("="*70)
         print("✅ ¡ANÁLISIS COMPLETADO EXITOSAMENTE!")
         print("="*70)
         print("\nArchivos generados:")
-        print(f"  📄 {PROFILE_TO_ANALYZE}_seguidores_datos.csv")
-        print(f"  📊 {PROFILE_TO_ANALYZE}_distribucion_benford.csv")
-        print(f"  📝 {PROFILE_TO_ANALYZE}_resumen.csv")
-        print(f"  📈 {PROFILE_TO_ANALYZE}_benford_chart.png")
+        print(f"  📄 {profile}_seguidores_datos.csv")
+        print(f"  📊 {profile}_distribucion_benford.csv")
+        print(f"  📝 {profile}_resumen.csv")
+        print(f"  📈 {profile}_benford_chart.png")
         print()
         
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+        return {
+            'profile_followers': profile_followers,
+            'followers_analyzed': len(followers_data),
+            'avg_deviation': analysis['avg_deviation'] if analysis else None,
+            'chi_squared': analysis['chi_squared'] if analysis else None,
+            'verdict': analysis['verdict'] if analysis else None,
+        }
         
     finally:
+        cache.print_stats()
+        limiter.print_stats()
+        get_page_stats().print_summary(lean)
+        if accounts:
+            accounts.print_stats()
+        cache.close()
+        journal.close()
+        
         if driver:
             print("🔒 Cerrando navegador...")
-            time.sleep(2)
+            pause(2)
             driver.quit()
+        stop_session()
+        finish_run(metrics_textfile)
+
+def main(resume=False):
+    """Función principal. Con resume=True se retoma la última ejecución interrumpida"""
+    # CONFIGURACIÓN
+    INSTAGRAM_USERNAME = ""
+    INSTAGRAM_PASSWORD = ""  # ⚠️ Cambia esto
+    PROFILE_TO_ANALYZE = ""
+    MAX_FOLLOWERS = 100  # Cuántos seguidores analizar (más = más tiempo)
+    NUM_BROWSERS = 1  # Navegadores en paralelo para visitar perfiles
+    USE_HTTP_FAST_PATH = True  # Intentar primero por HTTP, sin renderizar la página
+    CAPTURE_NETWORK = False  # Leer los JSON de la página (logs de rendimiento de Chrome)
+    LEAN_MODE = False  # Chrome sin ventana, sin imágenes/vídeo/fuentes (más rápido)
+    CACHE_TTL_HOURS = 24 * 7  # Validez de los datos guardados en caché
+    CACHE_MAX_ENTRIES = 100000  # Máximo de usernames en caché (se eliminan los menos usados)
+    ACCOUNTS_FILE = "cuentas.json"  # Si existe, se reparten las visitas entre sus cuentas
+    PROFILE_INTERVAL = 1.5  # Segundos entre visitas a perfiles (el limitador los alarga si hay bloqueos)
+    RECORD_MODE = None  # 'grabar' o 'reproducir': ejecución sin conexión (ver grabacion.py)
+    METRICS_TEXTFILE = None  # Ruta .prom para el textfile collector de Prometheus (ver metricas.py)
+    STOP_CONFIDENCE = None  # p. ej. 0.95: dejar de visitar perfiles cuando el veredicto ya es estable
+    
+    if INSTAGRAM_PASSWORD == "TU_CONTRASEÑA_AQUI":
+        print("❌ ERROR: Configura tu contraseña")
+        return
+    
+    try:
+        run_profile(PROFILE_TO_ANALYZE, INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD, MAX_FOLLOWERS, NUM_BROWSERS,
+                    USE_HTTP_FAST_PATH, CAPTURE_NETWORK, LEAN_MODE, resume, CACHE_TTL_HOURS,
+                    CACHE_MAX_ENTRIES, ACCOUNTS_FILE, PROFILE_INTERVAL, RECORD_MODE, METRICS_TEXTFILE,
+                    STOP_CONFIDENCE)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--resume', action='store_true',
+                        help='Reanudar desde el checkpoint de la última ejecución interrumpida')
+    args = parser.parse_args()
+    main(resume=args.resume)
@@ -0,0 +1,221 @@
+"""
+Benchmarks de las rutas calientes de parseo y análisis
+Mide extract_number_from_text, extract_usernames_with_beautifulsoup,
+analyze_first_digits, analyze_benford y create_benford_chart sobre fixtures
+de tamaño creciente (100, 10k y 1M seguidores; 50, 500 y 5k posts), y el motor
+vectorizado benford_tests con 1M y 10M de conteos generados. Para cada
+función y tamaño da el mejor tiempo, el rendimiento (elementos/s) y el pico
+de memoria (tracemalloc), y guarda todo en benchmarks/resultados/ como JSON
+junto con el commit, para comparar entre versiones. Antes comprueba que
+parse_follower_count_from_html lee el contador del perfil en las páginas cuyo
+JSON embebido trae también a otros usuarios.
+
+El HTML del diálogo con 1M de filas ocupa cientos de MB y BeautifulSoup tarda
+minutos en él, así que por defecto el parser de HTML se mide hasta 10k filas
+(--html-max para cambiarlo).
+
+Uso:
+    python benchmarks/bench_analisis.py [--repeat 3] [--html-max 10000] [--comparar benchmarks/resultados/anterior.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generar_fixtures import (FIXTURES_DIR, count_texts, dialog_html, ensure_followers_fixtures,
+                              ensure_posts_fixtures, ensure_profile_fixtures, read_followers_csv,
+                              read_posts_csv)
+from http_rapido import parse_follower_count_from_html
+from motor_benford import benford_tests
+from valores_criticos import get_critical_values
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados")
+FOLLOWER_SIZES = (100, 10000, 1000000)
+POST_SIZES = (50, 500, 5000)
+ENGINE_SIZES = (1000000, 10000000)
+
+
+def measure(fn, repeat):
+    """Mejor tiempo (s) de 'repeat' ejecuciones y pico de memoria (bytes) de una más"""
+    best = float('inf')
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+
+    # Aparte: tracemalloc ralentiza la ejecución y falsearía el tiempo
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def dialog_fixture(n_rows):
+    """HTML del diálogo con n_rows filas (se guarda en fixtures/ la primera vez)"""
+    path = os.path.join(FIXTURES_DIR, f"dialogo_{n_rows}.html")
+    if not os.path.exists(path):
+        os.makedirs(FIXTURES_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(dialog_html(n_rows, seed=n_rows))
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def check_profile_fixtures():
+    """Comprueba que el camino HTTP lee los seguidores del perfil y no los de otro usuario embebido"""
+    ok = True
+    for path, username, expected in ensure_profile_fixtures():
+        with open(path, encoding="utf-8") as f:
+            found = parse_follower_count_from_html(f.read(), username)
+        if found == expected:
+            print(f"✓ @{username}: {found:,} seguidores ({os.path.basename(path)})")
+        else:
+            print(f"❌ @{username}: se leyó {found} en vez de {expected:,} ({os.path.basename(path)})")
+            ok = False
+    return ok
+
+
+def build_cases(bs_script, benford_posts, html_max):
+    """Lista de (función, tamaño, elementos, callable) a medir"""
+    cases = []
+    followers_paths = ensure_followers_fixtures(FOLLOWER_SIZES)
+    posts_paths = ensure_posts_fixtures(POST_SIZES)
+
+    for n in FOLLOWER_SIZES:
+        texts = count_texts(n, seed=n)
+        cases.append(('extract_number_from_text', n, n,
+                      lambda texts=texts: [bs_script.extract_number_from_text(t) for t in texts]))
+
+    for n in FOLLOWER_SIZES:
+        if n > html_max:
+            continue
+        html = dialog_fixture(n)
+        cases.append(('extract_usernames_with_beautifulsoup', n, n,
+                      lambda html=html: bs_script.extract_usernames_with_beautifulsoup(html)))
+
+    analysis = None
+    for n, path in zip(FOLLOWER_SIZES, followers_paths):
+        followers_data = read_followers_csv(path)
+        cases.append(('analyze_first_digits', n, n,
+                      lambda data=followers_data: bs_script.analyze_first_digits(data)))
+        if analysis is None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                analysis = bs_script.analyze_first_digits(followers_data)
+
+    for n, path in zip(POST_SIZES, posts_paths):
+        posts_data = read_posts_csv(path)
+        cases.append(('analyze_benford', n, n,
+                      lambda data=posts_data: benford_posts.analyze_benford(data, 'likes')))
+
+    # Muestras grandes para el motor: conteos log-uniformes (siguen Benford) directamente en un array
+    for n in ENGINE_SIZES:
+        values = (10 ** np.random.default_rng(n).uniform(0, 7, n)).astype(np.int64)
+        cases.append(('benford_tests', n, n, lambda values=values: benford_tests(values)))
+
+    # El gráfico no depende del número de seguidores: solo las 9 barras
+    cases.append(('create_benford_chart', 1, 1,
+                  lambda: bs_script.create_benford_chart(analysis, 'benchmark')))
+    return cases
+
+
+def print_comparison(results, previous_path):
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)
+    before = {(r['function'], r['size']): r for r in previous['results']}
+    print(f"\nComparación con {os.path.basename(previous_path)} (commit {previous.get('commit')}):")
+    print(f"{'Función':<38} {'Tamaño':>9} {'Tiempo':>9} {'Memoria':>9}")
+    for result in results:
+        old = before.get((result['function'], result['size']))
+        if not old:
+            continue
+        time_ratio = result['seconds'] / old['seconds'] if old['seconds'] else float('nan')
+        mem_ratio = result['peak_bytes'] / old['peak_bytes'] if old['peak_bytes'] else float('nan')
+        flag = "  ⚠" if time_ratio > 1.2 or mem_ratio > 1.2 else ""
+        print(f"{result['function']:<38} {result['size']:>9,} {time_ratio:>8.2f}x {mem_ratio:>8.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por caso (se toma la mejor)')
+    parser.add_argument('--html-max', type=int, default=10000, help='Máximo de filas del HTML del diálogo')
+    parser.add_argument('--comparar', help='JSON de resultados anterior para comparar')
+    parser.add_argument('--salida', help='Ruta del JSON de resultados (por defecto en benchmarks/resultados/)')
+    args = parser.parse_args()
+    # Las rutas son relativas al directorio desde el que se lanza, no al temporal de abajo
+    if args.comparar:
+        args.comparar = os.path.abspath(args.comparar)
+        if not os.path.exists(args.comparar):
+            parser.error(f"no existe el archivo a comparar: {args.comparar}")
+    if args.salida:
+        args.salida = os.path.abspath(args.salida)
+
+    # Los scripts crean carpetas y gráficos en el directorio actual: se trabaja en uno temporal
+    workdir = tempfile.mkdtemp(prefix="bench_analisis_")
+    os.chdir(workdir)
+    import analisis_seguidores_beautifulsoup as bs_script
+    import extraer_benford as benford_posts
+
+    print("Preparando fixtures...")
+    check_profile_fixtures()
+    # La tabla de valores críticos se genera una sola vez: fuera de las mediciones
+    get_critical_values()
+    cases = build_cases(bs_script, benford_posts, args.html_max)
+
+    print(f"\n{'Función':<38} {'Tamaño':>9} {'Tiempo (ms)':>12} {'Elementos/s':>13} {'Pico mem.':>11}")
+    print("-" * 87)
+    results = []
+    for name, size, items, fn in cases:
+        seconds, peak = measure(fn, args.repeat)
+        throughput = items / seconds if seconds else float('inf')
+        results.append({'function': name, 'size': size, 'items': items, 'seconds': seconds,
+                        'items_per_second': throughput, 'peak_bytes': peak})
+        print(f"{name:<38} {size:>9,} {seconds * 1000:>12.2f} {throughput:>13,.0f} {peak / 1024 / 1024:>9.1f} MB")
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    output = args.salida or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d_%H%M%S}_{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Resultados guardados: {output}")
+
+    if args.comparar:
+        print_comparison(results, args.comparar)
+
+
+if __name__ == "__main__":
+    main()
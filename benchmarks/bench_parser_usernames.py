@@ -0,0 +1,72 @@
+"""
+Micro-benchmark del parser de usernames del diálogo de seguidores
+Compara extract_usernames_with_beautifulsoup (árbol completo, 3 pasadas) con
+extract_usernames_fast (solo el diálogo, 1 pasada) sobre los HTML guardados en
+benchmarks/fixtures/. Si no hay fixtures, se generan sintéticos.
+
+Uso:
+    python benchmarks/bench_parser_usernames.py [--repeat 5]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analisis_seguidores_beautifulsoup as bs_script
+from generar_fixtures import FIXTURES_DIR, ensure_dialog_fixtures
+
+
+def best_time(fn, html, repeat):
+    """Mejor tiempo (s) de 'repeat' ejecuciones y el último resultado"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(html)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='Repeticiones por fixture (se toma la mejor)')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html"))) or ensure_dialog_fixtures()
+
+    backends = ['lxml'] + (['selectolax'] if bs_script.SELECTOLAX_AVAILABLE else [])
+    selectolax_available = bs_script.SELECTOLAX_AVAILABLE
+
+    header = f"{'Fixture':<24} {'Tamaño':>11} {'BS4 (ms)':>10}"
+    for backend in backends:
+        header += f" {backend + ' (ms)':>16} {'x':>6}"
+    print(header + f" {'Coincidencia':>13}")
+    print("-" * len(header + " " * 14))
+
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+
+        old_time, _ = best_time(bs_script.extract_usernames_with_beautifulsoup, html, args.repeat)
+        line = f"{os.path.basename(path):<24} {len(html):>11,} {old_time * 1000:>10.1f}"
+
+        new_result = set()
+        for backend in backends:
+            bs_script.SELECTOLAX_AVAILABLE = (backend == 'selectolax')
+            new_time, new_result = best_time(bs_script.extract_usernames_fast, html, args.repeat)
+            line += f" {new_time * 1000:>16.1f} {old_time / new_time:>5.1f}x"
+        bs_script.SELECTOLAX_AVAILABLE = selectolax_available
+
+        # Equivalencia: el parser BS4 aplicado solo al diálogo debe dar el mismo conjunto
+        reference = bs_script.extract_usernames_with_beautifulsoup(bs_script._dialog_fragment(html))
+        union = reference | new_result
+        agreement = len(reference & new_result) / len(union) if union else 1.0
+        print(line + f" {agreement:>12.1%}")
+
+
+if __name__ == "__main__":
+    main()
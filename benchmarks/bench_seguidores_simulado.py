@@ -0,0 +1,65 @@
+"""
+Benchmark de extract_followers_data_improved contra el Instagram simulado
+Arranca benchmarks/servidor_simulado.py en este proceso, dirige Chrome (modo
+ligero) y el camino HTTP hacia él con grabacion.start_simulation() y mide los
+seguidores por minuto de la cosecha del diálogo y de la visita a perfiles,
+sin red ni cuenta de Instagram. Necesita Chrome instalado.
+
+Uso:
+    python benchmarks/bench_seguidores_simulado.py [--seguidores 5000] [--max 1000]
+        [--navegadores 2] [--latencia-ms 50] [--limite-rps 0] [--sin-http]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analisis_seguidores_beautifulsoup as bs_script
+from grabacion import start_simulation, stop_session
+from servidor_simulado import DISTRIBUTIONS, TARGET_PROFILE, MockInstagramServer, SyntheticAccounts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seguidores', type=int, default=5000, help=f'Seguidores de @{TARGET_PROFILE} en el servidor')
+    parser.add_argument('--max', type=int, default=1000, help='max_followers de la extracción')
+    parser.add_argument('--distribucion', default='benford', choices=sorted(DISTRIBUTIONS))
+    parser.add_argument('--navegadores', type=int, default=1, help='Navegadores para visitar perfiles')
+    parser.add_argument('--latencia-ms', type=float, default=50)
+    parser.add_argument('--limite-rps', type=int, default=0)
+    parser.add_argument('--por-pagina', type=int, default=12)
+    parser.add_argument('--sin-http', action='store_true', help='Visitar todos los perfiles con el navegador')
+    parser.add_argument('--aceleracion', type=float, default=100,
+                        help='Factor con el que se acortan las esperas de los scripts y el limitador')
+    args = parser.parse_args()
+
+    accounts = SyntheticAccounts(args.seguidores, args.distribucion)
+    server = MockInstagramServer(accounts, args.latencia_ms, args.limite_rps, args.por_pagina).start()
+    start_simulation(server.base_url, args.aceleracion)
+    print(f"🧪 Instagram simulado en {server.base_url} ({args.seguidores:,} seguidores, "
+          f"latencia {args.latencia_ms:.0f} ms, límite {args.limite_rps or 'ninguno'} rps)\n")
+
+    driver = None
+    try:
+        driver = bs_script.setup_driver(lean=True)
+        started = time.time()
+        followers_data = bs_script.extract_followers_data_improved(
+            driver, TARGET_PROFILE, args.max, args.navegadores, not args.sin_http, cache=None
+        )
+        elapsed = max(time.time() - started, 1e-6)
+        resolved = sum(1 for follower in followers_data if follower['follower_count'] > 0)
+        print(f"\n⏱ Total: {len(followers_data)} seguidores ({resolved} con número) en {elapsed:.1f}s "
+              f"= {len(followers_data) / elapsed * 60:.1f} seguidores/min")
+        server.print_stats()
+    finally:
+        if driver:
+            driver.quit()
+        stop_session()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
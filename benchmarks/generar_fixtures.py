@@ -0,0 +1,206 @@
+"""
+Generador de fixtures sintéticos para los benchmarks
+Crea páginas HTML con el mismo marcado que usa Instagram en el diálogo de
+seguidores (enlaces /username/, spans con el nombre, botón Seguir) rodeadas de
+contenido de relleno, para medir los parsers sin conectarse a Instagram.
+También se pueden copiar aquí páginas reales guardadas con driver.page_source.
+
+Además genera CSV con el mismo formato que escriben los scripts
+(<perfil>_seguidores_datos.csv y <perfil>_datos_raw.csv), listas de textos
+de contadores ("1,234", "1.2K", "46 Me gusta"...) para los benchmarks de análisis
+y páginas de perfil cuyo JSON embebido trae también a otros usuarios (para
+comprobar que el camino HTTP lee el contador del perfil y no el primero que aparece).
+"""
+
+import csv
+import json
+import os
+import random
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# Aparte del resto de HTML: bench_parser_usernames.py toma fixtures/*.html como diálogos
+PROFILES_DIR = os.path.join(FIXTURES_DIR, "perfiles")
+
+# (username, seguidores, [(otro usuario embebido, sus seguidores)]): el perfil sugerido va
+# antes en el JSON, así que el primer "follower_count" de la página es el suyo
+PROFILE_FIXTURES = [
+    ('perfil_dos_usuarios', 1234, [('sugerido_famoso', 987654)]),
+]
+
+ROW_TEMPLATE = (
+    '<div class="x1dm5mii x16mil14"><div class="x9f619"><span class="xjp7ctv">'
+    '<a href="/{u}/" role="link" tabindex="0"><img alt="Foto del perfil de {u}" src="https://cdn/{u}.jpg"></a>'
+    '</span><div class="x1iyjqo2"><div><span class="xt0psk2"><a href="/{u}/" role="link">'
+    '<span class="_ap3a _aaco _aacw" dir="auto">{u}</span></a></span></div>'
+    '<span class="x1lliihq" dir="auto">{name}</span></div>'
+    '<button class="_acan _acap"><div class="_ap3a">Seguir</div></button></div></div>'
+)
+
+FILLER_TEMPLATE = (
+    '<article><div class="_aagu"><a href="/p/{code}/"><div class="_aagv">'
+    '<img alt="Publicación {i}" src="https://cdn/p{i}.jpg"></div></a>'
+    '<section><span class="x193iq5w">{likes} Me gusta</span><span title="{likes}">{likes}</span></section>'
+    '</div></article>'
+)
+
+
+COUNT_TEXT_FORMATS = [
+    lambda n: f"{n:,}",
+    lambda n: f"{n / 1000:.1f}K",
+    lambda n: f"{n / 1000000:.1f}M",
+    lambda n: f"{n} Me gusta",
+    lambda n: f"{n:,} likes",
+    lambda n: str(n),
+]
+
+
+def random_username(rng):
+    alphabet = 'abcdefghijklmnopqrstuvwxyz0123456789._'
+    return ''.join(rng.choice(alphabet) for _ in range(rng.randint(5, 18))).strip('.') or 'user'
+
+
+def dialog_html(n_rows, filler_blocks=2000, seed=0):
+    """Devuelve una página con n_rows filas en el diálogo de seguidores"""
+    rng = random.Random(seed)
+    filler = ''.join(
+        FILLER_TEMPLATE.format(code=f"C{i:08x}", i=i, likes=rng.randint(1, 99999))
+        for i in range(filler_blocks)
+    )
+    rows = ''.join(
+        ROW_TEMPLATE.format(u=f"{random_username(rng)}{i}", name=f"Nombre Apellido {i}")
+        for i in range(n_rows)
+    )
+    return (
+        '<!DOCTYPE html><html><head><meta property="og:description" content="1,234 Followers">'
+        f'</head><body><main>{filler}</main>'
+        f'<div class="x1n2onr6"><div role="dialog" aria-label="Seguidores"><div><div>{rows}</div>'
+        '<div><svg aria-label="Cargando..."></svg></div></div></div></div></body></html>'
+    )
+
+
+def ensure_dialog_fixtures(sizes=(100, 1000, 5000)):
+    """Genera los fixtures de diálogo que falten y devuelve sus rutas"""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    paths = []
+    for n_rows in sizes:
+        path = os.path.join(FIXTURES_DIR, f"dialogo_{n_rows}.html")
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(dialog_html(n_rows, seed=n_rows))
+        paths.append(path)
+    return paths
+
+
+def profile_html(username, followers, others=()):
+    """Página de perfil con el JSON embebido del perfil y de otros usuarios (perfiles sugeridos)"""
+    related = [{'id': str(i), 'username': other, 'full_name': f"Sugerido {i}",
+                'follower_count': count, 'edge_followed_by': {'count': count}}
+               for i, (other, count) in enumerate(others, 1)]
+    user = {
+        'biography': "Perfil de prueba",
+        'edge_followed_by': {'count': followers},
+        'edge_follow': {'count': 321},
+        'edge_related_profiles': {'edges': [{'node': node} for node in related]},
+        'full_name': "Perfil De Prueba",
+        'id': "1000",
+        'username': username,
+    }
+    data = {'require': [['PolarisProfilePage', {'suggested_users': related, 'user': user}]]}
+    return (
+        '<!DOCTYPE html><html><head>'
+        f'<meta property="og:description" content="{followers / 1000:.1f}K Followers, 321 Following, '
+        f'12 Posts - See Instagram photos and videos from Perfil De Prueba (@{username})">'
+        f'<script type="application/json">{json.dumps(data)}</script>'
+        f'</head><body><main><h2>{username}</h2></main></body></html>'
+    )
+
+
+def benford_count(rng, max_exponent=6):
+    """Número log-uniforme entre 1 y 10^max_exponent (su primer dígito sigue Benford)"""
+    return int(10 ** rng.uniform(0, max_exponent))
+
+
+def write_followers_csv(path, n_followers, seed=0):
+    """CSV con el formato de <perfil>_seguidores_datos.csv"""
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Username del Seguidor", "Número de Seguidores", "Primer Dígito"])
+        for i in range(n_followers):
+            count = benford_count(rng)
+            writer.writerow([f"{random_username(rng)}{i}", count, str(count)[0]])
+
+
+def read_followers_csv(path):
+    """Lee un CSV de seguidores como la lista followers_data de los scripts"""
+    with open(path, "r", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader)
+        return [{'follower_username': row[0], 'follower_count': int(row[1])} for row in reader]
+
+
+def write_posts_csv(path, n_posts, seed=0):
+    """CSV con el formato de <perfil>_datos_raw.csv"""
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["post_number", "shortcode", "date_utc", "likes", "comments",
+                         "is_video", "caption_length", "url"])
+        for i in range(1, n_posts + 1):
+            likes = benford_count(rng, 5)
+            code = f"C{i:010x}"
+            writer.writerow([i, code, f"2025-01-{i % 28 + 1:02d}T12:00:00.000Z", likes,
+                             int(likes * rng.uniform(0.005, 0.05)), rng.random() < 0.2,
+                             rng.randint(0, 2200), f"https://www.instagram.com/p/{code}/"])
+
+
+def read_posts_csv(path):
+    """Lee un CSV de posts como la lista posts_data de extraer_benford.py"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [{**row, 'likes': int(row['likes']), 'comments': int(row['comments']),
+                 'caption_length': int(row['caption_length'])} for row in csv.DictReader(f)]
+
+
+def count_texts(n, seed=0):
+    """Textos de contadores como los que devuelve la página (para extract_number_from_text)"""
+    rng = random.Random(seed)
+    return [rng.choice(COUNT_TEXT_FORMATS)(benford_count(rng, 7)) for _ in range(n)]
+
+
+def _ensure(path, write, *args):
+    if not os.path.exists(path):
+        write(path, *args)
+    return path
+
+
+def ensure_followers_fixtures(sizes=(100, 10000, 1000000)):
+    """Genera los CSV de seguidores que falten y devuelve sus rutas"""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    return [_ensure(os.path.join(FIXTURES_DIR, f"seguidores_{n}.csv"), write_followers_csv, n, n)
+            for n in sizes]
+
+
+def ensure_posts_fixtures(sizes=(50, 500, 5000)):
+    """Genera los CSV de posts que falten y devuelve sus rutas"""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    return [_ensure(os.path.join(FIXTURES_DIR, f"posts_{n}.csv"), write_posts_csv, n, n)
+            for n in sizes]
+
+
+def ensure_profile_fixtures():
+    """Genera las páginas de perfil que falten; devuelve [(ruta, username, seguidores del perfil)]"""
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    fixtures = []
+    for username, followers, others in PROFILE_FIXTURES:
+        path = os.path.join(PROFILES_DIR, f"{username}.html")
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(profile_html(username, followers, others))
+        fixtures.append((path, username, followers))
+    return fixtures
+
+
+if __name__ == "__main__":
+    profiles = [path for path, _, _ in ensure_profile_fixtures()]
+    for path in ensure_dialog_fixtures() + ensure_followers_fixtures() + ensure_posts_fixtures() + profiles:
+        print(f"✓ {path} ({os.path.getsize(path):,} bytes)")
@@ -0,0 +1,329 @@
+"""
+Servidor local que imita Instagram para pruebas de carga sin conexión
+Sirve perfiles, el diálogo de seguidores con carga incremental (como la web:
+al llegar al final de la lista se piden más filas a /api/v1/friendships/...)
+y páginas de posts, con el mismo marcado que buscan los scripts:
+a[href*='/followers'] con span[title], meta og:description, header,
+time[datetime], secciones con "Me gusta" y el diálogo div[role='dialog'].
+
+Las cuentas son sintéticas y se generan al vuelo (la lista de seguidores puede
+tener millones sin ocupar memoria): el número de seguidores de cada una sale
+de una distribución elegible ('benford', 'lognormal', 'uniforme', 'bots') y
+es siempre el mismo para la misma semilla. Se puede añadir latencia por
+petición y un límite de peticiones por segundo a partir del cual responde
+429 / "Please wait a few minutes", como Instagram al frenar.
+
+Uso:
+    python benchmarks/servidor_simulado.py [--seguidores 100000] [--distribucion benford]
+        [--latencia-ms 50] [--limite-rps 20] [--puerto 8765]
+
+Para dirigir los scripts al servidor, grabacion.start_simulation(url) (ver
+benchmarks/bench_seguidores_simulado.py).
+"""
+
+import argparse
+import collections
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generar_fixtures import ROW_TEMPLATE
+
+TARGET_PROFILE = "objetivo"
+FOLLOWER_PREFIX = "seg_"
+THROTTLE_TEXT = "Please wait a few minutes before you try again."
+
+DISTRIBUTIONS = {
+    # Log-uniforme entre 1 y 10^6: cumple Benford
+    'benford': lambda rng: int(10 ** rng.uniform(0, 6)),
+    'lognormal': lambda rng: int(rng.lognormvariate(6, 1.8)) + 1,
+    # Uniforme: demasiados 5-9 como primer dígito
+    'uniforme': lambda rng: rng.randint(1, 9999),
+    # Cuentas creadas en serie: casi todas entre 150 y 450 seguidores
+    'bots': lambda rng: max(1, int(rng.gauss(300, 60))),
+}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>{title}</title>
+<meta property="og:description" content="{followers_exact} Followers, {following} Following, {posts} Posts - See Instagram photos and videos from {full_name} (@{username})">
+</head><body><main>
+<header>
+<h2>{username}</h2>
+<ul>
+<li><span>{posts}</span> publicaciones</li>
+<li><a href="/{username}/followers/" role="link"><span title="{followers_exact}">{followers_short}</span> seguidores</a></li>
+<li><a href="/{username}/following/" role="link"><span>{following}</span> seguidos</a></li>
+</ul>
+<section><h1>{full_name}</h1></section>
+</header>
+<div class="posts">{grid}</div>
+</main>{dialog}</body></html>"""
+
+GRID_ITEM_TEMPLATE = '<a href="/p/{code}/" role="link"><div class="_aagv"><img alt="Publicación {i}" src="/static/{code}.jpg"></div></a>'
+
+DIALOG_TEMPLATE = """<div class="x1n2onr6"><div role="dialog" aria-label="Seguidores"><div>
+<div class="x1dm5mii"><h1>Seguidores</h1></div>
+<div id="lista-seguidores" style="height: 420px; overflow-y: auto">{rows}__LOADER__</div>
+</div></div></div>
+<script>
+(function () {
+    const list = document.getElementById('lista-seguidores');
+    const rowTemplate = __ROW_TEMPLATE__;
+    let next = __NEXT__;
+    let loading = false;
+    // Como la web: al acercarse al final se pide la siguiente página de la lista
+    const maybeLoad = () => {
+        const loader = list.querySelector('.loader');
+        if (loading || next === null || !loader) return;
+        if (list.scrollTop + list.clientHeight < list.scrollHeight - 200) return;
+        loading = true;
+        fetch('/api/v1/friendships/__USER__/followers/?count=__COUNT__&max_id=' + next)
+            .then((r) => r.ok ? r.json() : Promise.reject(r.status))
+            .then((data) => {
+                const html = data.users.map((u) =>
+                    rowTemplate.split('{u}').join(u.username).split('{name}').join(u.full_name)).join('');
+                loader.insertAdjacentHTML('beforebegin', html);
+                next = data.next_max_id;
+                if (next === null) loader.remove();
+            })
+            .catch(() => {})  // 429: se reintenta en la siguiente comprobación
+            .finally(() => { loading = false; });
+    };
+    list.addEventListener('scroll', maybeLoad);
+    setInterval(maybeLoad, 250);
+})();
+</script>"""
+
+LOADER_HTML = '<div class="loader"><svg aria-label="Cargando..." height="18" width="18"></svg></div>'
+
+POST_TEMPLATE = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>Publicación de {username}</title></head>
+<body><main><article>
+<header><a href="/{username}/" role="link">{username}</a></header>
+<div>{media}</div>
+<section><a href="/p/{code}/liked_by/" role="link"><span>{likes} Me gusta</span></a></section>
+<div><h1>{caption}</h1></div>
+<ul><li><span>Ver los {comments} comentarios</span></li></ul>
+<time datetime="{date}" title="{date}">{date}</time>
+</article></main></body></html>"""
+
+THROTTLE_PAGE = f"""<!DOCTYPE html><html><body><main><h2>{THROTTLE_TEXT}</h2>
+<p>We restrict certain activity to protect our community.</p></main></body></html>"""
+
+
+def format_short(count):
+    """Número abreviado como lo muestra Instagram en español: 1234 -> '1,2 mil'"""
+    if count >= 1000000:
+        return f"{count / 1000000:.1f}".replace('.', ',') + " M"
+    if count >= 10000:
+        return f"{count // 1000} mil"
+    if count >= 1000:
+        return f"{count / 1000:.1f}".replace('.', ',') + " mil"
+    return str(count)
+
+
+class SyntheticAccounts:
+    """Cuentas sintéticas deterministas: nada se guarda, todo se deriva de la semilla"""
+
+    def __init__(self, followers=1000, distribution='benford', posts=30, seed=0):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Distribución desconocida '{distribution}' (opciones: {', '.join(DISTRIBUTIONS)})")
+        self.followers = followers
+        self.distribution = DISTRIBUTIONS[distribution]
+        self.posts = posts
+        self.seed = seed
+
+    def _rng(self, key):
+        return random.Random(f"{self.seed}:{key}")
+
+    def follower_username(self, index):
+        return f"{FOLLOWER_PREFIX}{index:07d}"
+
+    def follower_count(self, username):
+        if username == TARGET_PROFILE:
+            return self.followers
+        return self.distribution(self._rng(username))
+
+    def page_of_followers(self, start, count):
+        end = min(self.followers, start + count)
+        users = [{'username': self.follower_username(i), 'full_name': f"Seguidor {i}"} for i in range(start, end)]
+        return users, (end if end < self.followers else None)
+
+    def post(self, code):
+        username, _, index = code.rpartition('_')
+        rng = self._rng(code)
+        likes = self.distribution(rng)
+        return {
+            'username': username or TARGET_PROFILE,
+            'likes': likes,
+            'comments': int(likes * rng.uniform(0.005, 0.05)),
+            'is_video': rng.random() < 0.2,
+            'caption': "Publicación sintética " * rng.randint(0, 8),
+            'date': (datetime(2024, 1, 1, tzinfo=timezone.utc)
+                     - timedelta(days=int(index) * 3 if index.isdigit() else 0)).isoformat().replace('+00:00', '.000Z'),
+        }
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    server_version = "InstagramSimulado"
+
+    def do_GET(self):
+        server = self.server
+        server.pause()
+        if server.throttled():
+            if self.path.startswith('/api/'):
+                self._send(429, json.dumps({'message': THROTTLE_TEXT, 'status': 'fail'}), 'application/json')
+            else:
+                self._send(429, THROTTLE_PAGE)
+            return
+
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        accounts = server.accounts
+
+        if not parts:
+            self._send(200, "<!DOCTYPE html><html><body><main><h1>Instagram (simulado)</h1></main></body></html>")
+        elif parts[:3] == ['api', 'v1', 'friendships'] and len(parts) >= 5:
+            query = parse_qs(url.query)
+            start = int(query.get('max_id', ['0'])[0])
+            count = min(int(query.get('count', [str(server.page_size)])[0]), 200)
+            users, next_max_id = accounts.page_of_followers(start, count)
+            server.count('followers_served', len(users))
+            self._send(200, json.dumps({'users': users, 'next_max_id': next_max_id, 'status': 'ok'}),
+                       'application/json')
+        elif parts[0] == 'p' and len(parts) >= 2:
+            self._send(200, self._post_page(parts[1]))
+        elif parts[0] == 'accounts':
+            self._send(200, "<!DOCTYPE html><html><body><form><input name='username'>"
+                            "<input name='password' type='password'><button type='submit'>Entrar</button>"
+                            "</form></body></html>")
+        elif len(parts) == 1 or parts[1] == 'followers':
+            self._send(200, self._profile_page(parts[0], with_dialog=len(parts) > 1))
+        else:
+            self._send(404, "<!DOCTYPE html><html><body>Esta página no está disponible.</body></html>")
+
+    def _profile_page(self, username, with_dialog=False):
+        accounts = self.server.accounts
+        followers = accounts.follower_count(username)
+        posts = accounts.posts if username == TARGET_PROFILE else 12
+        grid = ''.join(GRID_ITEM_TEMPLATE.format(code=f"{username}_{i}", i=i) for i in range(posts))
+        dialog = ''
+        if with_dialog and username == TARGET_PROFILE:
+            users, next_max_id = accounts.page_of_followers(0, self.server.page_size)
+            self.server.count('followers_served', len(users))
+            rows = ''.join(ROW_TEMPLATE.format(u=u['username'], name=u['full_name']) for u in users)
+            dialog = (DIALOG_TEMPLATE.replace('{rows}', rows)
+                      .replace('__LOADER__', LOADER_HTML if next_max_id is not None else '')
+                      .replace('__ROW_TEMPLATE__', json.dumps(ROW_TEMPLATE))
+                      .replace('__NEXT__', json.dumps(next_max_id))
+                      .replace('__USER__', username)
+                      .replace('__COUNT__', str(self.server.page_size)))
+        self.server.count('profiles')
+        return PAGE_TEMPLATE.format(
+            title=f"{username} • Instagram", username=username, full_name=username.replace('_', ' ').title(),
+            followers_exact=f"{followers:,}", followers_short=format_short(followers),
+            following=(followers * 7) % 900 + 50, posts=posts, grid=grid, dialog=dialog,
+        )
+
+    def _post_page(self, code):
+        post = self.server.accounts.post(code)
+        media = '<video src="/static/video.mp4"></video>' if post['is_video'] else '<img alt="" src="/static/foto.jpg">'
+        self.server.count('posts')
+        return POST_TEMPLATE.format(code=code, media=media, **post)
+
+    def _send(self, status, body, content_type='text/html; charset=utf-8'):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockInstagramServer(ThreadingHTTPServer):
+    """Servidor de Instagram simulado con latencia y límite de peticiones por segundo"""
+
+    daemon_threads = True
+
+    def __init__(self, accounts, latency_ms=0, max_rps=0, page_size=12, port=0):
+        super().__init__(('127.0.0.1', port), _MockHandler)
+        self.accounts = accounts
+        self.latency = latency_ms / 1000
+        self.max_rps = max_rps
+        self.page_size = page_size
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.stats = collections.Counter()
+        self._recent = collections.deque()
+        self._lock = threading.Lock()
+
+    def pause(self):
+        if self.latency:
+            time.sleep(self.latency * random.uniform(0.8, 1.2))
+
+    def throttled(self):
+        """Cuenta la petición; True si supera el límite de peticiones del último segundo"""
+        now = time.monotonic()
+        with self._lock:
+            self.stats['requests'] += 1
+            if not self.max_rps:
+                return False
+            while self._recent and now - self._recent[0] > 1.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_rps:
+                self.stats['throttled'] += 1
+                return True
+            self._recent.append(now)
+            return False
+
+    def count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def print_stats(self):
+        s = self.stats
+        print(f"🧪 Servidor simulado: {s['requests']} peticiones | {s['throttled']} frenadas (429) | "
+              f"{s['profiles']} perfiles | {s['posts']} posts | {s['followers_served']} filas de seguidores")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seguidores', type=int, default=1000, help=f'Seguidores de @{TARGET_PROFILE}')
+    parser.add_argument('--distribucion', default='benford', choices=sorted(DISTRIBUTIONS),
+                        help='Distribución del número de seguidores y likes')
+    parser.add_argument('--posts', type=int, default=30, help=f'Posts de @{TARGET_PROFILE}')
+    parser.add_argument('--latencia-ms', type=float, default=0, help='Latencia añadida a cada petición')
+    parser.add_argument('--limite-rps', type=int, default=0, help='Peticiones/s antes de responder 429 (0 = sin límite)')
+    parser.add_argument('--por-pagina', type=int, default=12, help='Filas por carga del diálogo de seguidores')
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+
+    accounts = SyntheticAccounts(args.seguidores, args.distribucion, args.posts, args.semilla)
+    server = MockInstagramServer(accounts, args.latencia_ms, args.limite_rps, args.por_pagina, args.puerto)
+    print(f"🧪 Instagram simulado en {server.base_url}/{TARGET_PROFILE}/ "
+          f"({args.seguidores:,} seguidores, distribución '{args.distribucion}')")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.print_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Acumulador de Benford en streaming con parada anticipada
+BenfordAccumulator va sumando cada follower_count a los histogramas de dígitos
+(primer, segundo, dos primeros y dos últimos: 209 contadores, memoria
+constante) en cuanto llega, sin guardar los números.
+
+Regla de parada: cada check_every números (a partir de min_samples) se calcula
+un intervalo de confianza de la desviación promedio (MAD del primer dígito,
+error estándar por el método delta). Las franjas de veredicto son las de
+valores_criticos.py para el tamaño de muestra actual (la MAD con p-valor 0.10,
+0.05 y 0.01); si el intervalo entero cae dentro de una sola franja, el
+veredicto del análisis con esos números ya está decidido y no hace falta
+visitar más perfiles. Como se mira muchas veces, la confianza se reparte entre
+las miradas (alpha_k = alpha * 6 / (pi^2 k^2), suman alpha) para que la
+probabilidad de parar con un veredicto equivocado no pase de 1 - confianza.
+
+En la práctica se para antes de tiempo cuando la desviación es claramente
+significativa (bots); una muestra compatible con Benford necesita todas las
+visitas para llegar al veredicto REAL.
+"""
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+from motor_benford import TESTS, test_statistics
+from valores_criticos import P_VALUE_CUTOFFS, VERDICTS, get_critical_values
+
+TEST_SIZES = {'first': 9, 'second': 10, 'first_two': 90, 'last_two': 100}
+
+
+class BenfordAccumulator:
+    """Histogramas de dígitos que se actualizan número a número.
+
+    confidence: confianza con la que se da el veredicto por estable.
+    min_samples: números válidos (> 0) antes de la primera comprobación.
+    check_every: números entre una comprobación y la siguiente.
+    """
+
+    def __init__(self, confidence=0.95, min_samples=50, check_every=10, critical_values=None):
+        self.confidence = confidence
+        self.min_samples = min_samples
+        self.check_every = check_every
+        self.critical_values = critical_values or get_critical_values()
+        self.counts = {test: np.zeros(size, dtype=np.int64) for test, size in TEST_SIZES.items()}
+        self.total = 0
+        self.looks = 0
+        self.verdict = None
+        self.interval = None
+
+    def add(self, value):
+        """Suma un número (los ceros y los errores no cuentan) y comprueba si se puede parar"""
+        value = abs(int(value or 0))
+        if value <= 0:
+            return self.verdict
+
+        if value >= 100:
+            self.counts['last_two'][value % 100] += 1
+        leading = value
+        while leading >= 100:
+            leading //= 10
+        if leading >= 10:
+            self.counts['first'][leading // 10 - 1] += 1
+            self.counts['second'][leading % 10] += 1
+            self.counts['first_two'][leading - 10] += 1
+        else:
+            self.counts['first'][leading - 1] += 1
+        self.total += 1
+
+        if (self.verdict is None and self.total >= self.min_samples
+                and (self.total - self.min_samples) % self.check_every == 0):
+            self._check()
+        return self.verdict
+
+    def extend(self, values):
+        for value in values:
+            self.add(value)
+        return self.verdict
+
+    @property
+    def settled(self):
+        return self.verdict is not None
+
+    def tests(self, tests=TESTS):
+        """Estadísticos de cada prueba con lo acumulado hasta ahora (ver motor_benford)"""
+        return {test: test_statistics(self.counts[test], test) for test in tests}
+
+    def deviation_interval(self, z):
+        """Intervalo (bajo, alto) de la desviación promedio del primer dígito a z errores estándar"""
+        stats = test_statistics(self.counts['first'], 'first')
+        difference = stats['observed'] - stats['expected']
+        signs = np.sign(difference)
+        # Var(MAD) ~ s'(diag(p) - pp')s / (81 n), con s los signos de las diferencias
+        variance = float(np.sum(signs ** 2 * stats['observed']) - np.dot(signs, stats['observed']) ** 2)
+        error = math.sqrt(max(variance, 0.0) / self.total) / len(difference)
+        return max(stats['mad'] - z * error, 0.0), stats['mad'] + z * error
+
+    def verdict_for_deviation(self, deviation):
+        """Veredicto que daría el p-valor de esta MAD con el tamaño de muestra actual"""
+        for verdict, p_cutoff in zip(VERDICTS, P_VALUE_CUTOFFS):
+            if deviation <= self.critical_values.critical_value('first', 'mad', self.total, p_cutoff):
+                return verdict
+        return VERDICTS[-1]
+
+    def _check(self):
+        self.looks += 1
+        alpha = (1 - self.confidence) * 6 / (math.pi ** 2 * self.looks ** 2)
+        low, high = self.deviation_interval(NormalDist().inv_cdf(1 - alpha / 2))
+        self.interval = (low, high)
+        verdict = self.verdict_for_deviation(low)
+        if verdict == self.verdict_for_deviation(high):
+            self.verdict = verdict
@@ -0,0 +1,97 @@
+"""
+Intervalos de confianza bootstrap para el análisis de Benford
+Con 45 números una desviación del 4.7% puede ser en realidad un 3% o un 8%.
+Para saberlo se remuestrean los datos con reemplazo miles de veces y se mira
+cuánto varía el resultado: el intervalo con el 95% central de las réplicas.
+
+Todas las réplicas se calculan a la vez como matrices de NumPy (una fila por
+réplica), sin bucles de Python:
+- Para el histograma de dígitos basta con sortear los conteos: remuestrear n
+  números es una multinomial con las proporciones observadas.
+- Para métricas que dependen de varias columnas (la puntuación de bot de
+  extraer_benford.py) se remuestrean filas con una matriz de índices y los
+  conteos de cada réplica salen de un único bincount.
+
+Si no se pasa semilla, sale de los propios datos (data_seed): los mismos datos
+dan siempre el mismo intervalo, también al reproducir o reanalizar.
+"""
+
+import hashlib
+
+import numpy as np
+
+from motor_benford import EXPECTED, leading_digits
+
+BOOTSTRAP_REPLICATES = 2000
+BOOTSTRAP_CONFIDENCE = 0.95
+
+
+def data_seed(*arrays):
+    """Semilla derivada del contenido de uno o varios arrays de enteros"""
+    digest = hashlib.sha256()
+    for values in arrays:
+        digest.update(np.ascontiguousarray(values, dtype=np.int64).tobytes())
+        digest.update(b'|')
+    return int.from_bytes(digest.digest()[:16], 'little')
+
+
+def percentile_interval(samples, confidence=BOOTSTRAP_CONFIDENCE, axis=0):
+    """Intervalo (bajo, alto) con la fracción 'confidence' central de las réplicas"""
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(samples, [tail, 100 - tail], axis=axis)
+    return low, high
+
+
+def resample_counts(counts, replicates=BOOTSTRAP_REPLICATES, rng=None):
+    """Matriz (réplicas x dígitos) de histogramas remuestreados de un histograma observado"""
+    rng = rng or np.random.default_rng()
+    counts = np.asarray(counts)
+    total = int(counts.sum())
+    return rng.multinomial(total, counts / total, size=replicates)
+
+
+def first_digit_counts_rows(values):
+    """Histograma del primer dígito de cada fila de una matriz de conteos (los ceros no cuentan)"""
+    values = np.abs(np.asarray(values, dtype=np.int64))
+    rows = values.shape[0]
+    positive = values > 0
+    _, leading = leading_digits(values[positive])
+    first = np.where(leading >= 10, leading // 10, leading)
+    row_ids = np.nonzero(positive)[0]
+    return np.bincount(row_ids * 9 + first - 1, minlength=rows * 9).reshape(rows, 9)
+
+
+def mad_rows(counts, test='first'):
+    """Desviación promedio (MAD) de cada fila de histogramas; las filas vacías dan 0"""
+    totals = counts.sum(axis=1, keepdims=True)
+    observed = np.divide(counts, totals, out=np.zeros(counts.shape), where=totals > 0)
+    mad = np.abs(observed - EXPECTED[test][1]).mean(axis=1)
+    return np.where(totals[:, 0] > 0, mad, 0.0)
+
+
+def chi_squared_rows(counts, test='first'):
+    expected = EXPECTED[test][1]
+    totals = counts.sum(axis=1)
+    safe_totals = np.maximum(totals, 1)
+    return np.where(totals > 0, (counts * counts) @ (1 / expected) / safe_totals - totals, 0.0)
+
+
+def bootstrap_benford(counts, test='first', replicates=BOOTSTRAP_REPLICATES, confidence=BOOTSTRAP_CONFIDENCE,
+                      seed=None):
+    """Intervalos de la MAD, del chi-cuadrado y de la proporción de cada dígito.
+
+    Devuelve fracciones (no porcentajes): 'mad' y 'chi_squared' como (bajo, alto),
+    'observed_low' y 'observed_high' como arrays por dígito.
+    """
+    seed = data_seed(counts) if seed is None else seed
+    samples = resample_counts(counts, replicates, np.random.default_rng(seed))
+    observed = samples / samples.sum(axis=1, keepdims=True)
+    observed_low, observed_high = percentile_interval(observed, confidence)
+    return {
+        'replicates': replicates,
+        'confidence': confidence,
+        'mad': percentile_interval(mad_rows(samples, test), confidence),
+        'chi_squared': percentile_interval(chi_squared_rows(samples, test), confidence),
+        'observed_low': observed_low,
+        'observed_high': observed_high,
+    }
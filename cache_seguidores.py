@@ -0,0 +1,109 @@
+"""
+Caché persistente (SQLite) del número de seguidores por username
+Se comparte entre ejecuciones y entre perfiles analizados: una cuenta que
+sigue a varios perfiles solo se visita una vez mientras su dato no caduque.
+"""
+
+import sqlite3
+import threading
+import time
+
+from metricas import get_metrics
+
+DEFAULT_CACHE_PATH = "cache_seguidores.sqlite3"
+
+
+class FollowerCountCache:
+    """Caché username -> (seguidores, fecha de obtención, estrategia) con TTL"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_hours=24 * 7, max_entries=100000):
+        self.path = path
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Se usa desde los hilos del pool de navegadores, protegido por el lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS follower_counts (
+                username TEXT PRIMARY KEY,
+                follower_count INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                source TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON follower_counts(last_used)")
+        self._conn.commit()
+
+    def get(self, username):
+        """Devuelve el número de seguidores en caché o None si no está o caducó"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT follower_count, fetched_at FROM follower_counts WHERE username = ?",
+                (username,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE follower_counts SET last_used = ? WHERE username = ?", (now, username))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, username, follower_count, source):
+        """Guarda un resultado; los 0 no se guardan porque suelen ser fallos de lectura"""
+        if not follower_count or follower_count <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO follower_counts "
+                "(username, follower_count, fetched_at, source, last_used) VALUES (?, ?, ?, ?, ?)",
+                (username, int(follower_count), now, source, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Elimina las entradas usadas hace más tiempo si se supera max_entries"""
+        total = self._conn.execute("SELECT COUNT(*) FROM follower_counts").fetchone()[0]
+        excess = total - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM follower_counts WHERE username IN "
+                "(SELECT username FROM follower_counts ORDER BY last_used ASC LIMIT ?)",
+                (excess,)
+            )
+
+    def fill_followers(self, followers_data):
+        """Completa 'follower_count' desde la caché y devuelve los seguidores pendientes"""
+        pending = []
+        for follower in followers_data:
+            count = self.get(follower['follower_username'])
+            if count is None:
+                pending.append(follower)
+            else:
+                follower['follower_count'] = count
+
+        resolved = len(followers_data) - len(pending)
+        get_metrics().incr('lookups', resolved, source='cache', result='hit')
+        get_metrics().incr('lookups', len(pending), source='cache', result='miss')
+        print(f"💾 Caché: {resolved}/{len(followers_data)} perfiles ya conocidos; {len(pending)} por visitar\n")
+        return pending
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return (self.hits / lookups) if lookups else 0.0
+
+    def print_stats(self):
+        """Muestra la tasa de aciertos de la caché en esta ejecución"""
+        lookups = self.hits + self.misses
+        print(f"💾 Caché de seguidores ({self.path}): {self.hits}/{lookups} aciertos "
+              f"({self.hit_rate():.1%})")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
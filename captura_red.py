@@ -0,0 +1,186 @@
+"""
+Captura de las respuestas JSON de Instagram a través de los logs de rendimiento de Chrome
+En lugar de leer spans renderizados, se decodifican los JSON que la propia página
+descarga (listas de seguidores, información de perfil y de publicaciones), que
+traen los números exactos en vez de textos como "1,2 mil".
+
+Uso: setup_driver(capture_network=True) adjunta un NetworkCapture en
+driver.network_capture; cada llamada a drain() procesa lo recibido hasta ese momento.
+"""
+
+import json
+import re
+from datetime import datetime, timezone
+
+from grabacion import record_json
+
+# Respuestas que interesan: GraphQL y la API v1 que usa la web
+CAPTURE_URL_RE = re.compile(
+    r'/graphql/query|/api/graphql|/api/v1/friendships/\d+/followers|/api/v1/users/web_profile_info'
+    r'|/api/v1/media/\d+/info|/api/v1/feed/user/'
+)
+
+
+def enable_network_capture(chrome_options):
+    """Activa el log de rendimiento (eventos Network.*) en las opciones de Chrome"""
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def _iter_dicts(obj):
+    """Recorre recursivamente un JSON y devuelve todos sus diccionarios"""
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            yield current
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+
+
+def _edge_count(node, *keys):
+    for key in keys:
+        value = node.get(key)
+        if isinstance(value, dict) and isinstance(value.get('count'), int):
+            return value['count']
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def decode_profile_counts(payload):
+    """Devuelve {username: seguidores} de los perfiles que aparezcan en el JSON"""
+    counts = {}
+    for node in _iter_dicts(payload):
+        username = node.get('username')
+        if not isinstance(username, str):
+            continue
+        count = _edge_count(node, 'edge_followed_by', 'follower_count')
+        if count is not None:
+            counts[username] = count
+    return counts
+
+
+def decode_follower_usernames(payload):
+    """Devuelve los usernames de una página de la lista de seguidores, en orden"""
+    usernames = []
+    users = payload.get('users') if isinstance(payload, dict) else None
+    if isinstance(users, list):
+        usernames.extend(u['username'] for u in users if isinstance(u, dict) and 'username' in u)
+
+    for node in _iter_dicts(payload):
+        edge = node.get('edge_followed_by')
+        if isinstance(edge, dict) and isinstance(edge.get('edges'), list):
+            for item in edge['edges']:
+                username = (item.get('node') or {}).get('username')
+                if username:
+                    usernames.append(username)
+    return usernames
+
+
+def decode_posts(payload):
+    """Devuelve {shortcode: post} con las mismas claves que usan los extractores de posts"""
+    posts = {}
+    for node in _iter_dicts(payload):
+        shortcode = node.get('shortcode') or node.get('code')
+        if not isinstance(shortcode, str):
+            continue
+        likes = _edge_count(node, 'like_count', 'edge_liked_by', 'edge_media_preview_like')
+        if likes is None:
+            continue
+
+        comments = _edge_count(node, 'comment_count', 'edge_media_to_comment', 'edge_media_to_parent_comment') or 0
+        timestamp = node.get('taken_at') or node.get('taken_at_timestamp')
+        date_str = (datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+                    if isinstance(timestamp, (int, float)) else None)
+
+        caption = node.get('caption')
+        if isinstance(caption, dict):
+            caption_text = caption.get('text') or ''
+        else:
+            caption_edges = (node.get('edge_media_to_caption') or {}).get('edges') or []
+            caption_text = caption_edges[0]['node'].get('text', '') if caption_edges else ''
+
+        is_video = bool(node.get('is_video')) or node.get('media_type') == 2
+        posts[shortcode] = {
+            "shortcode": shortcode,
+            "date_utc": date_str,
+            "likes": likes,
+            "comments": comments,
+            "is_video": is_video,
+            "video_views": node.get('video_view_count') or node.get('view_count'),
+            "caption_length": len(caption_text or ''),
+            "url": f"https://www.instagram.com/p/{shortcode}/",
+        }
+    return posts
+
+
+class NetworkCapture:
+    """Acumula lo decodificado de las respuestas JSON capturadas en un navegador"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.profile_counts = {}  # username -> seguidores (exacto)
+        self.follower_usernames = []  # usernames de la lista de seguidores, en orden
+        self.posts = {}  # shortcode -> post
+        self.responses_seen = 0
+        self._seen_followers = set()
+        self._pending = {}  # requestId -> url
+
+    def drain(self):
+        """Procesa los eventos de red pendientes; devuelve cuántas respuestas decodificó"""
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception:
+            return 0
+
+        decoded = 0
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            method = message.get('method')
+            params = message.get('params', {})
+
+            if method == 'Network.responseReceived':
+                response = params.get('response', {})
+                if CAPTURE_URL_RE.search(response.get('url', '')) and 'json' in response.get('mimeType', ''):
+                    self._pending[params['requestId']] = response['url']
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self._pending:
+                url = self._pending.pop(params['requestId'])
+                payload = self._response_json(params['requestId'])
+                if payload is not None:
+                    self._absorb(url, payload)
+                    decoded += 1
+
+        self.responses_seen += decoded
+        return decoded
+
+    def _response_json(self, request_id):
+        try:
+            body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            return json.loads(body.get('body', ''))
+        except Exception:
+            # El cuerpo puede haberse descartado ya o no ser JSON
+            return None
+
+    def _absorb(self, url, payload):
+        record_json(url, payload)
+        self.profile_counts.update(decode_profile_counts(payload))
+        self.posts.update(decode_posts(payload))
+        if '/friendships/' in url or 'graphql' in url:
+            for username in decode_follower_usernames(payload):
+                if username not in self._seen_followers:
+                    self._seen_followers.add(username)
+                    self.follower_usernames.append(username)
+
+    def follower_count(self, username):
+        """Número exacto de seguidores de un username si ya llegó en algún JSON"""
+        self.drain()
+        return self.profile_counts.get(username)
+
+
+def get_network_capture(driver):
+    """Devuelve el NetworkCapture del navegador, o None si no se activó"""
+    return getattr(driver, 'network_capture', None)
@@ -0,0 +1,110 @@
+"""
+Diario de checkpoints para extracciones de seguidores reanudables
+Cada username extraído del diálogo y cada número de seguidores obtenido se
+anota en un archivo JSONL en cuanto se conoce. Si la ejecución se corta, con
+--resume se retoma desde el último punto en vez de empezar de cero.
+"""
+
+import json
+import os
+import threading
+
+
+def journal_filename(profile_name):
+    return f"{profile_name}_checkpoint.jsonl"
+
+
+class ExtractionJournal:
+    """Diario incremental (una línea JSON por evento) de una extracción"""
+
+    def __init__(self, profile_name, resume=False, path=None):
+        self.path = path or journal_filename(profile_name)
+        self.profile_name = profile_name
+        self.harvested = []  # usernames en orden de aparición
+        self.final_usernames = None  # lista definitiva al terminar el scroll
+        self.counts = {}  # username -> número de seguidores ya obtenido
+        self._seen = set()
+        self._lock = threading.Lock()
+
+        if resume and os.path.exists(self.path):
+            self._load()
+            print(f"♻️  Reanudando desde {self.path}: {len(self.harvested)} usernames, "
+                  f"{len(self.counts)} perfiles ya visitados")
+            if self.final_usernames is not None:
+                print("   La lista de seguidores ya estaba completa; se salta el scroll\n")
+            else:
+                print()
+            mode = "a"
+        else:
+            mode = "w"
+
+        self._file = open(self.path, mode, encoding="utf-8")
+        if mode == "a" and self._file.tell() > 0:
+            # Cierra una posible línea a medio escribir para no corromper la siguiente
+            self._file.write("\n")
+            self._file.flush()
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # Última línea a medio escribir si el proceso murió
+                    continue
+                kind = event.get('type')
+                if kind == 'username' and event['username'] not in self._seen:
+                    self._seen.add(event['username'])
+                    self.harvested.append(event['username'])
+                elif kind == 'harvest_complete':
+                    self.final_usernames = event['usernames']
+                elif kind == 'count':
+                    self.counts[event['username']] = event['count']
+
+    def _write(self, event):
+        with self._lock:
+            self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    @property
+    def harvest_complete(self):
+        return self.final_usernames is not None
+
+    def record_username(self, username):
+        """Anota un username nuevo extraído del diálogo"""
+        if username in self._seen:
+            return
+        self._seen.add(username)
+        self.harvested.append(username)
+        self._write({'type': 'username', 'username': username})
+
+    def record_harvest_complete(self, usernames):
+        """Anota la lista definitiva de seguidores a visitar"""
+        self.final_usernames = list(usernames)
+        self._write({'type': 'harvest_complete', 'usernames': self.final_usernames})
+
+    def record_count(self, username, count):
+        """Anota el número de seguidores de un perfil ya visitado"""
+        self.counts[username] = count
+        self._write({'type': 'count', 'username': username, 'count': count})
+
+    def record_resolved(self, before, after):
+        """Anota los seguidores de 'before' que ya no están pendientes en 'after'"""
+        remaining = {id(follower) for follower in after}
+        for follower in before:
+            if id(follower) not in remaining:
+                self.record_count(follower['follower_username'], follower['follower_count'])
+
+    def fill_followers(self, followers_data):
+        """Completa 'follower_count' con lo ya visitado y devuelve los pendientes"""
+        pending = []
+        for follower in followers_data:
+            username = follower['follower_username']
+            if username in self.counts:
+                follower['follower_count'] = self.counts[username]
+            else:
+                pending.append(follower)
+        return pending
+
+    def close(self):
+        self._file.close()
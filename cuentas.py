@@ -0,0 +1,149 @@
+"""
+Pool de cuentas de Instagram para repartir el trabajo entre varias sesiones
+Las cuentas se leen de un archivo JSON; cada una tiene su propio navegador (o
+sesión de instaloader) y su propio limitador de frecuencia, así que el ritmo
+total crece con el número de cuentas. Una cuenta que cae en un checkpoint
+(challenge o login forzado) se aparca: deja de recibir trabajo y lo que tenía
+pendiente pasa a las demás. Las cuentas aparcadas se recuerdan entre ejecuciones
+durante PARK_HOURS.
+
+Formato de cuentas.json:
+    [
+        {"username": "cuenta1", "password": "...", "session_file": "cuenta1"},
+        {"username": "cuenta2", "password": "..."}
+    ]
+"""
+
+import json
+import os
+import threading
+import time
+
+from limitador import RateLimiter
+
+DEFAULT_ACCOUNTS_FILE = "cuentas.json"
+DEFAULT_STATE_FILE = "cuentas_estado.json"
+PARK_HOURS = 24
+
+# Motivos de bloqueo que aparcan la cuenta (el resto solo frena su limitador)
+PARKING_REASONS = ('challenge', 'login forzado', 'checkpoint')
+
+
+class Account:
+    """Una cuenta con su limitador propio y sus contadores de trabajo"""
+
+    def __init__(self, username, password="", session_file=None):
+        self.username = username
+        self.password = password
+        self.session_file = session_file  # None: ubicación por defecto de instaloader
+        self.limiter = RateLimiter()
+        self.parked_reason = None
+        self.parked_at = None
+        self.completed = 0
+        self.busy_seconds = 0.0
+
+    @property
+    def parked(self):
+        return self.parked_reason is not None
+
+
+class AccountPool:
+    """Conjunto de cuentas; reparte el trabajo solo entre las no aparcadas"""
+
+    def __init__(self, accounts, state_path=DEFAULT_STATE_FILE, park_hours=PARK_HOURS):
+        self.accounts = list(accounts)
+        self.state_path = state_path
+        self.park_seconds = park_hours * 3600
+        self.main = None  # cuenta con la que se inició el navegador principal
+        self._lock = threading.Lock()
+        self._load_state()
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_ACCOUNTS_FILE, **kwargs):
+        """Carga las cuentas de un JSON; devuelve None si el archivo no existe"""
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        accounts = [Account(entry['username'], entry.get('password', ''), entry.get('session_file'))
+                    for entry in entries]
+        print(f"👥 Cuentas cargadas de {path}: {len(accounts)}")
+        return cls(accounts, **kwargs)
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for account in self.accounts:
+            parked = state.get(account.username)
+            if parked and now - parked['parked_at'] < self.park_seconds:
+                account.parked_reason = parked['reason']
+                account.parked_at = parked['parked_at']
+                print(f"   ⏸ @{account.username} sigue aparcada ({parked['reason']})")
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        state = {account.username: {'reason': account.parked_reason, 'parked_at': account.parked_at}
+                 for account in self.accounts if account.parked}
+        with open(self.state_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+
+    def configure(self, endpoint, **config):
+        """Aplica la misma configuración de endpoint al limitador de cada cuenta"""
+        for account in self.accounts:
+            account.limiter.configure(endpoint, **config)
+
+    def active(self):
+        return [account for account in self.accounts if not account.parked]
+
+    def park(self, account, reason):
+        """Retira una cuenta del reparto de trabajo"""
+        with self._lock:
+            if account.parked:
+                return
+            account.parked_reason = reason
+            account.parked_at = time.time()
+            self._save_state()
+        print(f"  ⏸ Cuenta @{account.username} aparcada ({reason}); su trabajo pasa a las demás")
+
+    def login_main(self, driver, login_fn):
+        """Inicia sesión en el navegador principal con la primera cuenta que funcione"""
+        for account in self.active():
+            if login_fn(driver, account.username, account.password):
+                self.main = account
+                return True
+            self.park(account, 'login fallido')
+        return False
+
+    def open_sessions(self, main_driver, setup_driver_fn, login_fn):
+        """Devuelve [(driver, limitador, cuenta)]: el principal más un navegador por cuenta activa"""
+        sessions = [(main_driver, self.main.limiter, self.main)] if self.main else []
+        for account in self.active():
+            if account is self.main:
+                continue
+            print(f"🌐 Abriendo navegador para @{account.username}...")
+            try:
+                driver = setup_driver_fn()
+            except Exception as e:
+                print(f"⚠ No se pudo abrir el navegador de @{account.username}: {e}")
+                continue
+            if login_fn(driver, account.username, account.password):
+                sessions.append((driver, account.limiter, account))
+            else:
+                self.park(account, 'login fallido')
+                driver.quit()
+        return sessions
+
+    def print_stats(self):
+        """Trabajo hecho y ritmo de cada cuenta"""
+        print("👥 Cuentas:")
+        for account in self.accounts:
+            rate = account.completed / account.busy_seconds * 60 if account.busy_seconds else 0.0
+            status = f"aparcada ({account.parked_reason})" if account.parked else "activa"
+            print(f"   @{account.username:<20} {account.completed:>5} elementos | {rate:.1f}/min | {status}")
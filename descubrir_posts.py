@@ -0,0 +1,98 @@
+"""
+Descubrimiento de posts de un perfil en el orden del feed
+En vez de hacer un número fijo de scrolls y quedarse con lo que haya cargado,
+discover_post_urls() va haciendo scroll en la cuadrícula del perfil hasta
+reunir max_posts posts distintos o hasta que dejan de aparecer posts nuevos,
+y devuelve cada URL en cuanto aparece, de la más reciente a la más antigua.
+Como es un generador, las visitas a los posts pueden empezar (en otras
+pestañas, ver pestanas_posts.py) mientras la cuadrícula sigue cargando.
+"""
+
+from selenium.webdriver.common.by import By
+
+from limitador import paced, pause
+
+POST_LINK_SELECTOR = "a[href*='/p/']"
+# Segundos que se esperan tras el scroll a que se pinte la fila nueva de posts
+SCROLL_MARGIN = 0.3
+
+# Enlaces de posts presentes ahora en la página, en orden del documento (el del feed)
+POST_LINKS_JS = """
+return Array.from(document.querySelectorAll(arguments[0]), a => a.href);
+"""
+
+# Hace scroll al final y espera a que aparezcan más posts, crezca la página o pase el timeout;
+# luego da un margen (marginMs) para que termine de pintarse la fila nueva
+SCROLL_FOR_POSTS_JS = """
+const [selector, timeoutMs, marginMs] = arguments;
+const done = arguments[arguments.length - 1];
+const count = () => document.querySelectorAll(selector).length;
+const height = () => document.body.scrollHeight;
+const before = [count(), height()];
+const started = Date.now();
+window.scrollTo(0, document.body.scrollHeight);
+const timer = setInterval(() => {
+    if (count() !== before[0] || height() !== before[1] || Date.now() - started > timeoutMs) {
+        clearInterval(timer);
+        setTimeout(() => done(Array.from(document.querySelectorAll(selector), a => a.href)), marginMs);
+    }
+}, 100);
+"""
+
+
+def shortcode_from_url(post_url):
+    return post_url.split('/p/')[1].split('/')[0].split('?')[0]
+
+
+def _post_links(driver):
+    try:
+        return driver.execute_script(POST_LINKS_JS, POST_LINK_SELECTOR) or []
+    except Exception:
+        return [link.get_attribute('href') for link in driver.find_elements(By.CSS_SELECTOR, POST_LINK_SELECTOR)]
+
+
+def _scroll_for_posts(driver, timeout):
+    try:
+        driver.set_script_timeout(paced(timeout) + 5)
+        return driver.execute_async_script(SCROLL_FOR_POSTS_JS, POST_LINK_SELECTOR, int(paced(timeout) * 1000),
+                                           int(paced(SCROLL_MARGIN) * 1000)) or []
+    except Exception:
+        # Si el script no se puede inyectar, scroll con pausa fija como antes
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        pause(2)
+        return _post_links(driver)
+
+
+def discover_post_urls(driver, max_posts=50, scroll_timeout=6.0, max_idle_scrolls=3):
+    """Genera las URLs de los posts del perfil abierto, sin repetir y en orden del feed.
+
+    Termina al llegar a max_posts o tras max_idle_scrolls scrolls seguidos sin
+    posts nuevos (fin de la cuadrícula). Cada paso vuelve primero a la pestaña
+    donde estaba el perfil, así que el consumidor puede usar otras pestañas
+    entre un post y el siguiente.
+    """
+    handle = driver.current_window_handle
+    seen = set()
+    idle_scrolls = 0
+    links = _post_links(driver)
+
+    while len(seen) < max_posts:
+        new_posts = 0
+        for href in links:
+            if not href or '/p/' not in href:
+                continue
+            shortcode = shortcode_from_url(href)
+            if shortcode in seen:
+                continue
+            seen.add(shortcode)
+            new_posts += 1
+            yield href
+            if len(seen) >= max_posts:
+                return
+
+        idle_scrolls = 0 if new_posts else idle_scrolls + 1
+        if idle_scrolls >= max_idle_scrolls:
+            print(f"✓ Fin de la cuadrícula: {len(seen)} posts en el perfil")
+            return
+        driver.switch_to.window(handle)
+        links = _scroll_for_posts(driver, scroll_timeout)
@@ -0,0 +1,165 @@
+"""
+Utilidades para el diálogo de seguidores de Instagram
+En vez de esperar tiempos fijos tras cada scroll, se inyecta un script que
+avanza en cuanto aparecen filas nuevas (MutationObserver) o llegan respuestas
+de red, y que detecta el final de la lista cuando el indicador de carga
+desaparece.
+"""
+
+import time
+
+from limitador import paced, pause
+from metricas import timed
+
+# Indicadores de carga que Instagram muestra al final de la lista mientras pide más filas
+LOADER_SELECTOR = ", ".join([
+    "svg[aria-label='Loading...']",
+    "svg[aria-label='Cargando...']",
+    "[role='progressbar']",
+    "[data-visualcompletion='loading-state']",
+])
+
+# arguments: contenedor scrolleable, timeout (ms), espera sin loader (ms), selector del loader
+WAIT_FOR_GROWTH_JS = """
+const container = arguments[0];
+const timeoutMs = arguments[1];
+const settleMs = arguments[2];
+const loaderSelector = arguments[3];
+const done = arguments[arguments.length - 1];
+
+const dialog = container.closest("div[role='dialog']") || container;
+let observer = null;
+let timer = null;
+let poll = null;
+const harvestedRows = () => window.__igHarvest ? window.__igHarvest.rows : null;
+const isLoading = () => !!dialog.querySelector(loaderSelector);
+const t0 = Date.now();
+let lastNetwork = t0;
+let finished = false;
+let perfObserver = null;
+
+const finish = (reason) => {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    if (perfObserver) perfObserver.disconnect();
+    clearTimeout(timer);
+    clearInterval(poll);
+    done({reason: reason, rows: harvestedRows(), loading: isLoading(), elapsed_ms: Date.now() - t0});
+};
+
+// Filas nuevas (enlaces aún no cosechados) en el diálogo -> avanzar de inmediato
+const hasNewRows = () => !!dialog.querySelector("a[href]:not([data-ig-harvested])");
+observer = new MutationObserver(() => {
+    if (hasNewRows()) finish('new_rows');
+});
+observer.observe(dialog, {childList: true, subtree: true});
+
+// Respuestas de red de la lista -> puede que vengan más filas, reiniciar la espera
+try {
+    perfObserver = new PerformanceObserver((list) => {
+        for (const entry of list.getEntries()) {
+            if (/friendships|graphql|api\\/v1/.test(entry.name)) lastNetwork = Date.now();
+        }
+    });
+    perfObserver.observe({type: 'resource', buffered: false});
+} catch (e) {}
+
+container.scrollTop = container.scrollHeight;
+
+// Sin loader y sin red durante settleMs -> fin de la lista
+poll = setInterval(() => {
+    if (!isLoading() && Date.now() - lastNetwork >= settleMs) finish('no_loader');
+}, 100);
+timer = setTimeout(() => finish('timeout'), timeoutMs);
+
+// Quedaban filas sin cosechar de antes del scroll
+if (hasNewRows()) finish('new_rows');
+"""
+
+# Devuelve solo las filas añadidas desde la llamada anterior. Cada enlace ya
+# procesado queda marcado con data-ig-harvested y el cursor (usernames y filas
+# devueltos hasta ahora) vive en la página, así que el coste por llamada depende
+# de las filas nuevas y no del tamaño total del diálogo.
+# arguments: lista de rutas reservadas
+HARVEST_NEW_ROWS_JS = """
+const reserved = new Set(arguments[0]);
+const root = document.querySelector("div[role='dialog']") || document;
+const state = window.__igHarvest || (window.__igHarvest = {seen: new Set(), cursor: 0, rows: 0});
+const fresh = [];
+
+for (const a of root.querySelectorAll("a[href]:not([data-ig-harvested])")) {
+    a.setAttribute('data-ig-harvested', '1');
+    state.rows += 1;
+    const path = (a.getAttribute('href') || '')
+        .replace(/^https?:\\/\\/(www\\.)?instagram\\.com/, '')
+        .split('?')[0];
+    const parts = path.split('/').filter(Boolean);
+    if (parts.length !== 1) continue;
+    const username = parts[0];
+    if (reserved.has(username) || username.length >= 30 || state.seen.has(username)) continue;
+    state.seen.add(username);
+    fresh.push(username);
+}
+
+state.cursor += fresh.length;
+return {usernames: fresh, cursor: state.cursor, rows: state.rows};
+"""
+
+RESET_HARVEST_JS = """
+delete window.__igHarvest;
+for (const a of document.querySelectorAll("a[data-ig-harvested]")) a.removeAttribute('data-ig-harvested');
+"""
+
+
+def reset_harvest_cursor(driver):
+    """Reinicia el cursor de cosecha guardado en la página"""
+    try:
+        driver.execute_script(RESET_HARVEST_JS)
+    except Exception:
+        pass
+
+
+@timed('username_parse')
+def harvest_new_usernames(driver, reserved):
+    """Devuelve los usernames de las filas nuevas del diálogo desde la última llamada.
+
+    Resultado: {'usernames': [...], 'cursor': total devuelto, 'rows': filas vistas},
+    o None si no se pudo ejecutar el script en la página.
+    """
+    try:
+        return driver.execute_script(HARVEST_NEW_ROWS_JS, list(reserved))
+    except Exception:
+        return None
+
+
+@timed('dialog_scroll')
+def wait_for_new_rows(driver, scrollable_div, timeout=8.0, settle=1.5):
+    """Hace scroll y espera a que el diálogo crezca, termine la lista o pase el timeout.
+
+    Devuelve un diccionario con 'reason' ('new_rows', 'no_loader', 'timeout'
+    o 'fallback'), 'rows' (filas cosechadas hasta ahora), 'loading' y 'elapsed_ms'.
+    """
+    try:
+        driver.set_script_timeout(paced(timeout) + 5)
+        return driver.execute_async_script(
+            WAIT_FOR_GROWTH_JS, scrollable_div, int(paced(timeout) * 1000), int(paced(settle) * 1000),
+            LOADER_SELECTOR
+        )
+    except Exception:
+        # Si el script no se puede inyectar, volver al scroll con pausa fija
+        start = time.time()
+        try:
+            driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scrollable_div)
+        except Exception:
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight)")
+        pause(settle)
+        return {'reason': 'fallback', 'rows': None, 'loading': None,
+                'elapsed_ms': int((time.time() - start) * 1000)}
+
+
+def print_harvest_rate(total, started_at):
+    """Muestra la velocidad de extracción en seguidores por minuto"""
+    elapsed = max(time.time() - started_at, 1e-6)
+    print(f"⏱ Extracción de la lista: {total} seguidores en {elapsed:.1f}s "
+          f"({total / elapsed * 60:.1f} seguidores/min)")
@@ -4,45 +4,81 @@ La Ley de Benford dice que en datos naturales, el primer dígito sigue una distr
 Los bots suelen generar números que no siguen esta distribución natural.
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 import csv
 import os
 import math
-from collections import Counter
 from datetime import datetime
+import numpy as np
+from captura_red import enable_network_capture, NetworkCapture, get_network_capture
+from sesion_navegador import create_chrome, restore_session, save_session
+from grabacion import start_session, stop_session, wrap_driver
+from navegador_ligero import apply_lean_options, enable_request_blocking, get_page_stats, record_visit
+from limitador import get_rate_limiter, pause
+from pestanas_posts import TabPool
+from pool_navegadores import BrowserPool
+from cuentas import AccountPool
+from descubrir_posts import discover_post_urls, shortcode_from_url
+from motor_benford import benford_tests
+from valores_criticos import get_critical_values
+from bootstrap_benford import (BOOTSTRAP_CONFIDENCE, BOOTSTRAP_REPLICATES, bootstrap_benford, data_seed,
+                               first_digit_counts_rows, mad_rows, percentile_interval)
+from metricas import start_run, finish_run, get_metrics, timed, count_strategy
 
 # Configuración
 DEBUG_FOLDER = "debug_screenshots"
+MIN_BENFORD_SAMPLES = 5  # Números válidos mínimos para que likes/comentarios puntúen
 if not os.path.exists(DEBUG_FOLDER):
     os.makedirs(DEBUG_FOLDER)
 
-def setup_driver():
-    """Configura el navegador Chrome"""
+def setup_driver(capture_network=False, lean=False):
+    """Configura el navegador Chrome.
+
+    capture_network=True captura los JSON que descarga la página (ver captura_red.py)
+    lean=True usa el modo ligero: sin ventana, carga 'eager' y sin imágenes,
+    vídeo, fuentes ni analítica (ver navegador_ligero.py)
+    Con una grabación o reproducción activa el driver va envuelto (ver grabacion.py)
+    """
     chrome_options = Options()
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
     chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
     
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=chrome_options
-    )
+    if capture_network:
+        enable_network_capture(chrome_options)
+    if lean:
+        apply_lean_options(chrome_options)
+    
+    driver = create_chrome(chrome_options)
+    driver.lean = lean
+    if lean:
+        enable_request_blocking(driver)
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    return driver
+    if capture_network:
+        driver.network_capture = NetworkCapture(driver)
+    return wrap_driver(driver)
 
+@timed('login')
 def login_instagram(driver, username, password):
     """Inicia sesión en Instagram"""
+    # Reproducción de una grabación: no hay nada en lo que iniciar sesión
+    if getattr(driver, 'replaying', False):
+        print("✓ Reproduciendo grabación (sin login)")
+        return True
+    
+    # Sesión guardada de una ejecución anterior: no hace falta volver a hacer login
+    if restore_session(driver, username):
+        print("✓ Sesión restaurada (sin login)")
+        return True
+    
     print("🔐 Iniciando sesión en Instagram...")
     driver.get("https://www.instagram.com/accounts/login/")
-    time.sleep(3)
+    pause(3)
     
     try:
         username_input = WebDriverWait(driver, 10).until(
@@ -51,15 +87,15 @@ def login_instagram(driver, username, password):
         password_input = driver.find_element(By.NAME, "password")
         
         username_input.send_keys(username)
-        time.sleep(1)
+        pause(1)
         password_input.send_keys(password)
-        time.sleep(1)
+        pause(1)
         
         login_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
         login_button.click()
         
         print("⏳ Esperando confirmación de login...")
-        time.sleep(8)
+        pause(8)
         
         # Manejar popups
         try:
@@ -67,7 +103,7 @@ def login_instagram(driver, username, password):
                 EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Ahora no') or contains(text(), 'Not now')]"))
             )
             not_now.click()
-            time.sleep(2)
+            pause(2)
         except:
             pass
         
@@ -76,10 +112,11 @@ def login_instagram(driver, username, password):
                 EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Ahora no') or contains(text(), 'Not now')]"))
             )
             not_now.click()
-            time.sleep(2)
+            pause(2)
         except:
             pass
         
+        save_session(driver, username)
         print("✓ Login exitoso")
         return True
         
@@ -113,7 +150,7 @@ def extract_likes_robust(driver):
                     if 'gusta' in line.lower() or 'like' in line.lower():
                         num = extract_number_from_text(line)
                         if num > 0:
-                            likes = num
+                            likes = count_strategy('seccion', num, 'likes_strategy')
                             break
             if likes > 0:
                 break
@@ -126,7 +163,7 @@ def extract_likes_robust(driver):
                 if text and ('gusta' in text.lower() or 'like' in text.lower()):
                     num = extract_number_from_text(text)
                     if num > 0:
-                        likes = num
+                        likes = count_strategy('span', num, 'likes_strategy')
                         break
         
         # Método 3: Buscar en enlaces (botón de liked_by)
@@ -136,7 +173,7 @@ def extract_likes_robust(driver):
                 text = like_link.find_element(By.TAG_NAME, "span").text
                 num = extract_number_from_text(text)
                 if num > 0:
-                    likes = num
+                    likes = count_strategy('liked_by', num, 'likes_strategy')
             except:
                 pass
                 
@@ -174,92 +211,315 @@ def extract_comments_robust(driver):
     
     return comments
 
-def extract_profile_data(driver, profile_username, max_posts=50):
-    """Extrae datos del perfil para análisis de Benford"""
+# Las mismas estrategias que extract_likes_robust y extract_comments_robust, pero
+# ejecutadas dentro de la página: cada .text desde Python es una petición a
+# WebDriver, y un post con cientos de spans costaba cientos de peticiones.
+POST_METADATA_JS = r"""
+const number = (text) => {
+    const digits = (text || '').replace(/[,.]/g, '').replace(/\D/g, '');
+    return digits && digits.length < 10 ? parseInt(digits, 10) : 0;
+};
+const text = (el) => (el.innerText || '').trim();
+const mentionsLikes = (t) => t.includes('gusta') || t.includes('like');
+const spans = Array.from(document.querySelectorAll('span'));
+
+let likes = 0, likesStrategy = null;
+// Método 1: líneas de las secciones que hablan de "me gusta"
+for (const section of document.querySelectorAll('section')) {
+    for (const line of text(section).toLowerCase().split('\n')) {
+        if (mentionsLikes(line) && number(line) > 0) {
+            likes = number(line);
+            likesStrategy = 'seccion';
+            break;
+        }
+    }
+    if (likes > 0) break;
+}
+// Método 2: spans con texto de likes
+if (likes === 0) {
+    for (const span of spans) {
+        const t = text(span);
+        if (t && mentionsLikes(t.toLowerCase()) && number(t) > 0) {
+            likes = number(t);
+            likesStrategy = 'span';
+            break;
+        }
+    }
+}
+// Método 3: enlace liked_by
+if (likes === 0) {
+    const span = document.querySelector("a[href*='liked_by'] span");
+    if (span && number(text(span)) > 0) {
+        likes = number(text(span));
+        likesStrategy = 'liked_by';
+    }
+}
+
+let comments = 0;
+for (const span of spans) {
+    const t = text(span);
+    const lower = t.toLowerCase();
+    if (t && (lower.includes('comentario') || lower.includes('comment')) && number(t) > 0) {
+        comments = number(t);
+        break;
+    }
+}
+// Alternativa: contar los comentarios visibles
+if (comments === 0) {
+    comments = document.querySelectorAll("ul li[role='menuitem']").length;
+}
+
+const time = document.querySelector('time[datetime]');
+let captionLength = 0;
+for (const h1 of document.querySelectorAll('h1')) {
+    captionLength = Math.max(captionLength, text(h1).length);
+}
+
+return {
+    date_utc: time ? time.getAttribute('datetime') : null,
+    likes: likes,
+    likes_strategy: likesStrategy,
+    comments: comments,
+    is_video: document.querySelector('video') !== null,
+    caption_length: captionLength,
+};
+"""
+
+def extract_post_metadata_selenium(driver):
+    """Lo mismo que POST_METADATA_JS, elemento a elemento desde Python (mucho más lento)"""
+    try:
+        date_str = driver.find_element(By.CSS_SELECTOR, "time[datetime]").get_attribute("datetime")
+    except:
+        date_str = None
+    
+    try:
+        driver.find_element(By.CSS_SELECTOR, "video")
+        is_video = True
+    except:
+        is_video = False
+    
+    caption_length = 0
+    try:
+        for h1 in driver.find_elements(By.TAG_NAME, "h1"):
+            caption_length = max(caption_length, len(h1.text.strip()))
+    except:
+        pass
+    
+    return {
+        'date_utc': date_str,
+        'likes': extract_likes_robust(driver),
+        'comments': extract_comments_robust(driver),
+        'is_video': is_video,
+        'caption_length': caption_length,
+    }
+
+def extract_post_metadata(driver):
+    """Devuelve date_utc, likes, comments, is_video y caption_length del post abierto.
+
+    Todo sale de un único script inyectado; si no se puede ejecutar se vuelve a
+    la extracción desde Python (extract_post_metadata_selenium).
+    """
+    try:
+        metadata = driver.execute_script(POST_METADATA_JS)
+    except Exception:
+        metadata = None
+    if not metadata:
+        return extract_post_metadata_selenium(driver)
+    
+    if metadata.get('likes_strategy'):
+        count_strategy(metadata['likes_strategy'], metadata['likes'], 'likes_strategy')
+    return metadata
+
+def post_from_network(post_number, shortcode, post_url, captured):
+    """Fila de un post con los datos del JSON capturado de la red"""
+    return {
+        "post_number": post_number,
+        "shortcode": shortcode,
+        "date_utc": captured['date_utc'] or datetime.now().isoformat(),
+        "likes": captured['likes'],
+        "comments": captured['comments'],
+        "is_video": captured['is_video'],
+        "caption_length": captured['caption_length'],
+        "url": post_url
+    }
+
+def visit_posts_in_tabs(driver, post_urls, tabs, capture=None, accounts=None):
+    """Visita varios posts a la vez en pestañas del mismo navegador y devuelve sus datos.
+
+    post_urls puede ser el generador de discover_post_urls: la pestaña del
+    perfil sigue descubriendo posts mientras las demás los visitan
+    (ver pestanas_posts.py). Los posts que ya trae la captura de red no se visitan.
+    Con accounts (AccountPool con varias cuentas activas) los posts se reparten
+    entre un navegador por cuenta, cada uno con su limitador (pool_navegadores.py);
+    una cuenta que cae en un checkpoint se aparca y sus posts pasan a las demás.
+    """
+    metrics = get_metrics()
+    posts_data = []
+    numbers = {}
+    in_tabs = not accounts
+    
+    def to_visit():
+        for post_number, post_url in enumerate(post_urls, 1):
+            shortcode = shortcode_from_url(post_url)
+            if capture and shortcode not in capture.posts:
+                capture.drain()
+            if capture and shortcode in capture.posts:
+                post_data = post_from_network(post_number, shortcode, post_url, capture.posts[shortcode])
+                posts_data.append(post_data)
+                metrics.incr('posts_extracted', source='red')
+                print(f"📸 Post {post_number}: {post_url}")
+                print(f"  📡 (JSON) Likes: {post_data['likes']}, Comentarios: {post_data['comments']}, Video: {post_data['is_video']}\n")
+                continue
+            numbers[post_url] = (post_number, shortcode)
+            yield post_url
+    
+    def report(idx, post_url, metadata):
+        post_number, shortcode = numbers[post_url]
+        if not metadata:
+            print(f"  ⚠ Post {post_number}: no se pudo leer {post_url}\n")
+            return
+        likes = metadata['likes']
+        posts_data.append({
+            "post_number": post_number,
+            "shortcode": shortcode,
+            "date_utc": metadata['date_utc'] or datetime.now().isoformat(),
+            "likes": likes,
+            "comments": metadata['comments'],
+            "is_video": metadata['is_video'],
+            "caption_length": metadata['caption_length'],
+            "url": post_url
+        })
+        metrics.incr('posts_extracted', source='dom')
+        if in_tabs:  # en el pool de cuentas las visitas ya las cuenta BrowserPool
+            metrics.incr('post_visits', result='ok' if likes else 'zero')
+        print(f"📸 Post {post_number}: {post_url}")
+        print(f"  ✅ Likes: {likes}, Comentarios: {metadata['comments']}, Video: {metadata['is_video']}\n")
+        
+        # Debug si no hay likes (el navegador sigue en la pestaña del post)
+        if likes == 0 and in_tabs:
+            save_debug_screenshot(driver, post_number)
+    
+    def read_post(pool_driver, post_url):
+        """Visita un post con el navegador de una cuenta (BrowserPool ya esperó su turno)"""
+        pool_driver.get(post_url)
+        pause(4)
+        metadata = extract_post_metadata(pool_driver)
+        if not metadata['likes']:
+            save_debug_screenshot(pool_driver, numbers[post_url][0])
+        return metadata
+    
+    if in_tabs:
+        with TabPool(driver, tabs, use_main_tab=False) as pool:
+            print(f"   Pestañas en paralelo: {len(pool.handles)}\n")
+            pool.map(lambda driver, url: extract_post_metadata(driver), to_visit(), on_result=report)
+    else:
+        urls = list(to_visit())
+        setup_driver_fn = lambda: setup_driver(capture is not None, getattr(driver, 'lean', False))
+        with BrowserPool(driver, setup_driver_fn, endpoint='post', accounts=accounts,
+                         login_fn=login_instagram) as pool:
+            print(f"   Cuentas en paralelo: {len(pool.drivers)}\n")
+            pool.map(read_post, urls, on_result=report, default=None)
+            unvisited = [urls[idx] for idx in pool.unvisited]
+        if unvisited:
+            print(f"⚠ Posts sin visitar (todas las cuentas aparcadas): {unvisited}\n")
+    posts_data.sort(key=lambda post: post['post_number'])
+    return posts_data
+
+def save_debug_screenshot(driver, post_number):
+    """Captura del post actual cuando no se encontraron likes"""
+    screenshot_path = os.path.join(DEBUG_FOLDER, f"post_{post_number}_debug.png")
+    driver.save_screenshot(screenshot_path)
+    print(f"  ⚠ Screenshot guardado: {screenshot_path}\n")
+
+def extract_profile_data(driver, profile_username, max_posts=50, post_tabs=1, accounts=None):
+    """Extrae datos del perfil para análisis de Benford.
+
+    Con post_tabs > 1 los posts se cargan de varios en varios en pestañas; con
+    varias cuentas activas (accounts) se reparten entre un navegador por cuenta.
+    """
     print(f"\n📊 Extrayendo datos de @{profile_username}...")
     
     driver.get(f"https://www.instagram.com/{profile_username}/")
-    time.sleep(5)
+    pause(5)
     
     posts_data = []
+    limiter = get_rate_limiter()
+    metrics = get_metrics()
     
     try:
-        # Scroll para cargar posts
+        # Scroll en la cuadrícula hasta reunir max_posts, en orden del feed (del más reciente)
         print("🔍 Cargando posts del perfil...")
-        for _ in range(3):
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+        discovered = discover_post_urls(driver, max_posts)
+        
+        # Con captura de red, los JSON del feed ya traen likes/comentarios exactos
+        capture = get_network_capture(driver)
         
-        # Encontrar enlaces de posts
-        post_links = driver.find_elements(By.CSS_SELECTOR, "a[href*='/p/']")
-        post_urls = list(set([link.get_attribute('href') for link in post_links]))[:max_posts]
+        if accounts and len(accounts.active()) > 1:
+            # Un navegador por cuenta, cada uno con su propio ritmo
+            return visit_posts_in_tabs(driver, discovered, post_tabs, capture, accounts)
+        if post_tabs > 1:
+            # Los posts se visitan en pestañas mientras se siguen descubriendo
+            return visit_posts_in_tabs(driver, discovered, post_tabs, capture)
         
+        post_urls = list(discovered)
         print(f"✓ Encontrados {len(post_urls)} posts para analizar\n")
         
+        if capture:
+            capture.drain()
+            print(f"📡 Posts decodificados de la red: {len(capture.posts)}\n")
+        
         # Extraer datos de cada post
         for idx, post_url in enumerate(post_urls, 1):
             print(f"📸 Post {idx}/{len(post_urls)}: {post_url}")
             
+            shortcode = shortcode_from_url(post_url)
+            if capture and shortcode in capture.posts:
+                post_data = post_from_network(idx, shortcode, post_url, capture.posts[shortcode])
+                posts_data.append(post_data)
+                metrics.incr('posts_extracted', source='red')
+                print(f"  📡 (JSON) Likes: {post_data['likes']}, Comentarios: {post_data['comments']}, Video: {post_data['is_video']}\n")
+                continue
+            
             try:
+                limiter.wait('post')
+                visit_started = time.perf_counter()
                 driver.get(post_url)
-                time.sleep(4)
-                
-                shortcode = post_url.split('/p/')[1].rstrip('/')
-                
-                # Fecha
-                try:
-                    date_element = driver.find_element(By.CSS_SELECTOR, "time[datetime]")
-                    date_str = date_element.get_attribute("datetime")
-                except:
-                    date_str = datetime.now().isoformat()
-                
-                # Likes
-                likes = extract_likes_robust(driver)
+                pause(4)
+                if limiter.check_page(driver, 'post'):
+                    # Tras la pausa que impone el limitador se reintenta una vez
+                    limiter.wait('post')
+                    driver.get(post_url)
+                    pause(4)
+                record_visit(driver, post_url)
                 
-                # Comentarios
-                comments = extract_comments_robust(driver)
-                
-                # Video?
-                try:
-                    driver.find_element(By.CSS_SELECTOR, "video")
-                    is_video = True
-                except:
-                    is_video = False
-                
-                # Caption
-                caption_length = 0
-                try:
-                    h1_elements = driver.find_elements(By.TAG_NAME, "h1")
-                    for h1 in h1_elements:
-                        text = h1.text.strip()
-                        if len(text) > caption_length:
-                            caption_length = len(text)
-                except:
-                    pass
+                # Fecha, likes, comentarios, vídeo y caption en una sola llamada
+                metadata = extract_post_metadata(driver)
+                likes = metadata['likes']
+                comments = metadata['comments']
+                is_video = metadata['is_video']
                 
                 # Guardar datos
                 post_data = {
                     "post_number": idx,
                     "shortcode": shortcode,
-                    "date_utc": date_str,
+                    "date_utc": metadata['date_utc'] or datetime.now().isoformat(),
                     "likes": likes,
                     "comments": comments,
                     "is_video": is_video,
-                    "caption_length": caption_length,
+                    "caption_length": metadata['caption_length'],
                     "url": post_url
                 }
                 
                 posts_data.append(post_data)
+                metrics.incr('posts_extracted', source='dom')
+                metrics.incr('post_visits', result='ok' if likes else 'zero')
+                metrics.observe('phase_seconds', time.perf_counter() - visit_started, phase='post_visit')
                 
                 print(f"  ✅ Likes: {likes}, Comentarios: {comments}, Video: {is_video}\n")
                 
                 # Debug si no hay likes
                 if likes == 0:
-                    screenshot_path = os.path.join(DEBUG_FOLDER, f"post_{idx}_debug.png")
-                    driver.save_screenshot(screenshot_path)
-                    print(f"  ⚠ Screenshot guardado: {screenshot_path}\n")
-                
-                time.sleep(3)
+                    save_debug_screenshot(driver, idx)
                 
             except Exception as e:
                 print(f"  ⚠ Error: {e}\n")
@@ -271,52 +531,39 @@ def extract_profile_data(driver, profile_username, max_posts=50):
         print(f"❌ Error general: {e}")
         return posts_data
 
-def get_first_digit(number):
-    """Obtiene el primer dígito de un número"""
-    if number == 0:
-        return None
-    return int(str(abs(number))[0])
-
 def benford_expected_distribution():
     """Retorna la distribución esperada según la Ley de Benford"""
     return {i: math.log10(1 + 1/i) for i in range(1, 10)}
 
+@timed('analysis')
 def analyze_benford(data, field_name):
     """Analiza un campo de datos según la Ley de Benford"""
     print(f"\n📊 Analizando campo '{field_name}' con Ley de Benford...")
     
-    # Extraer primeros dígitos
-    first_digits = []
-    for item in data:
-        value = item.get(field_name, 0)
-        digit = get_first_digit(value)
-        if digit is not None:
-            first_digits.append(digit)
+    # Conteos de todas las pruebas de una vez (motor_benford)
+    tests = benford_tests([item.get(field_name, 0) for item in data])
+    first = tests['first']
     
-    if not first_digits:
+    if not first['total']:
         print(f"  ⚠ No hay datos suficientes para '{field_name}'")
         return None
     
-    # Contar frecuencias
-    digit_counts = Counter(first_digits)
-    total = len(first_digits)
-    
-    # Calcular distribución observada
-    observed_dist = {i: digit_counts.get(i, 0) / total for i in range(1, 10)}
+    total = first['total']
+    digit_counts = {int(d): int(c) for d, c in zip(first['digits'], first['counts']) if c}
     
-    # Distribución esperada (Benford)
+    # Distribución observada y esperada (Benford)
+    observed_dist = {int(d): float(p) for d, p in zip(first['digits'], first['observed'])}
     expected_dist = benford_expected_distribution()
     
-    # Calcular Chi-cuadrado para medir desviación
-    chi_squared = 0
-    for digit in range(1, 10):
-        expected_count = expected_dist[digit] * total
-        observed_count = digit_counts.get(digit, 0)
-        if expected_count > 0:
-            chi_squared += ((observed_count - expected_count) ** 2) / expected_count
+    # Chi-cuadrado y desviación promedio (MAD) para medir desviación
+    chi_squared = first['chi_squared']
+    avg_deviation = first['mad']
+    
+    # p-valores con el número de posts real (tabla Monte Carlo de valores_criticos.py)
+    get_critical_values().add_p_values(tests)
     
-    # Calcular desviación promedio
-    avg_deviation = sum(abs(observed_dist[i] - expected_dist[i]) for i in range(1, 10)) / 9
+    # Intervalos de confianza bootstrap de la desviación y de cada dígito
+    bootstrap = bootstrap_benford(first['counts'])
     
     return {
         "field": field_name,
@@ -325,9 +572,55 @@ def analyze_benford(data, field_name):
         "expected_distribution": expected_dist,
         "chi_squared": chi_squared,
         "avg_deviation": avg_deviation,
-        "digit_counts": dict(digit_counts)
+        "p_value": first['mad_p_value'],
+        "chi_squared_p_value": first['chi_squared_p_value'],
+        "digit_counts": digit_counts,
+        "tests": tests,
+        "bootstrap": bootstrap
     }
 
+def benford_points(p_values, points):
+    """Puntos de bot por la desviación de Benford: todos si p < 0.01, la mitad si p < 0.05"""
+    return np.where(p_values < 0.01, points, np.where(p_values < 0.05, points // 2, 0))
+
+def engagement_points(coefficient_variation):
+    """Puntos de bot por likes demasiado uniformes: 30 si CV < 0.15, 15 si CV < 0.25"""
+    return np.where(coefficient_variation < 0.15, 30, np.where(coefficient_variation < 0.25, 15, 0))
+
+def bootstrap_bot_score(posts_data, criteria, max_score, replicates=BOOTSTRAP_REPLICATES,
+                        confidence=BOOTSTRAP_CONFIDENCE, seed=None):
+    """Intervalo de confianza de la puntuación de bot (%) remuestreando los posts.
+
+    criteria: criterios que entraron en la puntuación ('likes', 'comments', 'engagement').
+    Cada réplica es una fila de índices de posts; todas se puntúan a la vez.
+    Sin seed, la semilla sale de los likes y comentarios (mismo CSV, mismo intervalo).
+    """
+    likes = np.array([post['likes'] for post in posts_data], dtype=np.int64)
+    comments = np.array([post['comments'] for post in posts_data], dtype=np.int64)
+    rng = np.random.default_rng(data_seed(likes, comments) if seed is None else seed)
+    rows = rng.integers(0, len(posts_data), (replicates, len(posts_data)))
+    critical_values = get_critical_values()
+    score = np.zeros(replicates)
+    
+    for field, values, points in (('likes', likes, 40), ('comments', comments, 30)):
+        if field in criteria:
+            counts = first_digit_counts_rows(values[rows])
+            totals = counts.sum(axis=1)
+            p_values = critical_values.p_values('first', 'mad', mad_rows(counts), totals)
+            # Misma regla que la puntuación: con menos de MIN_BENFORD_SAMPLES números no puntúa
+            score += np.where(totals >= MIN_BENFORD_SAMPLES, benford_points(p_values, points), 0)
+    
+    if 'engagement' in criteria:
+        sampled = likes[rows]
+        positive = sampled > 0
+        n = np.maximum(positive.sum(axis=1), 1)
+        mean = (sampled * positive).sum(axis=1) / n
+        std_dev = np.sqrt((((sampled - mean[:, None]) ** 2) * positive).sum(axis=1) / n)
+        coefficient_variation = np.divide(std_dev, mean, out=np.full(replicates, np.inf), where=mean > 0)
+        score += engagement_points(coefficient_variation)
+    
+    return percentile_interval(score / max_score * 100, confidence)
+
 def generate_benford_report(posts_data, profile_name):
     """Genera reporte completo con análisis de Benford"""
     print("\n" + "="*70)
@@ -353,7 +646,8 @@ def generate_benford_report(posts_data, profile_name):
     benford_filename = f"{profile_name}_analisis_benford.csv"
     with open(benford_filename, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
-        writer.writerow(["Campo", "Dígito", "Frecuencia Observada (%)", "Frecuencia Esperada (%)", "Desviación (%)"])
+        writer.writerow(["Campo", "Dígito", "Frecuencia Observada (%)", "Frecuencia Esperada (%)", "Desviación (%)",
+                         "IC bajo (%)", "IC alto (%)"])
         
         for analysis in [likes_analysis, comments_analysis]:
             if analysis:
@@ -362,13 +656,19 @@ def generate_benford_report(posts_data, profile_name):
                 writer.writerow([f"Total de muestras: {analysis['total_samples']}"])
                 writer.writerow([f"Chi-cuadrado: {analysis['chi_squared']:.4f}"])
                 writer.writerow([f"Desviación promedio: {analysis['avg_deviation']:.4f}"])
+                writer.writerow([f"p-valor (desviación): {analysis['p_value']:.4f}"])
+                low, high = analysis['bootstrap']['mad']
+                writer.writerow([f"IC {BOOTSTRAP_CONFIDENCE:.0%} desviación (bootstrap): {low:.4f} - {high:.4f}"])
                 writer.writerow([])
                 
                 for digit in range(1, 10):
                     obs = analysis['observed_distribution'][digit] * 100
                     exp = analysis['expected_distribution'][digit] * 100
                     dev = abs(obs - exp)
-                    writer.writerow([analysis['field'], digit, f"{obs:.2f}", f"{exp:.2f}", f"{dev:.2f}"])
+                    low = analysis['bootstrap']['observed_low'][digit - 1] * 100
+                    high = analysis['bootstrap']['observed_high'][digit - 1] * 100
+                    writer.writerow([analysis['field'], digit, f"{obs:.2f}", f"{exp:.2f}", f"{dev:.2f}",
+                                     f"{low:.2f}", f"{high:.2f}"])
     
     print(f"✓ Análisis de Benford guardado: {benford_filename}")
     
@@ -380,36 +680,40 @@ def generate_benford_report(posts_data, profile_name):
     bot_score = 0
     max_score = 0
     reasons = []
+    criteria = []
     
     # Criterio 1: Desviación de la Ley de Benford en likes
-    if likes_analysis and likes_analysis['total_samples'] >= 5:
+    if likes_analysis and likes_analysis['total_samples'] >= MIN_BENFORD_SAMPLES:
         max_score += 40
+        criteria.append('likes')
         deviation = likes_analysis['avg_deviation']
-        if deviation > 0.15:  # Desviación alta
-            bot_score += 40
-            reasons.append(f"❌ LIKES: Desviación alta de Benford ({deviation:.2%}). Distribución no natural.")
-        elif deviation > 0.10:
-            bot_score += 20
-            reasons.append(f"⚠️  LIKES: Desviación moderada de Benford ({deviation:.2%}). Sospechoso.")
+        p_value = likes_analysis['p_value']
+        bot_score += int(benford_points(p_value, 40))
+        if p_value < 0.01:  # Desviación que casi nunca se da por azar con este número de posts
+            reasons.append(f"❌ LIKES: Desviación alta de Benford ({deviation:.2%}, p={p_value:.3f}). Distribución no natural.")
+        elif p_value < 0.05:
+            reasons.append(f"⚠️  LIKES: Desviación moderada de Benford ({deviation:.2%}, p={p_value:.3f}). Sospechoso.")
         else:
-            reasons.append(f"✅ LIKES: Distribución natural de Benford ({deviation:.2%}).")
+            reasons.append(f"✅ LIKES: Distribución natural de Benford ({deviation:.2%}, p={p_value:.3f}).")
     
     # Criterio 2: Desviación de la Ley de Benford en comentarios
-    if comments_analysis and comments_analysis['total_samples'] >= 5:
+    if comments_analysis and comments_analysis['total_samples'] >= MIN_BENFORD_SAMPLES:
         max_score += 30
+        criteria.append('comments')
         deviation = comments_analysis['avg_deviation']
-        if deviation > 0.15:
-            bot_score += 30
-            reasons.append(f"❌ COMENTARIOS: Desviación alta de Benford ({deviation:.2%}). Distribución no natural.")
-        elif deviation > 0.10:
-            bot_score += 15
-            reasons.append(f"⚠️  COMENTARIOS: Desviación moderada ({deviation:.2%}). Sospechoso.")
+        p_value = comments_analysis['p_value']
+        bot_score += int(benford_points(p_value, 30))
+        if p_value < 0.01:
+            reasons.append(f"❌ COMENTARIOS: Desviación alta de Benford ({deviation:.2%}, p={p_value:.3f}). Distribución no natural.")
+        elif p_value < 0.05:
+            reasons.append(f"⚠️  COMENTARIOS: Desviación moderada ({deviation:.2%}, p={p_value:.3f}). Sospechoso.")
         else:
-            reasons.append(f"✅ COMENTARIOS: Distribución natural de Benford ({deviation:.2%}).")
+            reasons.append(f"✅ COMENTARIOS: Distribución natural de Benford ({deviation:.2%}, p={p_value:.3f}).")
     
     # Criterio 3: Patrones sospechosos en engagement
     if posts_data:
         max_score += 30
+        criteria.append('engagement')
         likes_list = [p['likes'] for p in posts_data if p['likes'] > 0]
         
         if likes_list:
@@ -418,12 +722,11 @@ def generate_benford_report(posts_data, profile_name):
             variance = sum((x - avg_likes) ** 2 for x in likes_list) / len(likes_list)
             std_dev = variance ** 0.5
             coefficient_variation = (std_dev / avg_likes) if avg_likes > 0 else 0
+            bot_score += int(engagement_points(coefficient_variation))
             
             if coefficient_variation < 0.15:  # Muy poca variación
-                bot_score += 30
                 reasons.append(f"❌ ENGAGEMENT: Likes muy uniformes (CV={coefficient_variation:.2f}). Comportamiento de bot.")
             elif coefficient_variation < 0.25:
-                bot_score += 15
                 reasons.append(f"⚠️  ENGAGEMENT: Variación baja en likes (CV={coefficient_variation:.2f}). Sospechoso.")
             else:
                 reasons.append(f"✅ ENGAGEMENT: Variación natural en likes (CV={coefficient_variation:.2f}).")
@@ -436,7 +739,10 @@ def generate_benford_report(posts_data, profile_name):
     print("\n" + "-"*70)
     if max_score > 0:
         percentage = (bot_score / max_score) * 100
-        print(f"📊 PUNTUACIÓN DE BOT: {bot_score}/{max_score} ({percentage:.1f}%)")
+        # Cuánto cambiaría la puntuación con otra muestra de posts del mismo perfil
+        score_interval = bootstrap_bot_score(posts_data, criteria, max_score)
+        print(f"📊 PUNTUACIÓN DE BOT: {bot_score}/{max_score} ({percentage:.1f}%, "
+              f"IC {BOOTSTRAP_CONFIDENCE:.0%}: {score_interval[0]:.0f}%-{score_interval[1]:.0f}%)")
         
         if percentage >= 70:
             conclusion = "🚨 ALTA PROBABILIDAD DE BOT"
@@ -452,6 +758,7 @@ def generate_benford_report(posts_data, profile_name):
     else:
         print("⚠️  No hay suficientes datos para determinar")
         percentage = 0
+        score_interval = None
         conclusion = "DATOS INSUFICIENTES"
         color = "GRIS"
     
@@ -468,6 +775,9 @@ def generate_benford_report(posts_data, profile_name):
         writer.writerow([])
         writer.writerow(["Puntuación de bot", f"{bot_score}/{max_score}"])
         writer.writerow(["Porcentaje", f"{percentage:.1f}%"])
+        if score_interval:
+            writer.writerow([f"Intervalo de confianza {BOOTSTRAP_CONFIDENCE:.0%} (bootstrap)",
+                             f"{score_interval[0]:.1f}% - {score_interval[1]:.1f}%"])
         writer.writerow(["Conclusión", conclusion])
         writer.writerow(["Nivel de alerta", color])
         writer.writerow([])
@@ -476,60 +786,105 @@ def generate_benford_report(posts_data, profile_name):
             writer.writerow([reason])
     
     print(f"\n✓ Conclusión guardada: {conclusion_filename}")
-
-def main():
-    """Función principal"""
-    # CONFIGURACIÓN
-    INSTAGRAM_USERNAME = "iamjohnyv13"
-    INSTAGRAM_PASSWORD = "Diana2809"  # ⚠️ Cambia esto
-    PROFILE_TO_ANALYZE = "jofre_a21"
-    MAX_POSTS = 50  # Cuántos posts analizar
-    
-    if INSTAGRAM_PASSWORD == "TU_CONTRASEÑA_AQUI":
-        print("❌ ERROR: Configura tu contraseña en la línea 407")
-        return
     
+    return {
+        'posts_analyzed': len(posts_data),
+        'bot_score': bot_score,
+        'max_score': max_score,
+        'bot_percentage': percentage,
+        'bot_percentage_interval': tuple(float(x) for x in score_interval) if score_interval else None,
+        'conclusion': conclusion,
+        'alert_level': color,
+    }
+
+def run_profile(profile, username, password, max_posts=50, capture_network=False, lean=False, record_mode=None,
+                metrics_textfile=None, post_tabs=1, post_interval=7.0, accounts_file="cuentas.json"):
+    """Analiza los posts de un perfil y devuelve la evaluación de bot.
+
+    Lanza RuntimeError si no se puede iniciar sesión o no se extraen datos,
+    para que quien la llame (main o el ejecutor por lotes, lotes.py) decida si reintentar.
+    """
+    start_session(record_mode, profile)
+    start_run(profile, 'posts_benford')
     driver = None
+    get_rate_limiter().configure('post', rate=1 / post_interval)
+    accounts = AccountPool.from_file(accounts_file)
+    if accounts:
+        accounts.configure('post', rate=1 / post_interval)
     
     try:
         print("="*70)
         print("🤖 DETECTOR DE BOTS DE INSTAGRAM - LEY DE BENFORD")
         print("="*70)
-        print(f"Perfil a analizar: @{PROFILE_TO_ANALYZE}")
-        print(f"Posts máximos: {MAX_POSTS}")
+        print(f"Perfil a analizar: @{profile}")
+        print(f"Posts máximos: {max_posts}")
         print("="*70)
         
         # Iniciar navegador
         print("\n🌐 Iniciando navegador Chrome...")
-        driver = setup_driver()
+        started_at = time.time()
+        driver = setup_driver(capture_network, lean)
         
         # Login
-        if not login_instagram(driver, INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD):
-            print("❌ No se pudo iniciar sesión")
-            return
+        if accounts:
+            logged_in = accounts.login_main(driver, login_instagram)
+        else:
+            logged_in = login_instagram(driver, username, password)
+        if not logged_in:
+            raise RuntimeError("No se pudo iniciar sesión")
+        print(f"⏱ Navegador listo y sesión iniciada en {time.time() - started_at:.1f}s\n")
         
         # Extraer datos
-        posts_data = extract_profile_data(driver, PROFILE_TO_ANALYZE, MAX_POSTS)
+        posts_data = extract_profile_data(driver, profile, max_posts, post_tabs, accounts)
         
         if not posts_data:
-            print("❌ No se extrajeron datos")
-            return
+            raise RuntimeError("No se extrajeron datos")
         
         # Analizar con Benford
-        generate_benford_report(posts_data, PROFILE_TO_ANALYZE)
+        report = generate_benford_report(posts_data, profile)
         
         print("\n✅ ¡Análisis completado exitosamente!")
-        
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+        return report
         
     finally:
+        get_rate_limiter().print_stats()
+        get_page_stats().print_summary(lean)
+        if accounts:
+            accounts.print_stats()
         if driver:
             print("\n🔒 Cerrando navegador...")
-            time.sleep(2)
+            pause(2)
             driver.quit()
+        stop_session()
+        finish_run(metrics_textfile)
+
+def main():
+    """Función principal"""
+    # CONFIGURACIÓN
+    INSTAGRAM_USERNAME = "iamjohnyv13"
+    INSTAGRAM_PASSWORD = "Diana2809"  # ⚠️ Cambia esto
+    PROFILE_TO_ANALYZE = "jofre_a21"
+    MAX_POSTS = 50  # Cuántos posts analizar
+    CAPTURE_NETWORK = False  # Leer los JSON de la página (logs de rendimiento de Chrome)
+    LEAN_MODE = False  # Chrome sin ventana, sin imágenes/vídeo/fuentes (más rápido)
+    RECORD_MODE = None  # 'grabar' o 'reproducir': ejecución sin conexión (ver grabacion.py)
+    METRICS_TEXTFILE = None  # Ruta .prom para el textfile collector de Prometheus (ver metricas.py)
+    POST_TABS = 1  # Posts cargando a la vez en pestañas (1 = uno detrás de otro)
+    POST_INTERVAL = 7.0  # Segundos entre visitas a posts (el limitador los alarga si hay bloqueos)
+    ACCOUNTS_FILE = "cuentas.json"  # Si existe, se reparten las visitas a posts entre sus cuentas
+    
+    if INSTAGRAM_PASSWORD == "TU_CONTRASEÑA_AQUI":
+        print("❌ ERROR: Configura tu contraseña en la línea 407")
+        return
+    
+    try:
+        run_profile(PROFILE_TO_ANALYZE, INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD, MAX_POSTS,
+                    CAPTURE_NETWORK, LEAN_MODE, RECORD_MODE, METRICS_TEXTFILE, POST_TABS, POST_INTERVAL,
+                    ACCOUNTS_FILE)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
 
 if __name__ == "__main__":
     main()
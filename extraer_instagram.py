@@ -1,46 +1,61 @@
 # guarda como extraer_instagram.py
 import instaloader
 import csv
+import queue
+import threading
 import time
 from datetime import timezone
-import random
-
-# Configuración más conservadora para evitar bloqueos
-L = instaloader.Instaloader(
-    download_pictures=False, 
-    download_comments=False, 
-    save_metadata=False,
-    max_connection_attempts=3,
-    request_timeout=300.0  # Tiempo de espera más largo
-)
-
-# Login
-try:
-    L.load_session_from_file("iamjohnyv13")
-    print("✓ Sesión cargada exitosamente")
-except Exception as e:
-    print(f"Error cargando sesión: {e}")
-    exit(1)
-
-profile_name = "jofre_a21"
-
-try:
+from limitador import get_rate_limiter
+from cuentas import AccountPool, Account
+from metricas import start_run, finish_run, get_metrics, timed
+
+ACCOUNTS_FILE = "cuentas.json"  # Si existe, cada cuenta extrae perfiles distintos en paralelo
+DEFAULT_SESSION = "iamjohnyv13"
+profile_names = ["jofre_a21"]
+max_posts = 50  # Limitar a 50 posts para evitar bloqueos
+
+
+class AccountCheckpoint(Exception):
+    """La cuenta cayó en un checkpoint de Instagram y hay que aparcarla"""
+
+
+def new_loader():
+    # Configuración más conservadora para evitar bloqueos
+    return instaloader.Instaloader(
+        download_pictures=False,
+        download_comments=False,
+        save_metadata=False,
+        max_connection_attempts=3,
+        request_timeout=300.0  # Tiempo de espera más largo
+    )
+
+
+def is_checkpoint(error):
+    message = str(error).lower()
+    return (isinstance(error, instaloader.exceptions.LoginRequiredException)
+            or 'checkpoint' in message or 'challenge' in message)
+
+
+@timed('profile_extract')
+def extract_posts(L, profile_name, limiter, max_posts=max_posts):
+    """Extrae hasta max_posts posts de un perfil con la sesión L"""
     print(f"Obteniendo perfil de {profile_name}...")
     profile = instaloader.Profile.from_username(L.context, profile_name)
     print(f"✓ Perfil encontrado: {profile.full_name}")
     print(f"  Posts totales: {profile.mediacount}")
-    
+
     rows = []
     post_count = 0
-    max_posts = 50  # Limitar a 50 posts para evitar bloqueos
-    
-    print(f"\nExtrayendo hasta {max_posts} posts (esto tomará varios minutos)...")
-    
+
+    print(f"\nExtrayendo hasta {max_posts} posts de {profile_name} (esto tomará varios minutos)...")
+
     for post in profile.get_posts():
         if post_count >= max_posts:
             break
-            
+
         try:
+            # Turno del limitador (15-25 s por post, más si Instagram ha frenado)
+            limiter.wait('instaloader_post')
             rows.append({
                 "shortcode": post.shortcode,
                 "date_utc": post.date_utc.isoformat(),
@@ -51,22 +66,25 @@ try:
                 "caption_length": len(post.caption or "")
             })
             post_count += 1
-            print(f"  ✓ Post {post_count}/{max_posts} extraído")
-            
-            # Espera aleatoria entre 15-25 segundos para parecer más humano
-            wait_time = random.uniform(15, 25)
-            time.sleep(wait_time)
-            
+            get_metrics().incr('posts_extracted', source='instaloader')
+            print(f"  ✓ [{profile_name}] Post {post_count}/{max_posts} extraído")
+            limiter.report_success('instaloader_post')
+
         except instaloader.exceptions.ConnectionException as e:
             print(f"\n⚠ Error de conexión en post {post_count}: {e}")
-            print("Esperando 5 minutos antes de continuar...")
-            time.sleep(300)  # Espera 5 minutos si hay error
-            
+            if is_checkpoint(e):
+                raise AccountCheckpoint(str(e))
+            # El limitador pausa el siguiente turno (5 min, el doble si se repite) y baja la tasa
+            limiter.report_throttle('instaloader_post', 'ConnectionException')
+
         except Exception as e:
             print(f"\n⚠ Error inesperado: {e}")
             continue
 
-    # Guardar CSV
+    return rows
+
+
+def save_rows(profile_name, rows):
     if rows:
         filename = f"{profile_name}_posts.csv"
         with open(filename, "w", newline="", encoding="utf-8") as f:
@@ -76,14 +94,122 @@ try:
         print(f"\n✓ CSV generado: {filename}")
         print(f"✓ Total de posts extraídos: {len(rows)}")
     else:
-        print("\n⚠ No se extrajeron posts")
-        
-except instaloader.exceptions.ConnectionException as e:
-    print(f"\n❌ Error de conexión: {e}")
-    print("\n💡 Soluciones:")
-    print("  1. Espera 30-60 minutos antes de intentar de nuevo")
-    print("  2. Instagram ha detectado demasiadas solicitudes")
-    print("  3. Considera usar la cuenta desde tu navegador para 'normalizar' la actividad")
-    
-except Exception as e:
-    print(f"\n❌ Error: {e}")
+        print(f"\n⚠ No se extrajeron posts de {profile_name}")
+
+
+@timed('login')
+def load_sessions(accounts):
+    """Carga la sesión de instaloader de cada cuenta activa; aparca las que fallan"""
+    sessions = []
+    for account in accounts.active():
+        L = new_loader()
+        try:
+            L.load_session_from_file(account.username, account.session_file)
+            print(f"✓ Sesión de @{account.username} cargada exitosamente")
+            sessions.append((L, account))
+        except Exception as e:
+            print(f"Error cargando sesión de @{account.username}: {e}")
+            accounts.park(account, 'sesión inválida')
+    return sessions
+
+
+def run_profiles(names, max_posts=max_posts, accounts_file=ACCOUNTS_FILE, default_session=DEFAULT_SESSION,
+                 metrics_textfile=None):
+    """Extrae los posts de varios perfiles repartiéndolos entre las cuentas.
+
+    Devuelve un diccionario perfil -> número de posts extraídos (solo los
+    perfiles que llegaron a extraerse). Lanza RuntimeError si no hay ninguna
+    sesión disponible.
+    """
+    start_run(names[0] if len(names) == 1 else "varios", 'posts_instaloader')
+    try:
+        return _extract_with_accounts(names, max_posts, accounts_file, default_session)
+    finally:
+        finish_run(metrics_textfile)
+
+
+def _extract_with_accounts(names, max_posts, accounts_file, default_session):
+    accounts = AccountPool.from_file(accounts_file)
+    if accounts is None:
+        # Una sola cuenta con el limitador compartido, como siempre
+        account = Account(default_session)
+        account.limiter = get_rate_limiter()
+        accounts = AccountPool([account], state_path=None)
+
+    sessions = load_sessions(accounts)
+    if not sessions:
+        raise RuntimeError("Error cargando sesión: no hay ninguna cuenta disponible")
+
+    # Cada cuenta toma perfiles de una cola común; si cae en un checkpoint
+    # se aparca y el perfil vuelve a la cola para otra cuenta
+    work = queue.Queue()
+    for profile_name in names:
+        work.put(profile_name)
+    extracted = {}
+
+    def worker(L, account):
+        while True:
+            try:
+                profile_name = work.get_nowait()
+            except queue.Empty:
+                return
+            started = time.monotonic()
+            try:
+                rows = extract_posts(L, profile_name, account.limiter, max_posts)
+                save_rows(profile_name, rows)
+                extracted[profile_name] = len(rows)
+                account.completed += len(rows)
+            except AccountCheckpoint:
+                accounts.park(account, 'checkpoint')
+                work.put(profile_name)
+                return
+            except (instaloader.exceptions.ConnectionException,
+                    instaloader.exceptions.LoginRequiredException) as e:
+                if is_checkpoint(e):
+                    accounts.park(account, 'checkpoint')
+                    work.put(profile_name)
+                    return
+                print(f"\n❌ Error de conexión: {e}")
+                print("\n💡 Soluciones:")
+                print("  1. Espera 30-60 minutos antes de intentar de nuevo")
+                print("  2. Instagram ha detectado demasiadas solicitudes")
+                print("  3. Considera usar la cuenta desde tu navegador para 'normalizar' la actividad")
+            except Exception as e:
+                print(f"\n❌ Error: {e}")
+            finally:
+                account.busy_seconds += time.monotonic() - started
+
+    threads = [threading.Thread(target=worker, args=session, daemon=True) for session in sessions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if not work.empty():
+        print(f"\n⚠ Perfiles sin extraer (todas las cuentas aparcadas): {list(work.queue)}")
+    for _, account in sessions:
+        account.limiter.print_stats()
+    if len(accounts.accounts) > 1:
+        accounts.print_stats()
+    return extracted
+
+
+def run_profile(profile, max_posts=max_posts, accounts_file=ACCOUNTS_FILE, default_session=DEFAULT_SESSION,
+                metrics_textfile=None):
+    """Extrae los posts de un solo perfil; usado por el ejecutor por lotes (lotes.py)"""
+    extracted = run_profiles([profile], max_posts, accounts_file, default_session, metrics_textfile)
+    if profile not in extracted:
+        raise RuntimeError(f"No se extrajeron posts de {profile}")
+    return {'posts_extracted': extracted[profile]}
+
+
+def main():
+    try:
+        run_profiles(profile_names)
+    except RuntimeError as e:
+        print(e)
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
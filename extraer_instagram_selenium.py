@@ -3,26 +3,39 @@ Extractor de Instagram usando Selenium (método alternativo sin API)
 Simula un navegador real para evitar bloqueos de rate limiting
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 import csv
 import json
 import os
 from datetime import datetime
+from captura_red import enable_network_capture, NetworkCapture, get_network_capture
+from sesion_navegador import create_chrome, restore_session, save_session
+from grabacion import start_session, stop_session, wrap_driver
+from navegador_ligero import apply_lean_options, enable_request_blocking, get_page_stats, record_visit
+from limitador import get_rate_limiter, pause
+from pestanas_posts import TabPool
+from pool_navegadores import BrowserPool
+from cuentas import AccountPool
+from descubrir_posts import discover_post_urls, shortcode_from_url
+from metricas import start_run, finish_run, get_metrics, timed, count_strategy
 
 # Crear carpeta para screenshots de debug
 DEBUG_FOLDER = "debug_screenshots"
 if not os.path.exists(DEBUG_FOLDER):
     os.makedirs(DEBUG_FOLDER)
 
-def setup_driver():
-    """Configura el navegador Chrome con opciones para evitar detección"""
+def setup_driver(capture_network=False, lean=False):
+    """Configura el navegador Chrome con opciones para evitar detección.
+
+    capture_network=True captura los JSON que descarga la página (ver captura_red.py)
+    lean=True usa el modo ligero: sin ventana, carga 'eager' y sin imágenes,
+    vídeo, fuentes ni analítica (ver navegador_ligero.py)
+    Con una grabación o reproducción activa el driver va envuelto (ver grabacion.py)
+    """
     chrome_options = Options()
     
     # Opciones para evitar detección como bot
@@ -36,22 +49,40 @@ def setup_driver():
     # Opcional: ejecutar en modo headless (sin ventana visible)
     # chrome_options.add_argument('--headless')
     
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=chrome_options
-    )
+    if capture_network:
+        enable_network_capture(chrome_options)
+    if lean:
+        apply_lean_options(chrome_options)
+    
+    driver = create_chrome(chrome_options)
+    driver.lean = lean
+    if lean:
+        enable_request_blocking(driver)
     
     # Eliminar la propiedad webdriver
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    if capture_network:
+        driver.network_capture = NetworkCapture(driver)
     
-    return driver
+    return wrap_driver(driver)
 
+@timed('login')
 def login_instagram(driver, username, password):
     """Inicia sesión en Instagram"""
+    # Reproducción de una grabación: no hay nada en lo que iniciar sesión
+    if getattr(driver, 'replaying', False):
+        print("✓ Reproduciendo grabación (sin login)")
+        return True
+    
+    # Sesión guardada de una ejecución anterior: no hace falta volver a hacer login
+    if restore_session(driver, username):
+        print("✓ Sesión restaurada (sin login)")
+        return True
+    
     print("🔐 Iniciando sesión en Instagram...")
     
     driver.get("https://www.instagram.com/accounts/login/")
-    time.sleep(3)
+    pause(3)
     
     try:
         # Esperar y llenar el formulario de login
@@ -61,16 +92,16 @@ def login_instagram(driver, username, password):
         password_input = driver.find_element(By.NAME, "password")
         
         username_input.send_keys(username)
-        time.sleep(1)
+        pause(1)
         password_input.send_keys(password)
-        time.sleep(1)
+        pause(1)
         
         # Click en botón de login
         login_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
         login_button.click()
         
         print("⏳ Esperando confirmación de login...")
-        time.sleep(8)
+        pause(8)
         
         # Manejar popup "Guardar información de inicio de sesión"
         try:
@@ -78,7 +109,7 @@ def login_instagram(driver, username, password):
                 EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Ahora no') or contains(text(), 'Not now')]"))
             )
             not_now_button.click()
-            time.sleep(2)
+            pause(2)
         except:
             print("⚠ No apareció popup de guardar login")
         
@@ -88,10 +119,11 @@ def login_instagram(driver, username, password):
                 EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Ahora no') or contains(text(), 'Not now')]"))
             )
             not_now_button.click()
-            time.sleep(2)
+            pause(2)
         except:
             print("⚠ No apareció popup de notificaciones")
         
+        save_session(driver, username)
         print("✓ Login exitoso")
         return True
         
@@ -99,188 +131,307 @@ def login_instagram(driver, username, password):
         print(f"❌ Error en login: {e}")
         return False
 
-def extract_profile_posts(driver, profile_username):
-    """Extrae datos de posts de un perfil"""
+def extract_post_fields(driver, shortcode):
+    """Lee fecha, likes, comentarios, vídeo y caption del post abierto en el navegador"""
+    # Extraer fecha (del atributo datetime)
+    try:
+        date_element = driver.find_element(By.CSS_SELECTOR, "time[datetime]")
+        date_str = date_element.get_attribute("datetime")
+    except:
+        date_str = datetime.now().isoformat()
+    
+    # Extraer likes - Múltiples estrategias
+    likes = 0
+    try:
+        # Estrategia 1: Buscar por texto "Me gusta" o "likes"
+        page_source = driver.page_source
+        
+        # Buscar en secciones específicas con diferentes selectores
+        selectors = [
+            "section > div > span > a > span",  # Contador de likes
+            "a[href*='/liked_by/'] span",
+            "section span[class*='_']",
+            "button span",
+        ]
+        
+        for selector in selectors:
+            try:
+                elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                for element in elements:
+                    text = element.text.strip()
+                    # Buscar números que indiquen likes
+                    if any(word in text.lower() for word in ['gusta', 'like', 'me gusta']):
+                        # Extraer el número
+                        numbers = ''.join(filter(str.isdigit, text.replace(',', '').replace('.', '')))
+                        if numbers:
+                            likes = count_strategy('selector', int(numbers), 'likes_strategy')
+                            break
+                if likes > 0:
+                    break
+            except:
+                continue
+        
+        # Estrategia 2: Si no encontró, buscar directamente en el texto visible
+        if likes == 0:
+            try:
+                # Buscar el elemento que contiene "46 Me gusta"
+                all_text = driver.find_elements(By.TAG_NAME, "span")
+                for span in all_text:
+                    text = span.text.strip()
+                    if 'gusta' in text.lower() or 'like' in text.lower():
+                        numbers = ''.join(filter(str.isdigit, text.replace(',', '').replace('.', '')))
+                        if numbers and len(numbers) < 10:  # Evitar IDs largos
+                            likes = count_strategy('span', int(numbers), 'likes_strategy')
+                            break
+            except:
+                pass
+        
+        # Si no se encontraron likes, guardar screenshot para debug
+        if likes == 0:
+            screenshot_path = os.path.join(DEBUG_FOLDER, f"post_{shortcode}_nolikes.png")
+            driver.save_screenshot(screenshot_path)
+            print(f"  ⚠ No se encontraron likes - Screenshot guardado: {screenshot_path}")
+            
+            # Intentar imprimir el HTML relevante para debugging
+            try:
+                sections = driver.find_elements(By.TAG_NAME, "section")
+                if len(sections) >= 2:
+                    print(f"  🔍 DEBUG: Texto visible en la sección de likes:")
+                    section_text = sections[1].text[:200]  # Primeros 200 caracteres
+                    print(f"     {section_text}...")
+            except:
+                pass
+        else:
+            print(f"  ✅ Likes encontrados: {likes}")
+        
+    except Exception as e:
+        print(f"  ⚠ Error extrayendo likes: {e}")
+        likes = 0
+    
+    # Extraer comentarios
+    try:
+        # Buscar el número de comentarios en el texto
+        all_text = driver.find_elements(By.TAG_NAME, "span")
+        comments = 0
+        for span in all_text:
+            text = span.text.strip()
+            if 'comentario' in text.lower() or 'comment' in text.lower():
+                numbers = ''.join(filter(str.isdigit, text.replace(',', '').replace('.', '')))
+                if numbers and len(numbers) < 10:
+                    comments = int(numbers)
+                    break
+        print(f"  → Comentarios encontrados: {comments}")
+    except Exception as e:
+        print(f"  ⚠ Error extrayendo comentarios: {e}")
+        comments = 0
+    
+    # Detectar si es video
+    try:
+        video_element = driver.find_element(By.CSS_SELECTOR, "video")
+        is_video = True
+    except:
+        is_video = False
+    
+    # Extraer caption
+    try:
+        # Múltiples estrategias para el caption
+        caption_text = ""
+        selectors_caption = [
+            "h1",
+            "div[class*='_a9zs'] span",
+            "span[class*='_ap3a']",
+        ]
+        
+        for selector in selectors_caption:
+            try:
+                caption_element = driver.find_element(By.CSS_SELECTOR, selector)
+                caption_text = caption_element.text
+                if len(caption_text) > 10:  # Si encontró texto significativo
+                    break
+            except:
+                continue
+        
+        caption_length = len(caption_text)
+        print(f"  → Caption length: {caption_length}")
+    except Exception as e:
+        print(f"  ⚠ Error extrayendo caption: {e}")
+        caption_length = 0
+    
+    return {
+        'date_utc': date_str,
+        'likes': likes,
+        'comments': comments,
+        'is_video': is_video,
+        'caption_length': caption_length,
+    }
+
+def build_post_data(shortcode, post_url, fields):
+    """Fila de un post leído de la página (mismas columnas que los posts de la red)"""
+    return {
+        "shortcode": shortcode,
+        "date_utc": fields['date_utc'],
+        "likes": fields['likes'],
+        "comments": fields['comments'],
+        "is_video": fields['is_video'],
+        "video_views": None,  # Difícil de extraer con Selenium
+        "caption_length": fields['caption_length'],
+        "url": post_url
+    }
+
+def post_from_network(captured, post_url):
+    """Fila de un post con los datos del JSON capturado de la red"""
+    post_data = dict(captured, url=post_url)
+    post_data['date_utc'] = post_data['date_utc'] or datetime.now().isoformat()
+    return post_data
+
+def visit_posts_in_tabs(driver, post_urls, tabs, capture=None, accounts=None):
+    """Visita varios posts a la vez en pestañas del mismo navegador (ver pestanas_posts.py).
+
+    post_urls puede ser el generador de discover_post_urls: la pestaña del
+    perfil sigue descubriendo posts mientras las demás los visitan. Devuelve
+    las filas en orden del feed; los posts que ya trae la captura de red no se visitan.
+    Con accounts (AccountPool con varias cuentas activas) los posts se reparten
+    entre un navegador por cuenta, cada uno con su limitador (pool_navegadores.py);
+    una cuenta que cae en un checkpoint se aparca y sus posts pasan a las demás.
+    """
+    metrics = get_metrics()
+    in_tabs = not accounts
+    shortcodes = {}
+    positions = {}
+    posts_data = []
+    
+    def to_visit():
+        for position, post_url in enumerate(post_urls):
+            positions[post_url] = position
+            shortcode = shortcode_from_url(post_url)
+            if capture and shortcode not in capture.posts:
+                capture.drain()
+            if capture and shortcode in capture.posts:
+                post_data = post_from_network(capture.posts[shortcode], post_url)
+                posts_data.append(post_data)
+                metrics.incr('posts_extracted', source='red')
+                print(f"📸 Post: {post_url}")
+                print(f"  📡 RESUMEN (JSON): {post_data['likes']} likes, {post_data['comments']} comentarios, "
+                      f"Video: {post_data['is_video']}, Caption: {post_data['caption_length']} caracteres\n")
+                continue
+            shortcodes[post_url] = shortcode
+            yield post_url
+    
+    def read_post(driver, post_url):
+        print(f"📸 Extrayendo post: {post_url}")
+        if not in_tabs:
+            # Navegador de una cuenta: BrowserPool ya esperó su turno, falta cargar el post
+            driver.get(post_url)
+            pause(5)
+        return extract_post_fields(driver, shortcodes[post_url])
+    
+    def report(idx, post_url, fields):
+        if not fields:
+            print(f"  ⚠ Error extrayendo post: {post_url}\n")
+            return
+        post_data = build_post_data(shortcodes[post_url], post_url, fields)
+        posts_data.append(post_data)
+        metrics.incr('posts_extracted', source='dom')
+        if in_tabs:  # en el pool de cuentas las visitas ya las cuenta BrowserPool
+            metrics.incr('post_visits', result='ok' if fields['likes'] else 'zero')
+        print(f"  ✅ RESUMEN: {post_data['likes']} likes, {post_data['comments']} comentarios, "
+              f"Video: {post_data['is_video']}, Caption: {post_data['caption_length']} caracteres\n")
+    
+    if in_tabs:
+        with TabPool(driver, tabs, use_main_tab=False) as pool:
+            print(f"   Pestañas en paralelo: {len(pool.handles)}\n")
+            pool.map(read_post, to_visit(), on_result=report)
+    else:
+        urls = list(to_visit())
+        setup_driver_fn = lambda: setup_driver(capture is not None, getattr(driver, 'lean', False))
+        with BrowserPool(driver, setup_driver_fn, endpoint='post', accounts=accounts,
+                         login_fn=login_instagram) as pool:
+            print(f"   Cuentas en paralelo: {len(pool.drivers)}\n")
+            pool.map(read_post, urls, on_result=report, default=None)
+            unvisited = [urls[idx] for idx in pool.unvisited]
+        if unvisited:
+            print(f"⚠ Posts sin visitar (todas las cuentas aparcadas): {unvisited}\n")
+    posts_data.sort(key=lambda post: positions[post['url']])
+    return posts_data
+
+def extract_profile_posts(driver, profile_username, max_posts=50, post_tabs=1, accounts=None):
+    """Extrae datos de hasta max_posts posts de un perfil, del más reciente al más antiguo.
+
+    Con post_tabs > 1 los posts se cargan de varios en varios en pestañas; con
+    varias cuentas activas (accounts) se reparten entre un navegador por cuenta.
+    """
     print(f"\n📊 Extrayendo posts de @{profile_username}...")
     
     # Ir al perfil
     driver.get(f"https://www.instagram.com/{profile_username}/")
-    time.sleep(5)
+    pause(5)
     
     posts_data = []
+    limiter = get_rate_limiter()
+    metrics = get_metrics()
     
     try:
         # Obtener todos los enlaces de posts
         print("🔍 Buscando posts en el perfil...")
         
-        # Scroll para cargar todos los posts (útil si hay muchos)
-        last_height = driver.execute_script("return document.body.scrollHeight")
-        for _ in range(3):  # Hacer scroll 3 veces
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
+        # Scroll hasta reunir max_posts o llegar al final de la cuadrícula, en orden del feed
+        discovered = discover_post_urls(driver, max_posts)
         
-        # Encontrar todos los enlaces de posts
-        post_links = driver.find_elements(By.CSS_SELECTOR, "a[href*='/p/']")
-        post_urls = list(set([link.get_attribute('href') for link in post_links]))
+        # Con captura de red, los JSON del feed ya traen likes/comentarios exactos
+        capture = get_network_capture(driver)
         
+        if accounts and len(accounts.active()) > 1:
+            # Un navegador por cuenta, cada uno con su propio ritmo
+            return visit_posts_in_tabs(driver, discovered, post_tabs, capture, accounts)
+        if post_tabs > 1:
+            # Los posts se visitan en pestañas mientras se siguen descubriendo
+            return visit_posts_in_tabs(driver, discovered, post_tabs, capture)
+        
+        post_urls = list(discovered)
         print(f"✓ Encontrados {len(post_urls)} posts\n")
         
+        if capture:
+            capture.drain()
+            print(f"📡 Posts decodificados de la red: {len(capture.posts)}\n")
+        
         # Visitar cada post individualmente
         for idx, post_url in enumerate(post_urls, 1):
             print(f"📸 Extrayendo post {idx}/{len(post_urls)}: {post_url}")
             
+            # Extraer shortcode de la URL
+            shortcode = shortcode_from_url(post_url)
+            if capture and shortcode in capture.posts:
+                post_data = post_from_network(capture.posts[shortcode], post_url)
+                posts_data.append(post_data)
+                metrics.incr('posts_extracted', source='red')
+                print(f"  📡 RESUMEN (JSON): {post_data['likes']} likes, {post_data['comments']} comentarios, "
+                      f"Video: {post_data['is_video']}, Caption: {post_data['caption_length']} caracteres\n")
+                continue
+            
             try:
+                limiter.wait('post')
+                visit_started = time.perf_counter()
                 driver.get(post_url)
-                time.sleep(5)  # Esperar a que cargue completamente
-                
-                # Extraer shortcode de la URL
-                shortcode = post_url.split('/p/')[1].rstrip('/')
+                pause(5)  # Esperar a que cargue completamente
+                if limiter.check_page(driver, 'post'):
+                    # Tras la pausa que impone el limitador se reintenta una vez
+                    limiter.wait('post')
+                    driver.get(post_url)
+                    pause(5)
+                record_visit(driver, post_url)
                 
-                # Extraer fecha (del atributo datetime)
-                try:
-                    date_element = driver.find_element(By.CSS_SELECTOR, "time[datetime]")
-                    date_str = date_element.get_attribute("datetime")
-                except:
-                    date_str = datetime.now().isoformat()
-                
-                # Extraer likes - Múltiples estrategias
-                likes = 0
-                try:
-                    # Estrategia 1: Buscar por texto "Me gusta" o "likes"
-                    page_source = driver.page_source
-                    
-                    # Buscar en secciones específicas con diferentes selectores
-                    selectors = [
-                        "section > div > span > a > span",  # Contador de likes
-                        "a[href*='/liked_by/'] span",
-                        "section span[class*='_']",
-                        "button span",
-                    ]
-                    
-                    for selector in selectors:
-                        try:
-                            elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                            for element in elements:
-                                text = element.text.strip()
-                                # Buscar números que indiquen likes
-                                if any(word in text.lower() for word in ['gusta', 'like', 'me gusta']):
-                                    # Extraer el número
-                                    numbers = ''.join(filter(str.isdigit, text.replace(',', '').replace('.', '')))
-                                    if numbers:
-                                        likes = int(numbers)
-                                        break
-                            if likes > 0:
-                                break
-                        except:
-                            continue
-                    
-                    # Estrategia 2: Si no encontró, buscar directamente en el texto visible
-                    if likes == 0:
-                        try:
-                            # Buscar el elemento que contiene "46 Me gusta"
-                            all_text = driver.find_elements(By.TAG_NAME, "span")
-                            for span in all_text:
-                                text = span.text.strip()
-                                if 'gusta' in text.lower() or 'like' in text.lower():
-                                    numbers = ''.join(filter(str.isdigit, text.replace(',', '').replace('.', '')))
-                                    if numbers and len(numbers) < 10:  # Evitar IDs largos
-                                        likes = int(numbers)
-                                        break
-                        except:
-                            pass
-                    
-                    # Si no se encontraron likes, guardar screenshot para debug
-                    if likes == 0:
-                        screenshot_path = os.path.join(DEBUG_FOLDER, f"post_{shortcode}_nolikes.png")
-                        driver.save_screenshot(screenshot_path)
-                        print(f"  ⚠ No se encontraron likes - Screenshot guardado: {screenshot_path}")
-                        
-                        # Intentar imprimir el HTML relevante para debugging
-                        try:
-                            sections = driver.find_elements(By.TAG_NAME, "section")
-                            if len(sections) >= 2:
-                                print(f"  🔍 DEBUG: Texto visible en la sección de likes:")
-                                section_text = sections[1].text[:200]  # Primeros 200 caracteres
-                                print(f"     {section_text}...")
-                        except:
-                            pass
-                    else:
-                        print(f"  ✅ Likes encontrados: {likes}")
-                    
-                except Exception as e:
-                    print(f"  ⚠ Error extrayendo likes: {e}")
-                    likes = 0
-                
-                # Extraer comentarios
-                try:
-                    # Buscar el número de comentarios en el texto
-                    all_text = driver.find_elements(By.TAG_NAME, "span")
-                    comments = 0
-                    for span in all_text:
-                        text = span.text.strip()
-                        if 'comentario' in text.lower() or 'comment' in text.lower():
-                            numbers = ''.join(filter(str.isdigit, text.replace(',', '').replace('.', '')))
-                            if numbers and len(numbers) < 10:
-                                comments = int(numbers)
-                                break
-                    print(f"  → Comentarios encontrados: {comments}")
-                except Exception as e:
-                    print(f"  ⚠ Error extrayendo comentarios: {e}")
-                    comments = 0
-                
-                # Detectar si es video
-                try:
-                    video_element = driver.find_element(By.CSS_SELECTOR, "video")
-                    is_video = True
-                except:
-                    is_video = False
-                
-                # Extraer caption
-                try:
-                    # Múltiples estrategias para el caption
-                    caption_text = ""
-                    selectors_caption = [
-                        "h1",
-                        "div[class*='_a9zs'] span",
-                        "span[class*='_ap3a']",
-                    ]
-                    
-                    for selector in selectors_caption:
-                        try:
-                            caption_element = driver.find_element(By.CSS_SELECTOR, selector)
-                            caption_text = caption_element.text
-                            if len(caption_text) > 10:  # Si encontró texto significativo
-                                break
-                        except:
-                            continue
-                    
-                    caption_length = len(caption_text)
-                    print(f"  → Caption length: {caption_length}")
-                except Exception as e:
-                    print(f"  ⚠ Error extrayendo caption: {e}")
-                    caption_length = 0
+                fields = extract_post_fields(driver, shortcode)
+                likes = fields['likes']
                 
                 # Guardar datos
-                post_data = {
-                    "shortcode": shortcode,
-                    "date_utc": date_str,
-                    "likes": likes,
-                    "comments": comments,
-                    "is_video": is_video,
-                    "video_views": None,  # Difícil de extraer con Selenium
-                    "caption_length": caption_length,
-                    "url": post_url
-                }
+                post_data = build_post_data(shortcode, post_url, fields)
                 
                 posts_data.append(post_data)
-                print(f"  ✅ RESUMEN: {likes} likes, {comments} comentarios, Video: {is_video}, Caption: {caption_length} caracteres\n")
-                
-                # Espera aleatoria para simular comportamiento humano
-                time.sleep(3)
+                metrics.incr('posts_extracted', source='dom')
+                metrics.incr('post_visits', result='ok' if likes else 'zero')
+                metrics.observe('phase_seconds', time.perf_counter() - visit_started, phase='post_visit')
+                print(f"  ✅ RESUMEN: {likes} likes, {post_data['comments']} comentarios, Video: {post_data['is_video']}, "
+                      f"Caption: {post_data['caption_length']} caracteres\n")
                 
             except Exception as e:
                 print(f"  ⚠ Error extrayendo post: {e}")
@@ -306,49 +457,85 @@ def save_to_csv(data, filename):
     print(f"\n✓ Datos guardados en: {filename}")
     print(f"✓ Total de posts: {len(data)}")
 
-def main():
-    """Función principal"""
-    # CONFIGURACIÓN
-    INSTAGRAM_USERNAME = "iamjohnyv13"  # Tu usuario de Instagram
-    INSTAGRAM_PASSWORD = "Diana2809"  # ⚠️ CAMBIA ESTO
-    PROFILE_TO_EXTRACT = "nicole.az13"
-    
-    # Verificar que se configuró la contraseña
-    if INSTAGRAM_PASSWORD == "TU_CONTRASEÑA_AQUI":
-        print("❌ ERROR: Debes configurar tu contraseña en la línea 226")
-        print("   Edita el archivo y cambia INSTAGRAM_PASSWORD por tu contraseña real")
-        return
-    
+def run_profile(profile, username, password, capture_network=False, lean=False, record_mode=None,
+                metrics_textfile=None, post_tabs=1, post_interval=7.0, max_posts=50, accounts_file="cuentas.json"):
+    """Extrae los posts de un perfil a CSV y devuelve un resumen.
+
+    Lanza RuntimeError si no se puede iniciar sesión, para que quien la llame
+    (main o el ejecutor por lotes, lotes.py) decida si reintentar.
+    """
+    start_session(record_mode, profile)
+    start_run(profile, 'posts_selenium')
     driver = None
+    get_rate_limiter().configure('post', rate=1 / post_interval)
+    accounts = AccountPool.from_file(accounts_file)
+    if accounts:
+        accounts.configure('post', rate=1 / post_interval)
     
     try:
         # Configurar navegador
         print("🌐 Iniciando navegador Chrome...")
-        driver = setup_driver()
+        started_at = time.time()
+        driver = setup_driver(capture_network, lean)
         
         # Login
-        if not login_instagram(driver, INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD):
-            print("❌ No se pudo iniciar sesión")
-            return
+        if accounts:
+            logged_in = accounts.login_main(driver, login_instagram)
+        else:
+            logged_in = login_instagram(driver, username, password)
+        if not logged_in:
+            raise RuntimeError("No se pudo iniciar sesión")
+        print(f"⏱ Navegador listo y sesión iniciada en {time.time() - started_at:.1f}s\n")
         
         # Extraer posts
-        posts = extract_profile_posts(driver, PROFILE_TO_EXTRACT)
+        posts = extract_profile_posts(driver, profile, max_posts, post_tabs, accounts)
         
         # Guardar a CSV
         if posts:
-            filename = f"{PROFILE_TO_EXTRACT}_posts_selenium.csv"
+            filename = f"{profile}_posts_selenium.csv"
             save_to_csv(posts, filename)
         
         print("\n✅ Proceso completado exitosamente")
-        
-    except Exception as e:
-        print(f"❌ Error general: {e}")
+        return {'posts_extracted': len(posts)}
         
     finally:
+        get_rate_limiter().print_stats()
+        get_page_stats().print_summary(lean)
+        if accounts:
+            accounts.print_stats()
         if driver:
             print("\n🔒 Cerrando navegador...")
-            time.sleep(2)
+            pause(2)
             driver.quit()
+        stop_session()
+        finish_run(metrics_textfile)
+
+def main():
+    """Función principal"""
+    # CONFIGURACIÓN
+    INSTAGRAM_USERNAME = "iamjohnyv13"  # Tu usuario de Instagram
+    INSTAGRAM_PASSWORD = "Diana2809"  # ⚠️ CAMBIA ESTO
+    PROFILE_TO_EXTRACT = "nicole.az13"
+    CAPTURE_NETWORK = False  # Leer los JSON de la página (logs de rendimiento de Chrome)
+    LEAN_MODE = False  # Chrome sin ventana, sin imágenes/vídeo/fuentes (más rápido)
+    RECORD_MODE = None  # 'grabar' o 'reproducir': ejecución sin conexión (ver grabacion.py)
+    METRICS_TEXTFILE = None  # Ruta .prom para el textfile collector de Prometheus (ver metricas.py)
+    POST_TABS = 1  # Posts cargando a la vez en pestañas (1 = uno detrás de otro)
+    POST_INTERVAL = 7.0  # Segundos entre visitas a posts (el limitador los alarga si hay bloqueos)
+    MAX_POSTS = 50  # Posts a extraer, del más reciente (se hace scroll hasta reunirlos)
+    ACCOUNTS_FILE = "cuentas.json"  # Si existe, se reparten las visitas a posts entre sus cuentas
+    
+    # Verificar que se configuró la contraseña
+    if INSTAGRAM_PASSWORD == "TU_CONTRASEÑA_AQUI":
+        print("❌ ERROR: Debes configurar tu contraseña en la línea 226")
+        print("   Edita el archivo y cambia INSTAGRAM_PASSWORD por tu contraseña real")
+        return
+    
+    try:
+        run_profile(PROFILE_TO_EXTRACT, INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD, CAPTURE_NETWORK, LEAN_MODE,
+                    RECORD_MODE, METRICS_TEXTFILE, POST_TABS, POST_INTERVAL, MAX_POSTS, ACCOUNTS_FILE)
+    except Exception as e:
+        print(f"❌ Error general: {e}")
 
 if __name__ == "__main__":
     main()
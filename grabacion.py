@@ -0,0 +1,355 @@
+"""
+Grabación y reproducción de ejecuciones para repetirlas sin conexión
+En modo 'grabar' se guarda el HTML de cada página visitada (el DOM ya
+renderizado, sin scripts), las respuestas del camino rápido HTTP y los JSON
+capturados, en orden y por canal y URL, en grabaciones/<perfil>.jsonl.gz. El
+camino HTTP y el navegador tienen cada uno su secuencia por URL ('http' y
+'page'), así que la reproducción no depende de cuál llegue antes. En modo
+'reproducir' un servidor local sirve ese archivo a las mismas funciones de
+extracción: el navegador visita http://127.0.0.1:<puerto>/... en lugar de
+instagram.com, no hay login y las esperas fijas (limitador.pause) y del
+limitador se acortan, así que la ejecución completa se repite a máxima
+velocidad y da siempre el mismo resultado (línea base para medir rendimiento).
+
+Uso: run_profile(..., record_mode='grabar') una vez con conexión y luego
+run_profile(..., record_mode='reproducir') las veces que haga falta.
+"""
+
+import gzip
+import json
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+ARCHIVE_DIR = "grabaciones"
+INSTAGRAM_BASE_RE = re.compile(r'https?://(?:www\.)?instagram\.com')
+
+# En reproducción las esperas fijas de los scripts y el limitador van así de rápido
+REPLAY_SPEEDUP = 100
+
+# Cabecera con la que el camino rápido HTTP pide su canal al servidor de reproducción
+CHANNEL_HEADER = 'X-Replay-Channel'
+
+# En reproducción no se sale de 127.0.0.1 (CDN, analítica...)
+REPLAY_BLOCKED_URLS = [
+    '*instagram.com*', '*cdninstagram.com*', '*fbcdn.net*', '*facebook.com*', '*facebook.net*',
+    '*google-analytics.com*', '*googletagmanager.com*',
+]
+
+# Scripts (salvo los de datos JSON) y recursos enlazados: no hacen falta para leer el DOM
+STRIP_RE = re.compile(
+    r'<script(?![^>]*type=["\']application/(?:ld\+)?json["\'])[^>]*>.*?</script>'
+    r'|<link\b[^>]*>',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Guarda el DOM justo antes de cada navegación interna de la web (history.pushState),
+# p. ej. el perfil antes de abrir el diálogo de seguidores
+SPA_SNAPSHOT_JS = """
+if (!window.__igSnapshotHooked) {
+    window.__igSnapshotHooked = true;
+    window.__igSnapshots = [];
+    const original = history.pushState;
+    history.pushState = function() {
+        try {
+            window.__igSnapshots.push([location.href, document.documentElement.outerHTML]);
+        } catch (e) {}
+        return original.apply(this, arguments);
+    };
+}
+"""
+
+TAKE_SPA_SNAPSHOTS_JS = """
+const snapshots = window.__igSnapshots || [];
+window.__igSnapshots = [];
+return snapshots;
+"""
+
+
+def archive_path(name):
+    return os.path.join(ARCHIVE_DIR, f"{name}.jsonl.gz")
+
+
+def url_key(url):
+    """Clave de una URL en el archivo: ruta + query, sin esquema ni dominio"""
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+def strip_page(html):
+    return STRIP_RE.sub('', html)
+
+
+class Archive:
+    """Páginas y JSON grabados: (canal, URL) -> lista de cuerpos en orden de visita
+
+    Canales: 'page' (navegador), 'http' (camino rápido HTTP) y 'json' (capturas de red).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._file = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_recording(cls, path):
+        archive = cls(path)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        archive._file = gzip.open(path, "wt", encoding="utf-8")
+        return archive
+
+    @classmethod
+    def load(cls, path):
+        archive = cls(path)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    record = json.loads(line)
+                    archive.entries.setdefault((record['kind'], record['url']), []).append(record['body'])
+            except (EOFError, ValueError):
+                pass  # grabación cortada a medias: se usa lo que se llegó a escribir
+        return archive
+
+    def add(self, kind, url, body):
+        key = url_key(url)
+        with self._lock:
+            seq = len(self.entries.setdefault((kind, key), []))
+            self.entries[(kind, key)].append(body)
+            if self._file:
+                self._file.write(json.dumps({'kind': kind, 'url': key, 'seq': seq, 'body': body}) + "\n")
+
+    def json_payloads(self):
+        return [(url, body) for (kind, url), bodies in self.entries.items() if kind == 'json' for body in bodies]
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def summary(self):
+        counts = {kind: 0 for kind in ('page', 'http', 'json')}
+        for (kind, _), bodies in self.entries.items():
+            counts[kind] = counts.get(kind, 0) + len(bodies)
+        return f"{counts['page']} páginas, {counts['http']} HTTP, {counts['json']} JSON"
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    server_version = "ReplayInstagram"
+
+    def do_GET(self):
+        body, content_type = self.server.next_body(self.path, self.headers.get(CHANNEL_HEADER, 'page'))
+        if body is None:
+            self.send_error(404)
+            return
+        data = INSTAGRAM_BASE_RE.sub(self.server.base_url, body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Servidor local que devuelve las páginas grabadas en el mismo orden en que se visitaron"""
+
+    daemon_threads = True
+
+    def __init__(self, archive, port=0):
+        super().__init__(('127.0.0.1', port), _ReplayHandler)
+        self.archive = archive
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}"
+        self._served = {}
+        self._lock = threading.Lock()
+
+    def next_body(self, path, channel='page'):
+        """Siguiente versión grabada de la URL en el canal (la última se repite); (None, None) si no hay"""
+        for kind, content_type in ((channel, 'text/html; charset=utf-8'), ('json', 'application/json')):
+            bodies = self.archive.entries.get((kind, path))
+            if bodies:
+                with self._lock:
+                    seq = self._served.get((kind, path), 0)
+                    self._served[(kind, path)] = seq + 1
+                body = bodies[min(seq, len(bodies) - 1)]
+                return (body if kind != 'json' else json.dumps(body)), content_type
+        return None, None
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _DriverProxy:
+    """Delega todo en el driver real; las subclases sustituyen get() y quit()"""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+
+class RecordingDriver(_DriverProxy):
+    """Graba el DOM de cada página antes de salir de ella"""
+
+    def __init__(self, driver, archive):
+        super().__init__(driver)
+        self.archive = archive
+
+    def _snapshot(self):
+        try:
+            for url, html in self.driver.execute_script(TAKE_SPA_SNAPSHOTS_JS) or []:
+                self.archive.add('page', url, strip_page(html))
+            url = self.driver.current_url
+            if INSTAGRAM_BASE_RE.match(url):
+                self.archive.add('page', url, strip_page(self.driver.page_source))
+        except Exception:
+            pass
+
+    def get(self, url):
+        self._snapshot()
+        self.driver.get(url)
+        try:
+            self.driver.execute_script(SPA_SNAPSHOT_JS)
+        except Exception:
+            pass
+
+    def quit(self):
+        self._snapshot()
+        self.driver.quit()
+
+
+class ReplayDriver(_DriverProxy):
+    """Navega al servidor local (reproducción o simulación) en lugar de a instagram.com"""
+
+    replaying = True
+
+    def __init__(self, driver, base_url):
+        super().__init__(driver)
+        self.base_url = base_url
+
+    def get(self, url):
+        self.driver.get(INSTAGRAM_BASE_RE.sub(self.base_url, url))
+
+
+class _Session:
+    def __init__(self, mode, archive=None, server=None, base_url=None):
+        self.mode = mode
+        self.archive = archive
+        self.server = server
+        self.base_url = base_url  # adonde van los navegadores al reproducir o simular
+        self.time_scale = 1.0  # velocidad del limitador y las esperas fijas antes de acelerar
+
+
+_session = None
+
+
+def _speed_up(factor):
+    """Acelera 'factor' veces el limitador y las esperas fijas (limitador.pause y paced)"""
+    from limitador import get_time_scale, set_time_scale
+    _session.time_scale = get_time_scale()
+    set_time_scale(_session.time_scale * factor)
+
+
+def start_session(mode, name):
+    """Activa la grabación ('grabar') o la reproducción ('reproducir') de 'name' en este proceso"""
+    global _session
+    stop_session()
+    path = archive_path(name)
+    if mode == 'grabar':
+        _session = _Session(mode, Archive.for_recording(path))
+        print(f"⏺ Grabando la ejecución en {path}")
+    elif mode == 'reproducir':
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No hay grabación de '{name}' ({path})")
+        archive = Archive.load(path)
+        server = ReplayServer(archive).start()
+        _session = _Session(mode, archive, server, server.base_url)
+        _speed_up(REPLAY_SPEEDUP)
+        print(f"⏵ Reproduciendo {path} ({archive.summary()}) en {server.base_url}")
+    elif mode:
+        raise ValueError(f"Modo de grabación desconocido: {mode!r} (usa 'grabar' o 'reproducir')")
+
+
+def start_simulation(base_url, speedup=REPLAY_SPEEDUP):
+    """Dirige navegadores y camino HTTP a un servidor que imita Instagram (benchmarks/servidor_simulado.py)
+
+    Como en la reproducción, no hay login y las esperas se acortan 'speedup'
+    veces; la latencia y los bloqueos los pone el propio servidor.
+    """
+    global _session
+    stop_session()
+    _session = _Session('simular', base_url=base_url.rstrip('/'))
+    _speed_up(speedup)
+
+
+def stop_session():
+    """Cierra la grabación, reproducción o simulación activa, si hay"""
+    global _session
+    if _session is None:
+        return
+    if _session.mode == 'grabar':
+        _session.archive.close()
+        print(f"⏺ Grabación guardada: {_session.archive.path} ({_session.archive.summary()})")
+    else:
+        from limitador import set_time_scale
+        if _session.server:
+            _session.server.shutdown()
+            _session.server.server_close()
+        set_time_scale(_session.time_scale)
+    _session = None
+
+
+def wrap_driver(driver):
+    """Devuelve el driver preparado para el modo activo (o el mismo si no hay ninguno)"""
+    if _session is None:
+        return driver
+    if _session.mode == 'grabar':
+        return RecordingDriver(driver, _session.archive)
+
+    from navegador_ligero import LEAN_BLOCKED_URLS, enable_request_blocking
+    enable_request_blocking(driver, REPLAY_BLOCKED_URLS + LEAN_BLOCKED_URLS)
+    capture = getattr(driver, 'network_capture', None)
+    if capture and _session.archive:
+        # Los JSON grabados llegan de una vez, como si la página ya los hubiera descargado
+        for url, payload in _session.archive.json_payloads():
+            capture._absorb(url, payload)
+    return ReplayDriver(driver, _session.base_url)
+
+
+def rewrite_url(url):
+    """URL de Instagram, o su equivalente en el servidor local al reproducir o simular"""
+    if _session is None or not _session.base_url:
+        return url
+    return INSTAGRAM_BASE_RE.sub(_session.base_url, url)
+
+
+def record_page(url, html):
+    """Graba una página descargada fuera del navegador (camino rápido HTTP, canal 'http')"""
+    if _session is not None and _session.mode == 'grabar' and html:
+        _session.archive.add('http', url, strip_page(html))
+
+
+def channel_headers(channel):
+    """Cabeceras para pedir al servidor de reproducción el canal 'channel' ({} si no se reproduce)"""
+    if _session is None or _session.mode != 'reproducir':
+        return {}
+    return {CHANNEL_HEADER: channel}
+
+
+def record_current_page(driver):
+    """Graba la página abierta en el navegador (para navegaciones que no pasan por driver.get)"""
+    if isinstance(driver, RecordingDriver):
+        driver._snapshot()
+
+
+def record_json(url, payload):
+    """Graba un JSON capturado de los logs de rendimiento"""
+    if _session is not None and _session.mode == 'grabar':
+        _session.archive.add('json', url, payload)
@@ -0,0 +1,262 @@
+"""
+Camino rápido por HTTP para obtener el número de seguidores
+Descarga el HTML del perfil sin renderizarlo (reutilizando las cookies de la
+sesión de Selenium) y lee el número del meta tag og:description o del JSON
+embebido. Solo los usernames que fallan se visitan luego con el navegador.
+Las peticiones pasan por el limitador central (clase 'http'); ante un 429 o
+una redirección a login/challenge se avisa al limitador y el resto de
+usernames pasa directamente al navegador.
+"""
+
+import asyncio
+import json
+import re
+import urllib.error
+import urllib.request
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from limitador import get_rate_limiter
+from grabacion import channel_headers, record_page, rewrite_url
+from metricas import get_metrics, timed
+
+PROFILE_URL = "https://www.instagram.com/{}/"
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+META_DESCRIPTION_RE = re.compile(
+    r'<meta[^>]+property=["\']og:description["\'][^>]*content=["\']([^"\']*)["\']'
+    r'|<meta[^>]+content=["\']([^"\']*)["\'][^>]*property=["\']og:description["\']',
+    re.IGNORECASE
+)
+META_FOLLOWERS_RE = re.compile(
+    r'([\d.,]+\s*(?:K|M|mil|mill\.?)?)\s*(?:Followers|Seguidores)',
+    re.IGNORECASE
+)
+COUNT_TEXT_RE = re.compile(r'^([\d.,]+)\s*(K|mil|M|mill\.?|millones)?$', re.IGNORECASE)
+# JSON embebido de la página; además del perfil trae otros usuarios (perfiles
+# sugeridos, seguidores en común, autores de comentarios...) con sus contadores
+JSON_SCRIPT_RE = re.compile(
+    r'<script[^>]*type=["\']application/json["\'][^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL
+)
+JSON_FOLLOWERS_KEYS = ('"edge_followed_by"', '"follower_count"')
+
+
+def parse_count_text(text):
+    """Convierte textos como '1,234', '1.2K', '3,5 mil' o '2M' a entero"""
+    match = COUNT_TEXT_RE.match(text.strip().replace('\xa0', ' '))
+    if not match:
+        return 0
+
+    number, suffix = match.group(1), (match.group(2) or '').lower()
+    try:
+        if suffix in ('k', 'mil'):
+            return int(float(number.replace(',', '.')) * 1000)
+        if suffix:
+            return int(float(number.replace(',', '.')) * 1000000)
+        return int(re.sub(r'[^\d]', '', number))
+    except ValueError:
+        return 0
+
+
+def _user_follower_count(data, username):
+    """Seguidores del objeto de usuario con ese username dentro de un JSON (o None)"""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if str(node.get('username', '')).lower() == username:
+                followed_by = node.get('edge_followed_by')
+                count = followed_by.get('count') if isinstance(followed_by, dict) else node.get('follower_count')
+                if isinstance(count, int):
+                    return count
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return None
+
+
+def parse_follower_count_from_html(html, username):
+    """Extrae el número de seguidores del perfil 'username' de su HTML crudo (o None)"""
+    # El JSON embebido trae el número exacto, sin abreviaturas; solo vale el del
+    # objeto de usuario del propio perfil, no el primer contador de la página
+    username = username.lower()
+    for match in JSON_SCRIPT_RE.finditer(html):
+        text = match.group(1)
+        if username not in text.lower() or not any(key in text for key in JSON_FOLLOWERS_KEYS):
+            continue
+        try:
+            count = _user_follower_count(json.loads(text), username)
+        except ValueError:
+            continue
+        if count is not None:
+            return count
+
+    meta = META_DESCRIPTION_RE.search(html)
+    if meta:
+        content = meta.group(1) or meta.group(2) or ''
+        match = META_FOLLOWERS_RE.search(content)
+        if match:
+            num = parse_count_text(match.group(1))
+            if num > 0:
+                return num
+
+    return None
+
+
+def cookies_from_driver(driver):
+    """Convierte las cookies de Selenium en un diccionario nombre -> valor"""
+    return {cookie['name']: cookie['value'] for cookie in driver.get_cookies()}
+
+
+def _build_headers(cookies):
+    headers = {
+        'User-Agent': USER_AGENT,
+        'Accept': 'text/html,application/xhtml+xml',
+        'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
+        **channel_headers('http'),  # al reproducir, su propia secuencia de páginas grabadas
+    }
+    if cookies:
+        headers['Cookie'] = '; '.join(f"{name}={value}" for name, value in cookies.items())
+    return headers
+
+
+def _is_login_wall(final_url):
+    return '/accounts/login' in final_url or '/challenge' in final_url
+
+
+def _fetch_urllib(url, headers, timeout):
+    """Descarga una página con urllib (bloqueante, se ejecuta en un hilo).
+
+    Devuelve (status, url final, html); status 0 si la petición falló.
+    """
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.geturl(), response.read().decode('utf-8', errors='replace')
+    except urllib.error.HTTPError as e:
+        return e.code, url, None
+    except (urllib.error.URLError, OSError, ValueError):
+        return 0, url, None
+
+
+async def _fetch_all(usernames, cookies, max_connections, timeout, limiter):
+    headers = _build_headers(cookies)
+    semaphore = asyncio.Semaphore(max_connections)
+    results = {}
+    blocked = asyncio.Event()
+
+    def accept(status, final_url, html):
+        """Filtra la respuesta y avisa al limitador si es una señal de bloqueo"""
+        if status == 429 or _is_login_wall(final_url):
+            if not blocked.is_set():
+                blocked.set()
+                limiter.report_throttle('http', '429' if status == 429 else 'login/challenge')
+            return None
+        if status != 200:
+            return None
+        limiter.report_success('http')
+        record_page(final_url, html)
+        return html
+
+    async def wait_turn():
+        """Espera turno en el limitador; False si hay (o llega) un bloqueo mientras tanto.
+
+        Tras un 429 el limitador pausa el endpoint durante la penalización: los que
+        esperan no la aguardan, se quedan sin resultado y pasan al navegador.
+        """
+        if blocked.is_set():
+            return False
+        turn = asyncio.ensure_future(limiter.wait_async('http'))
+        stop = asyncio.ensure_future(blocked.wait())
+        _, pending = await asyncio.wait({turn, stop}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        return not blocked.is_set()
+
+    if AIOHTTP_AVAILABLE:
+        connector = aiohttp.TCPConnector(limit=max_connections)
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        async with aiohttp.ClientSession(headers=headers, connector=connector,
+                                         timeout=client_timeout) as session:
+            async def fetch(username):
+                async with semaphore:
+                    if not await wait_turn():
+                        return username, None
+                    try:
+                        async with session.get(rewrite_url(PROFILE_URL.format(username))) as response:
+                            if response.status != 200:
+                                return username, accept(response.status, str(response.url), None)
+                            return username, accept(200, str(response.url), await response.text())
+                    except (aiohttp.ClientError, asyncio.TimeoutError):
+                        return username, None
+
+            for username, html in await asyncio.gather(*(fetch(u) for u in usernames)):
+                results[username] = html
+    else:
+        async def fetch(username):
+            async with semaphore:
+                if not await wait_turn():
+                    return username, None
+                response = await asyncio.to_thread(_fetch_urllib, rewrite_url(PROFILE_URL.format(username)),
+                                                   headers, timeout)
+                return username, accept(*response)
+
+        for username, html in await asyncio.gather(*(fetch(u) for u in usernames)):
+            results[username] = html
+
+    return results
+
+
+def fetch_follower_counts_http(usernames, cookies=None, max_connections=8, timeout=15, limiter=None):
+    """Obtiene por HTTP el número de seguidores de varios usernames a la vez.
+
+    Devuelve un diccionario username -> número; los que fallan no aparecen.
+    """
+    pages = asyncio.run(_fetch_all(list(usernames), cookies or {}, max_connections, timeout,
+                                   limiter or get_rate_limiter()))
+    counts = {}
+    for username, html in pages.items():
+        if not html:
+            continue
+        num = parse_follower_count_from_html(html, username)
+        if num is not None:
+            counts[username] = num
+    return counts
+
+
+@timed('http_batch')
+def fill_follower_counts_http(driver, followers_data, max_connections=8, cache=None):
+    """Completa 'follower_count' por HTTP y devuelve los seguidores pendientes.
+
+    Los pendientes son los que hay que visitar con el navegador. Si se pasa una
+    caché (FollowerCountCache), los resultados obtenidos se guardan en ella.
+    """
+    if not followers_data:
+        return []
+
+    usernames = [follower['follower_username'] for follower in followers_data]
+    print(f"⚡ Camino rápido HTTP: {len(usernames)} perfiles "
+          f"({max_connections} conexiones, {'aiohttp' if AIOHTTP_AVAILABLE else 'urllib'})...")
+
+    counts = fetch_follower_counts_http(usernames, cookies_from_driver(driver), max_connections)
+
+    pending = []
+    for follower in followers_data:
+        username = follower['follower_username']
+        if username in counts:
+            follower['follower_count'] = counts[username]
+            if cache:
+                cache.put(username, counts[username], 'http')
+        else:
+            pending.append(follower)
+
+    get_metrics().incr('lookups', len(followers_data) - len(pending), source='http', result='hit')
+    get_metrics().incr('lookups', len(pending), source='http', result='miss')
+    print(f"✓ HTTP resolvió {len(counts)}/{len(usernames)} perfiles; "
+          f"{len(pending)} pasan al navegador\n")
+    return pending
@@ -0,0 +1,251 @@
+"""
+Limitador de frecuencia central para todos los extractores
+Cada clase de endpoint (visitas a perfiles, posts, HTTP, instaloader...) tiene
+su propio token bucket con variación aleatoria. Ante señales de bloqueo (429,
+páginas de challenge/login, ConnectionException) la tasa se reduce a la mitad
+y se aplica una pausa que crece con cada bloqueo consecutivo; con cada éxito
+la tasa se recupera poco a poco hasta la configurada.
+
+Cuando varios procesos comparten la misma cuenta (ejecutor por lotes), cada
+uno llama a set_rate_scale(1 / procesos) para que el ritmo total siga siendo
+el configurado. Al reproducir una grabación, set_time_scale(factor) hace que
+los limitadores vayan 'factor' veces más rápido, pausas tras bloqueos incluidas.
+Las esperas fijas de los scripts (cargas de página, animaciones, timeouts de
+los scripts inyectados) pasan por pause() y paced() para acortarse igual.
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+# rate: peticiones por segundo; burst: peticiones seguidas permitidas;
+# jitter: fracción aleatoria del intervalo que se añade a cada espera;
+# penalty: pausa base (s) tras un bloqueo
+DEFAULT_ENDPOINTS = {
+    'profile': {'rate': 1 / 1.5, 'burst': 1, 'jitter': 0.2, 'penalty': 60},
+    'post': {'rate': 1 / 7.0, 'burst': 1, 'jitter': 0.3, 'penalty': 60},
+    'http': {'rate': 4.0, 'burst': 8, 'jitter': 0.1, 'penalty': 60},
+    'instaloader_post': {'rate': 1 / 15.0, 'burst': 1, 'jitter': 0.67, 'penalty': 300},
+}
+
+# Textos de páginas de bloqueo temporal de Instagram
+THROTTLE_MARKERS = [
+    'please wait a few minutes',
+    'espera unos minutos',
+    'try again later',
+    'vuelve a intentarlo más tarde',
+]
+
+
+# Factor que se aplica a la tasa de todos los limitadores de este proceso
+_rate_scale = 1.0
+# Velocidad del reloj de los limitadores (reproducción y simulación): tasas por él, pausas entre él
+_time_scale = 1.0
+
+
+def _scaled(config):
+    return {**config, 'rate': config['rate'] * _rate_scale * _time_scale}
+
+
+class TokenBucket:
+    """Token bucket con reducción multiplicativa y recuperación gradual (AIMD)"""
+
+    def __init__(self, rate, burst=1, jitter=0.0, penalty=60, min_rate_factor=0.05):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter
+        self.penalty = penalty
+        self.min_rate = rate * min_rate_factor
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.consecutive_throttles = 0
+        self.total_wait = 0.0
+        self.requests = 0
+        self.throttles = 0
+
+    def reserve(self):
+        """Reserva un turno y devuelve cuántos segundos hay que esperar por él"""
+        now = time.monotonic()
+        # Durante una pausa no se recargan tokens ('updated' apunta al final de la pausa)
+        self.tokens = min(self.burst, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = max(self.updated, now)
+
+        # Los turnos en deuda se cuentan desde el final de la pausa: tras un bloqueo
+        # las peticiones en cola salen de una en una a la tasa reducida, no todas a la vez
+        self.tokens -= 1
+        delay = max(0.0, self.blocked_until - now) + max(0.0, -self.tokens) / self.rate
+        delay += random.uniform(0, self.jitter / self.rate)
+
+        self.total_wait += delay
+        self.requests += 1
+        return delay
+
+    def throttled(self):
+        self.throttles += 1
+        self.consecutive_throttles += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        pause = self.penalty * (2 ** (self.consecutive_throttles - 1))
+        self.blocked_until = max(self.blocked_until, time.monotonic() + pause / _time_scale)
+        self.tokens = min(self.tokens, 0.0)
+        self.updated = max(self.updated, self.blocked_until)
+        return pause
+
+    def succeeded(self):
+        self.consecutive_throttles = 0
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+
+
+class RateLimiter:
+    """Planificador compartido: un token bucket por clase de endpoint"""
+
+    def __init__(self, endpoints=None):
+        self._lock = threading.Lock()
+        self.buckets = {}
+        for name, config in {**DEFAULT_ENDPOINTS, **(endpoints or {})}.items():
+            self.buckets[name] = TokenBucket(**_scaled(config))
+
+    def configure(self, endpoint, **config):
+        """Crea o reemplaza la configuración de una clase de endpoint"""
+        with self._lock:
+            current = DEFAULT_ENDPOINTS.get(endpoint, {'rate': 1.0})
+            self.buckets[endpoint] = TokenBucket(**_scaled({**current, **config}))
+
+    def _bucket(self, endpoint):
+        if endpoint not in self.buckets:
+            self.buckets[endpoint] = TokenBucket(**_scaled({'rate': 1.0}))
+        return self.buckets[endpoint]
+
+    def reserve(self, endpoint):
+        with self._lock:
+            return self._bucket(endpoint).reserve()
+
+    def wait(self, endpoint):
+        """Bloquea hasta que haya turno para una petición a 'endpoint'"""
+        delay = self.reserve(endpoint)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def wait_async(self, endpoint):
+        """Versión asyncio de wait()"""
+        delay = self.reserve(endpoint)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def report_throttle(self, endpoint, reason=""):
+        """Registra una señal de bloqueo: baja la tasa y pausa el endpoint"""
+        with self._lock:
+            bucket = self._bucket(endpoint)
+            pause = bucket.throttled()
+            rate = bucket.rate
+        print(f"  🚦 Bloqueo detectado en '{endpoint}' ({reason}): pausa de {pause:.0f}s, "
+              f"nueva tasa {rate * 60:.1f}/min")
+        return pause
+
+    def report_success(self, endpoint):
+        with self._lock:
+            self._bucket(endpoint).succeeded()
+
+    def check_page(self, driver, endpoint, check_text=True):
+        """Revisa la página actual del navegador; si es un bloqueo lo registra y devuelve el motivo"""
+        reason = detect_throttle(driver, check_text)
+        if reason:
+            self.report_throttle(endpoint, reason)
+            return reason
+        self.report_success(endpoint)
+        return None
+
+    def stats(self):
+        """Tasa actual y tiempo esperado por clase de endpoint"""
+        with self._lock:
+            return {
+                name: {
+                    'rate_per_min': bucket.rate * 60,
+                    'base_rate_per_min': bucket.base_rate * 60,
+                    'requests': bucket.requests,
+                    'wait_seconds': bucket.total_wait,
+                    'throttles': bucket.throttles,
+                }
+                for name, bucket in self.buckets.items() if bucket.requests or bucket.throttles
+            }
+
+    def print_stats(self):
+        stats = self.stats()
+        if not stats:
+            return
+        print("🚦 Limitador de frecuencia:")
+        for name, s in stats.items():
+            print(f"   {name:<18} {s['requests']:>5} peticiones | {s['rate_per_min']:.1f}/min "
+                  f"(base {s['base_rate_per_min']:.1f}) | espera {s['wait_seconds']:.1f}s | "
+                  f"bloqueos {s['throttles']}")
+
+
+def detect_throttle(driver, check_text=True):
+    """Devuelve el motivo si la página actual es un challenge, login forzado o bloqueo temporal"""
+    try:
+        url = driver.current_url or ''
+        if '/challenge' in url:
+            return 'challenge'
+        if '/accounts/login' in url:
+            return 'login forzado'
+        if not check_text:
+            return None
+        source = driver.page_source[:20000].lower()
+    except Exception:
+        return None
+    for marker in THROTTLE_MARKERS:
+        if marker in source:
+            return marker
+    return None
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Limitador compartido por todo el proceso"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
+
+
+def get_rate_scale():
+    return _rate_scale
+
+
+def set_rate_scale(factor):
+    """Escala la tasa de los limitadores de este proceso (p. ej. 1/N con N procesos)"""
+    global _rate_scale, _shared_limiter
+    with _shared_lock:
+        _rate_scale = factor
+        _shared_limiter = None  # el siguiente get_rate_limiter() ya usa la nueva escala
+
+
+def get_time_scale():
+    return _time_scale
+
+
+def set_time_scale(factor):
+    """Acelera 'factor' veces los limitadores y las esperas fijas de este proceso"""
+    global _time_scale, _shared_limiter
+    with _shared_lock:
+        _time_scale = factor
+        _shared_limiter = None
+
+
+def paced(seconds):
+    """Duración real de una espera fija de 'seconds' con la velocidad actual (timeouts, settle...)"""
+    return seconds / _time_scale
+
+
+def pause(seconds):
+    """Espera fija de los scripts (time.sleep que se acorta al reproducir o simular)"""
+    time.sleep(paced(seconds))
@@ -0,0 +1,208 @@
+"""
+Ejecutor por lotes: analiza muchos perfiles repartiéndolos entre procesos
+Lee una lista de trabajos (perfil, script, prioridad) y los ejecuta en un pool
+de procesos; cada proceso abre su propio navegador con el run_profile() del
+script. Los trabajos de mayor prioridad salen antes, los que fallan se
+reintentan y nunca hay más de --workers trabajos a la vez. Cada script sigue
+escribiendo sus archivos por perfil como siempre; además se genera un resumen
+consolidado (resumen_lote.csv) que se reescribe al terminar cada trabajo.
+
+Como todos los procesos usan la misma cuenta, el limitador de cada uno se
+escala a 1/workers para que el ritmo total hacia Instagram no cambie.
+
+Formato del archivo de trabajos (CSV, las líneas con # se ignoran):
+    perfil,script,prioridad
+    jofre_a21,seguidores_benford,5
+    nicole.az13,posts_benford
+
+Uso:
+    python lotes.py trabajos.csv [--workers 2] [--reintentos 2] [--opciones opciones.json]
+
+opciones.json tiene los argumentos de run_profile() (username, password,
+max_followers, lean...); 'comun' se aplica a todos los scripts y cada script
+puede tener su propia sección, p. ej. {"comun": {"lean": true}, "seguidores": {"max_followers": 200}}.
+"""
+
+import argparse
+import contextlib
+import csv
+import heapq
+import importlib
+import inspect
+import json
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# Nombre corto del script -> módulo con run_profile()
+SCRIPTS = {
+    'seguidores': 'analisis_seguidores_beautifulsoup',
+    'seguidores_benford': 'analisis_seguidores_benford',
+    'posts_benford': 'extraer_benford',
+    'posts_selenium': 'extraer_instagram_selenium',
+    'posts_instaloader': 'extraer_instagram',
+}
+
+LOGS_DIR = "lotes_logs"
+SUMMARY_FILE = "resumen_lote.csv"
+RETRY_DELAY = 60  # segundos antes de reintentar un trabajo fallido
+
+
+def read_jobs(path):
+    """Lee el archivo de trabajos; devuelve [{'perfil', 'script', 'prioridad'}]"""
+    jobs = []
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line for line in f if line.strip() and not line.lstrip().startswith('#')]
+    for row in csv.reader(lines):
+        row = [value.strip() for value in row]
+        if row[0] == 'perfil':
+            continue
+        profile = row[0].lstrip('@')
+        script = row[1] if len(row) > 1 and row[1] else 'seguidores_benford'
+        priority = int(row[2]) if len(row) > 2 and row[2] else 0
+        if script not in SCRIPTS:
+            raise ValueError(f"Script desconocido '{script}' para @{profile} (opciones: {', '.join(SCRIPTS)})")
+        jobs.append({'perfil': profile, 'script': script, 'prioridad': priority})
+    return jobs
+
+
+def options_for(script, options):
+    """Argumentos de run_profile() para un script: sección 'comun' + la suya"""
+    return {**options.get('comun', {}), **options.get(script, {})}
+
+
+def _run_job(profile, script, kwargs, rate_scale):
+    """Ejecuta un trabajo en un proceso del pool (debe ser una función de módulo)"""
+    from limitador import set_rate_scale
+    from navegador_ligero import reset_page_stats
+    set_rate_scale(rate_scale)
+    # Los procesos del pool se reutilizan: cada trabajo empieza con sus propias estadísticas de carga
+    reset_page_stats()
+
+    module = importlib.import_module(SCRIPTS[script])
+    accepted = inspect.signature(module.run_profile).parameters
+    kwargs = {key: value for key, value in kwargs.items() if key in accepted}
+
+    os.makedirs(LOGS_DIR, exist_ok=True)
+    log_path = os.path.join(LOGS_DIR, f"{script}_{profile}.log")
+    started = time.time()
+    with open(log_path, "a", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        print(f"\n===== {time.strftime('%Y-%m-%d %H:%M:%S')} @{profile} ({script}) =====")
+        try:
+            summary = module.run_profile(profile, **kwargs)
+            return {'estado': 'ok', 'resumen': summary or {}, 'duracion_s': time.time() - started, 'error': ''}
+        except Exception as e:
+            traceback.print_exc()
+            return {'estado': 'error', 'resumen': {}, 'duracion_s': time.time() - started, 'error': str(e)}
+
+
+def write_summary(results, path=SUMMARY_FILE):
+    """Reescribe el resumen consolidado con los trabajos terminados hasta ahora"""
+    if not results:
+        return
+    base = ['perfil', 'script', 'prioridad', 'estado', 'intentos', 'duracion_s', 'error']
+    extra = []
+    for result in results:
+        for key in result['resumen']:
+            if key not in extra:
+                extra.append(key)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=base + extra)
+        writer.writeheader()
+        for result in results:
+            row = {key: result[key] for key in base}
+            row['duracion_s'] = f"{result['duracion_s']:.1f}"
+            row.update(result['resumen'])
+            writer.writerow(row)
+
+
+def run_batch(jobs, workers=1, retries=1, options=None, retry_delay=RETRY_DELAY):
+    """Ejecuta los trabajos por prioridad con como mucho 'workers' a la vez"""
+    options = options or {}
+    # Cola de prioridad: (-prioridad, orden, intento, trabajo, no antes de)
+    queue = []
+    for seq, job in enumerate(jobs):
+        heapq.heappush(queue, (-job['prioridad'], seq, 1, job, 0.0))
+
+    results = []
+    running = {}
+    print(f"📋 Lote: {len(jobs)} trabajos | {workers} procesos | hasta {retries} reintentos")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while queue or running:
+            # Lanzar trabajos listos mientras haya hueco
+            now = time.monotonic()
+            deferred = []
+            while queue and len(running) < workers:
+                entry = heapq.heappop(queue)
+                if entry[4] > now:
+                    deferred.append(entry)
+                    continue
+                _, _, attempt, job, _ = entry
+                print(f"▶ @{job['perfil']} ({job['script']}, prioridad {job['prioridad']}, intento {attempt})")
+                future = executor.submit(_run_job, job['perfil'], job['script'],
+                                         options_for(job['script'], options), 1.0 / workers)
+                running[future] = entry
+            for entry in deferred:
+                heapq.heappush(queue, entry)
+
+            if not running:
+                # Solo quedan reintentos esperando su turno
+                time.sleep(max(0.0, min(entry[4] for entry in queue) - time.monotonic()))
+                continue
+
+            done, _ = wait(running, timeout=5, return_when=FIRST_COMPLETED)
+            for future in done:
+                priority, seq, attempt, job, _ = running.pop(future)
+                try:
+                    outcome = future.result()
+                except Exception as e:  # el proceso murió (p. ej. se cerró Chrome de golpe)
+                    outcome = {'estado': 'error', 'resumen': {}, 'duracion_s': 0.0, 'error': str(e)}
+
+                if outcome['estado'] != 'ok' and attempt <= retries:
+                    print(f"  ⚠ @{job['perfil']} falló ({outcome['error']}); reintento en {retry_delay}s")
+                    heapq.heappush(queue, (priority, seq, attempt + 1, job,
+                                           time.monotonic() + retry_delay))
+                    continue
+
+                icon = '✓' if outcome['estado'] == 'ok' else '❌'
+                print(f"  {icon} @{job['perfil']} ({job['script']}) en {outcome['duracion_s']:.0f}s")
+                results.append({**job, **outcome, 'intentos': attempt})
+                write_summary(results)
+
+    return results
+
+
+def print_results(results):
+    print("\n" + "="*70)
+    print("📋 RESUMEN DEL LOTE")
+    print("="*70)
+    for result in sorted(results, key=lambda r: (-r['prioridad'], r['perfil'])):
+        detail = result['resumen'].get('verdict') or result['resumen'].get('conclusion') or result['error']
+        print(f"{'✓' if result['estado'] == 'ok' else '❌'} @{result['perfil']:<25} {result['script']:<20} "
+              f"{result['duracion_s']:>6.0f}s  {detail}")
+    ok = sum(1 for result in results if result['estado'] == 'ok')
+    print(f"\n✓ {ok}/{len(results)} trabajos completados | resumen en {SUMMARY_FILE} | logs en {LOGS_DIR}/")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('trabajos', help='CSV con perfil,script,prioridad')
+    parser.add_argument('--workers', type=int, default=1, help='Procesos (navegadores) a la vez')
+    parser.add_argument('--reintentos', type=int, default=1, help='Reintentos por trabajo fallido')
+    parser.add_argument('--opciones', help='JSON con los argumentos de run_profile()')
+    args = parser.parse_args()
+
+    options = {}
+    if args.opciones:
+        with open(args.opciones, "r", encoding="utf-8") as f:
+            options = json.load(f)
+
+    results = run_batch(read_jobs(args.trabajos), max(1, args.workers), max(0, args.reintentos), options)
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
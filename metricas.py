@@ -0,0 +1,242 @@
+"""
+Métricas de cada ejecución: tiempos por fase, contadores e histogramas
+Las funciones de los scripts se envuelven con @timed('fase') o registran
+contadores (visitas, búsquedas por estrategia, elementos extraídos) en un
+registro compartido por todo el proceso. Al terminar cada run_profile() se
+escribe metricas/<perfil>_<fecha>.json y, opcionalmente, un archivo de texto
+en formato Prometheus (para el textfile collector de node_exporter).
+
+Fases: login, dialog_scroll, username_parse, http_batch, profile_visit,
+post_visit, analysis, chart. Las visitas que devuelven 0 cuentan como
+desperdiciadas (wasted_visits).
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+METRICS_DIR = "metricas"
+PROMETHEUS_PREFIX = "instagram_"
+HISTOGRAM_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+# Contadores de los que se calcula el ritmo (elementos por segundo de la ejecución)
+RATE_COUNTERS = ('followers_harvested', 'profile_visits', 'post_visits', 'posts_extracted')
+# Contadores de visitas: las de resultado 'zero' son visitas desperdiciadas
+VISIT_COUNTERS = ('profile_visits', 'post_visits')
+
+
+class Histogram:
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[idx] += 1
+                break
+
+    def cumulative(self):
+        """Cuentas acumuladas por límite superior, como los buckets de Prometheus"""
+        total = 0
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            total += count
+            yield bound, total
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'min': self.min,
+            'max': self.max,
+            'buckets': {str(bound): total for bound, total in self.cumulative()},
+        }
+
+
+def _series_key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+class Metrics:
+    """Registro de contadores e histogramas de una ejecución (seguro entre hilos)"""
+
+    def __init__(self, profile="", script=""):
+        self.profile = profile
+        self.script = script
+        self.started_at = time.time()
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, amount=1, **labels):
+        key = _series_key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = _series_key(name, labels)
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    @contextmanager
+    def timer(self, phase):
+        """Mide el bloque como una observación de phase_seconds{phase=...}"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('phase_seconds', time.perf_counter() - start, phase=phase)
+
+    def total(self, name, **labels):
+        """Suma de un contador sobre todas sus etiquetas (o solo las que coinciden)"""
+        with self._lock:
+            return sum(value for (key, series_labels), value in self.counters.items()
+                       if key == name and all(dict(series_labels).get(k) == v for k, v in labels.items()))
+
+    def snapshot(self):
+        elapsed = time.time() - self.started_at
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            histograms = [{'name': name, 'labels': dict(labels), **histogram.to_dict()}
+                          for (name, labels), histogram in sorted(self.histograms.items())]
+        visits = sum(self.total(name) for name in VISIT_COUNTERS)
+        wasted = sum(self.total(name, result='zero') for name in VISIT_COUNTERS)
+        return {
+            'profile': self.profile,
+            'script': self.script,
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+            'duration_seconds': elapsed,
+            'phases': {h['labels']['phase']: {k: h[k] for k in ('count', 'sum', 'mean', 'max')}
+                       for h in histograms if h['name'] == 'phase_seconds'},
+            'rates_per_second': {name: self.total(name) / elapsed for name in RATE_COUNTERS
+                                 if elapsed > 0 and self.total(name)},
+            'wasted_visits': wasted,
+            'wasted_ratio': wasted / visits if visits else 0.0,
+            'counters': counters,
+            'histograms': histograms,
+        }
+
+    def write_json(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
+
+    def prometheus_text(self):
+        run_labels = (('profile', self.profile), ('script', self.script))
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+        typed = set()
+        for (name, labels), value in counters:
+            metric = f"{PROMETHEUS_PREFIX}{name}_total"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels, run_labels)} {value}")
+        for (name, labels), histogram in histograms:
+            metric = f"{PROMETHEUS_PREFIX}{name}"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            for bound, total in histogram.cumulative():
+                lines.append(f"{metric}_bucket{_format_labels(labels, run_labels + (('le', bound),))} {total}")
+            lines.append(f"{metric}_bucket{_format_labels(labels, run_labels + (('le', '+Inf'),))} {histogram.count}")
+            lines.append(f"{metric}_sum{_format_labels(labels, run_labels)} {histogram.sum}")
+            lines.append(f"{metric}_count{_format_labels(labels, run_labels)} {histogram.count}")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}run_duration_seconds gauge")
+        lines.append(f"{PROMETHEUS_PREFIX}run_duration_seconds{_format_labels(run_labels)} "
+                     f"{time.time() - self.started_at}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Escribe el textfile de forma atómica (node_exporter nunca lee uno a medias)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def print_summary(self):
+        snapshot = self.snapshot()
+        if not snapshot['phases'] and not snapshot['counters']:
+            return
+        print(f"📏 Métricas ({snapshot['duration_seconds']:.1f}s en total):")
+        for phase, stats in sorted(snapshot['phases'].items(), key=lambda item: -item[1]['sum']):
+            print(f"   {phase:<16} {stats['sum']:>8.1f}s | {stats['count']:>5} veces | "
+                  f"media {stats['mean'] * 1000:.0f} ms | máx {stats['max'] * 1000:.0f} ms")
+        for name, rate in snapshot['rates_per_second'].items():
+            print(f"   {name:<16} {self.total(name):>8} | {rate * 60:.1f}/min")
+        if snapshot['wasted_visits']:
+            print(f"   Visitas desperdiciadas (resultado 0): {snapshot['wasted_visits']} "
+                  f"({snapshot['wasted_ratio']:.1%})")
+
+
+_metrics = Metrics()
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """Registro de métricas de la ejecución en curso"""
+    return _metrics
+
+
+def start_run(profile, script):
+    """Empieza un registro nuevo para una ejecución (los procesos del lote se reutilizan)"""
+    global _metrics
+    with _metrics_lock:
+        _metrics = Metrics(profile, script)
+    return _metrics
+
+
+def finish_run(textfile=None, metrics_dir=METRICS_DIR):
+    """Muestra el resumen y escribe el JSON de la ejecución (y el textfile de Prometheus)"""
+    metrics = get_metrics()
+    metrics.print_summary()
+    name = f"{metrics.profile or metrics.script}_{datetime.fromtimestamp(metrics.started_at):%Y%m%d_%H%M%S}"
+    try:
+        metrics.write_json(os.path.join(metrics_dir, f"{name}.json"))
+        if textfile:
+            metrics.write_prometheus(textfile)
+    except OSError as e:
+        print(f"⚠ No se pudieron guardar las métricas: {e}")
+
+
+def timed(phase):
+    """Decorador: mide cada llamada como una observación de phase_seconds{phase=...}"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with get_metrics().timer(phase):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count_strategy(strategy, value, name='dom_strategy'):
+    """Cuenta qué estrategia de búsqueda encontró el dato y devuelve el valor tal cual"""
+    get_metrics().incr(name, strategy=strategy)
+    return value
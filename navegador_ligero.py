@@ -0,0 +1,107 @@
+"""
+Modo ligero del navegador y medición de cada visita
+Solo leemos números y texto, así que en modo ligero Chrome arranca sin
+ventana (headless), con page_load_strategy 'eager' (no espera a imágenes ni
+subrecursos) y bloquea por CDP las imágenes, vídeos, fuentes y analítica.
+
+Para comparar modos, cada visita registra el tiempo hasta que el DOM está
+listo y los bytes transferidos según la Resource Timing API del navegador
+(los recursos de otros dominios sin Timing-Allow-Origin cuentan como 0, así
+que los bytes son una cota inferior).
+"""
+
+import threading
+
+# Patrones para Network.setBlockedURLs ('*' es comodín)
+LEAN_BLOCKED_URLS = [
+    # Imágenes y vídeo (el CDN de contenido de Instagram es scontent*)
+    '*scontent*', '*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.heic*',
+    '*.mp4*', '*.m4v*', '*.webm*', '*.m3u8*',
+    # Fuentes
+    '*.woff*', '*.ttf*', '*.otf*',
+    # Analítica y registro de eventos
+    '*google-analytics.com*', '*googletagmanager.com*', '*connect.facebook.net*',
+    '*facebook.com/tr*', '*/logging_client_events*', '*/ajax/bz*', '*/api/v1/web/logging*',
+]
+
+PAGE_METRICS_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let bytes = nav ? nav.transferSize : 0;
+for (const r of resources) bytes += r.transferSize || 0;
+return {
+    dom_ready_ms: nav && nav.domContentLoadedEventEnd ? nav.domContentLoadedEventEnd - nav.startTime : null,
+    bytes: bytes,
+    resources: resources.length
+};
+"""
+
+
+def apply_lean_options(chrome_options):
+    """Opciones de Chrome del modo ligero (antes de crear el driver)"""
+    chrome_options.add_argument('--headless=new')
+    chrome_options.add_argument('--window-size=1280,900')
+    chrome_options.add_argument('--mute-audio')
+    chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+    chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    chrome_options.page_load_strategy = 'eager'
+
+
+def enable_request_blocking(driver, patterns=LEAN_BLOCKED_URLS):
+    """Bloquea por CDP las peticiones que coinciden con los patrones"""
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+    except Exception as e:
+        print(f"⚠ No se pudo activar el bloqueo de peticiones: {e}")
+
+
+class PageLoadStats:
+    """Tiempo de carga y bytes por visita, compartido por todos los navegadores"""
+
+    def __init__(self):
+        self.visits = []  # (etiqueta, ms hasta DOM listo, bytes)
+        self._lock = threading.Lock()
+
+    def record(self, driver, label=""):
+        """Mide la página actual; devuelve el diccionario de métricas o None"""
+        try:
+            metrics = driver.execute_script(PAGE_METRICS_JS)
+        except Exception:
+            return None
+        with self._lock:
+            self.visits.append((label, metrics.get('dom_ready_ms'), metrics.get('bytes') or 0))
+        return metrics
+
+    def reset(self):
+        with self._lock:
+            self.visits = []
+
+    def print_summary(self, lean=False):
+        with self._lock:
+            visits = list(self.visits)
+        if not visits:
+            return
+        times = [ms for _, ms, _ in visits if ms is not None]
+        total_bytes = sum(b for _, _, b in visits)
+        avg_ms = sum(times) / len(times) if times else 0.0
+        print(f"📶 Carga de páginas ({'modo ligero' if lean else 'modo normal'}): {len(visits)} visitas | "
+              f"DOM listo en {avg_ms:.0f} ms de media | {total_bytes / len(visits) / 1024:.0f} KB por visita "
+              f"({total_bytes / 1024 / 1024:.1f} MB en total)")
+
+
+_shared_stats = PageLoadStats()
+
+
+def get_page_stats():
+    """Estadísticas de carga compartidas por todo el proceso"""
+    return _shared_stats
+
+
+def reset_page_stats():
+    """Vacía las estadísticas de carga (p. ej. antes de cada trabajo de un proceso reutilizado)"""
+    _shared_stats.reset()
+
+
+def record_visit(driver, label=""):
+    return _shared_stats.record(driver, label)
@@ -0,0 +1,162 @@
+"""
+Pool de pestañas para visitar posts en paralelo con un solo navegador
+En vez de abrir un post, esperar a que cargue, leerlo y pasar al siguiente,
+se mantienen varias pestañas cargando posts a la vez y cada una se lee en
+cuanto su página está lista; entonces empieza a cargar el siguiente post.
+El número de pestañas es el máximo de posts cargando a la vez, y cada
+navegación sigue pasando por el limitador central (clase de endpoint 'post'),
+así que el ritmo de peticiones no sube por encima del configurado.
+
+Las URLs pueden llegar de un generador (descubrir_posts.py): con
+use_main_tab=False la pestaña principal se deja para él y las visitas
+empiezan mientras sigue descubriendo posts.
+"""
+
+import time
+from collections import deque
+
+from grabacion import record_current_page, rewrite_url
+from limitador import get_rate_limiter, paced, pause
+from metricas import get_metrics
+from navegador_ligero import record_visit
+
+# La página está lista cuando terminó de cargar y ya se pintó el post
+POST_READY_JS = """
+return document.readyState === 'complete'
+    && document.querySelector("time[datetime], section") !== null;
+"""
+
+
+class TabPool:
+    """Pestañas de un mismo navegador que cargan URLs en paralelo.
+
+    settle: segundos mínimos desde que empieza la carga hasta leer la página
+    (los contadores se pintan después del evento load). timeout: segundos
+    máximos de espera; pasado ese tiempo la página se lee tal como esté.
+    Los tres se acortan al reproducir o simular (limitador.paced).
+    use_main_tab=False abre 'tabs' pestañas nuevas y no toca la principal.
+    """
+
+    def __init__(self, driver, tabs=3, limiter=None, endpoint='post', settle=2.0, timeout=20.0, poll=0.25,
+                 use_main_tab=True):
+        self.driver = driver
+        self.limiter = limiter or get_rate_limiter()
+        self.endpoint = endpoint
+        self.settle = settle
+        self.timeout = timeout
+        self.poll = poll
+
+        self.main_handle = driver.current_window_handle
+        self.handles = [self.main_handle] if use_main_tab else []
+        while len(self.handles) < max(1, tabs):
+            try:
+                driver.switch_to.new_window('tab')
+                self.handles.append(driver.current_window_handle)
+            except Exception as e:
+                print(f"⚠ No se pudo abrir la pestaña {len(self.handles) + 1}: {e}")
+                if not self.handles:
+                    self.handles.append(self.main_handle)
+                break
+        driver.switch_to.window(self.main_handle)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _start_loading(self, handle, url):
+        self.limiter.wait(self.endpoint)
+        self.driver.switch_to.window(handle)
+        # Sin driver.get: la llamada vuelve enseguida y la pestaña carga en segundo plano
+        self.driver.execute_script("window.location.href = arguments[0];", rewrite_url(url))
+        return time.monotonic()
+
+    def _is_ready(self):
+        try:
+            return bool(self.driver.execute_script(POST_READY_JS))
+        except Exception:
+            return False
+
+    def map(self, fn, urls, on_result=None, default=None):
+        """Aplica fn(driver, url) a cada URL en cuanto su pestaña está lista.
+
+        urls puede ser un generador: se le pide la siguiente URL cuando una
+        pestaña queda libre. Devuelve los resultados en el orden de urls.
+        on_result(idx, url, result) se llama justo después de leer cada página,
+        con el navegador todavía en su pestaña (sirve para mostrar progreso o
+        guardar una captura).
+        Si la página es un bloqueo, el limitador lo registra y se reintenta una vez.
+        """
+        source = iter(urls)
+        exhausted = False
+        results = []
+        pending = deque()
+        loading = {}
+        idle = list(self.handles)
+        retried = set()
+        metrics = get_metrics()
+        settle, timeout = paced(self.settle), paced(self.timeout)
+
+        while pending or loading or not exhausted:
+            # Leer las pestañas que ya han cargado
+            for handle, (idx, url, started) in list(loading.items()):
+                elapsed = time.monotonic() - started
+                if elapsed < settle:
+                    continue
+                self.driver.switch_to.window(handle)
+                if elapsed < timeout and not self._is_ready():
+                    continue
+
+                del loading[handle]
+                idle.append(handle)
+                record_visit(self.driver, url)
+                record_current_page(self.driver)
+                if self.limiter.check_page(self.driver, self.endpoint) and idx not in retried:
+                    # Tras la pausa que impone el limitador se reintenta una vez
+                    retried.add(idx)
+                    pending.appendleft((idx, url))
+                    continue
+                try:
+                    result = fn(self.driver, url)
+                except Exception:
+                    result = default
+                metrics.observe('phase_seconds', time.monotonic() - started, phase=f"{self.endpoint}_visit")
+                results[idx] = result
+                if on_result:
+                    on_result(idx, url, result)
+
+            # Empezar a cargar más posts en las pestañas libres
+            while idle and (pending or not exhausted):
+                if pending:
+                    idx, url = pending.popleft()
+                else:
+                    url = next(source, None)
+                    if url is None:
+                        exhausted = True
+                        break
+                    idx = len(results)
+                    results.append(default)
+                handle = idle.pop()
+                loading[handle] = (idx, url, self._start_loading(handle, url))
+
+            if loading:
+                pause(self.poll)
+
+        return results
+
+    def close(self):
+        """Cierra las pestañas adicionales y vuelve a la principal"""
+        for handle in self.handles:
+            if handle == self.main_handle:
+                continue
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception:
+                pass
+        self.handles = [self.main_handle]
+        try:
+            self.driver.switch_to.window(self.main_handle)
+        except Exception:
+            pass
@@ -0,0 +1,208 @@
+"""
+Pool de navegadores para visitar perfiles de seguidores en paralelo
+Varias sesiones de Chrome comparten las cookies del login principal y toman
+usernames de una cola de trabajo común. Los resultados se devuelven en el
+mismo orden que la lista de entrada. El ritmo de visitas lo marca el
+limitador central (clase de endpoint 'profile'), común a todo el pool.
+
+Con un pool de cuentas (cuentas.py) cada cuenta abre su propio navegador con
+su propio limitador; si una cae en un checkpoint se aparca y lo que estaba
+procesando vuelve a la cola para las demás.
+"""
+
+import queue
+import threading
+import time
+
+from cuentas import PARKING_REASONS
+from limitador import get_rate_limiter, detect_throttle
+from metricas import get_metrics
+from navegador_ligero import record_visit
+
+INSTAGRAM_URL = "https://www.instagram.com/"
+# Valor que se escribe en los CSV para los perfiles que no se pudieron visitar
+NOT_VISITED = "sin visitar"
+
+
+def clone_session(source_driver, setup_driver_fn):
+    """Abre un navegador nuevo con las cookies de sesión del navegador principal"""
+    driver = setup_driver_fn()
+    # Hay que estar en el dominio antes de poder añadir sus cookies
+    driver.get(INSTAGRAM_URL)
+    for cookie in source_driver.get_cookies():
+        cookie.pop('sameSite', None)
+        if 'expiry' in cookie:
+            cookie['expiry'] = int(cookie['expiry'])
+        try:
+            driver.add_cookie(cookie)
+        except Exception:
+            continue
+    driver.refresh()
+    return driver
+
+
+class BrowserPool:
+    """Conjunto de sesiones de Chrome que procesan una cola de usernames.
+
+    Sin cuentas: N navegadores con la sesión del principal y un limitador común.
+    Con accounts (AccountPool): un navegador por cuenta activa, cada uno con el
+    limitador de su cuenta; login_fn se usa para iniciar sesión en cada uno.
+    """
+
+    def __init__(self, main_driver, setup_driver_fn, size=1, limiter=None, endpoint='profile',
+                 accounts=None, login_fn=None):
+        self.main_driver = main_driver
+        self.endpoint = endpoint
+        self.accounts = accounts
+
+        if accounts:
+            self.sessions = accounts.open_sessions(main_driver, setup_driver_fn, login_fn)
+            return
+
+        limiter = limiter or get_rate_limiter()
+        self.sessions = [(main_driver, limiter, None)]
+        for idx in range(1, max(1, size)):
+            try:
+                print(f"🌐 Abriendo navegador adicional {idx + 1}/{size}...")
+                self.sessions.append((clone_session(main_driver, setup_driver_fn), limiter, None))
+            except Exception as e:
+                print(f"⚠ No se pudo abrir el navegador {idx + 1}: {e}")
+                break
+
+    @property
+    def drivers(self):
+        return [driver for driver, _, _ in self.sessions]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def map(self, fn, items, on_result=None, default=0, stop=None):
+        """Aplica fn(driver, item) a cada elemento y devuelve los resultados en orden.
+
+        on_result(idx, item, result) se llama (serializado) cada vez que termina
+        un elemento, útil para mostrar progreso. Si stop() devuelve True los
+        navegadores dejan de tomar elementos y los que quedan se devuelven con
+        el valor default. Si en cambio se quedan en la cola porque se aparcaron
+        las cuentas que los tenían, se devuelven como None y sus posiciones
+        quedan en self.unvisited.
+        """
+        self.unvisited = []
+        results = [default] * len(items)
+        work = queue.Queue()
+        for idx, item in enumerate(items):
+            work.put((idx, item))
+
+        report_lock = threading.Lock()
+        metrics = get_metrics()
+
+        def worker(driver, limiter, account):
+            while True:
+                if stop and stop():
+                    return
+                try:
+                    idx, item = work.get_nowait()
+                except queue.Empty:
+                    return
+                started = time.monotonic()
+                limiter.wait(self.endpoint)
+                visit_started = time.monotonic()
+                try:
+                    result = fn(driver, item)
+                except Exception:
+                    result = default
+                record_visit(driver, item)
+                metrics.observe('phase_seconds', time.monotonic() - visit_started, phase=f"{self.endpoint}_visit")
+                metrics.incr(f"{self.endpoint}_visits", result='ok' if result else 'zero')
+                # El texto de la página solo se revisa si la visita no dio resultado
+                reason = detect_throttle(driver, check_text=not result)
+                if reason:
+                    limiter.report_throttle(self.endpoint, reason)
+                    if account and reason in PARKING_REASONS:
+                        self.accounts.park(account, reason)
+                        work.put((idx, item))
+                        return
+                else:
+                    limiter.report_success(self.endpoint)
+                if account:
+                    account.completed += 1
+                    account.busy_seconds += time.monotonic() - started
+                results[idx] = result
+                if on_result:
+                    with report_lock:
+                        on_result(idx, item, result)
+
+        threads = [threading.Thread(target=worker, args=session, daemon=True) for session in self.sessions]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if not (stop and stop()):
+            while not work.empty():
+                idx, _ = work.get_nowait()
+                results[idx] = None
+                self.unvisited.append(idx)
+            self.unvisited.sort()
+
+        return results
+
+    def close(self):
+        """Cierra los navegadores adicionales (el principal lo cierra quien lo creó)"""
+        for driver in self.drivers:
+            if driver is self.main_driver:
+                continue
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self.sessions = [session for session in self.sessions if session[0] is self.main_driver]
+
+
+def visit_profiles_with_pool(driver, followers_data, get_count_fn, setup_driver_fn,
+                             num_browsers=1, limiter=None, cache=None, on_count=None,
+                             accounts=None, login_fn=None, stop=None):
+    """Completa 'follower_count' de cada seguidor usando un pool de navegadores.
+
+    Si se pasa una caché (FollowerCountCache), cada resultado se guarda en ella.
+    on_count(username, count) se llama en cuanto se conoce cada resultado.
+    Con accounts (AccountPool) las visitas se reparten entre las cuentas activas.
+    stop() (opcional) corta las visitas en cuanto devuelve True: los perfiles
+    sin visitar se quedan con 'follower_count' 0. Los que no se pudieron visitar
+    porque se aparcaron todas las cuentas quedan con 'follower_count' None.
+    """
+    if not followers_data:
+        return followers_data
+
+    total = len(followers_data)
+    usernames = [follower['follower_username'] for follower in followers_data]
+    completed = [0]
+
+    def report(idx, username, count):
+        completed[0] += 1
+        if cache:
+            cache.put(username, count, 'selenium')
+        if on_count:
+            on_count(username, count)
+        print(f"  [{completed[0]}/{total}] @{username}: {count:,} seguidores")
+
+    with BrowserPool(driver, setup_driver_fn, num_browsers, limiter,
+                     accounts=accounts, login_fn=login_fn) as pool:
+        print(f"   Navegadores en paralelo: {len(pool.drivers)}\n")
+        counts = pool.map(get_count_fn, usernames, on_result=report, stop=stop)
+        unvisited = [usernames[idx] for idx in pool.unvisited]
+
+    skipped = total - completed[0]
+    if skipped and stop and stop():
+        get_metrics().incr('skipped_visits', skipped, endpoint='profile')
+        print(f"\n⏹ Visitas cortadas: {skipped} perfiles sin visitar")
+    if unvisited:
+        get_metrics().incr('unvisited_profiles', len(unvisited), reason='parked')
+        print(f"\n⚠ Perfiles sin visitar (todas las cuentas aparcadas): {unvisited}")
+
+    for follower, count in zip(followers_data, counts):
+        follower['follower_count'] = count
+
+    return followers_data
@@ -0,0 +1,251 @@
+"""
+Reanálisis sin conexión de los CSV de ejecuciones anteriores
+Vuelve a pasar el análisis de Benford y a generar los informes a partir de los
+datos ya extraídos, sin abrir el navegador ni visitar Instagram. Sirve para
+repuntuar perfiles antiguos cuando cambian los umbrales o las pruebas.
+
+Formatos que entiende (el perfil se toma del nombre del archivo):
+- perfil_seguidores_datos.csv: analyze_first_digits, create_benford_chart y
+  save_results_to_csv de los scripts de seguidores. Los seguidores totales del
+  perfil se leen del perfil_resumen.csv anterior, si existe.
+- perfil_datos_raw.csv (extraer_benford.py) y perfil_posts_selenium.csv
+  (extraer_instagram_selenium.py): generate_benford_report de extraer_benford.py.
+  Si un perfil tiene los dos, se usa datos_raw.
+
+Se le pueden pasar archivos o directorios; los archivos de un directorio se
+reparten entre un pool de procesos. Los informes se escriben junto a cada CSV
+(o en --salida), la salida de cada perfil va a reanalisis_logs/ y al terminar
+queda un resumen consolidado en resumen_reanalisis.csv.
+
+Uso:
+    python reanalisis.py datos/ [otro.csv ...] [--workers 8] [--salida informes/] [--sin-graficos]
+"""
+
+import argparse
+import contextlib
+import csv
+import importlib
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pool_navegadores import NOT_VISITED
+from valores_criticos import get_critical_values
+
+# Sufijo del archivo -> tipo de datos
+SOURCES = {
+    '_seguidores_datos.csv': 'seguidores',
+    '_datos_raw.csv': 'posts',
+    '_posts_selenium.csv': 'posts',
+}
+# Script de seguidores según el resumen anterior (solo el de BeautifulSoup escribe el método)
+FOLLOWERS_MODULES = {
+    True: 'analisis_seguidores_beautifulsoup',
+    False: 'analisis_seguidores_benford',
+}
+POSTS_MODULE = 'extraer_benford'
+INT_FIELDS = ('post_number', 'likes', 'comments', 'caption_length', 'video_views')
+
+LOGS_DIR = "reanalisis_logs"
+SUMMARY_FILE = "resumen_reanalisis.csv"
+
+
+def _to_int(value):
+    try:
+        return int(str(value).replace(',', '').strip())
+    except ValueError:
+        return 0
+
+
+def find_datasets(paths):
+    """Busca los CSV reanalizables; devuelve [{'perfil', 'tipo', 'archivo'}] en orden"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path)))
+        else:
+            files.append(path)
+
+    datasets = {}
+    for path in files:
+        name = os.path.basename(path)
+        for suffix, kind in SOURCES.items():
+            if name.endswith(suffix) and len(name) > len(suffix):
+                key = (os.path.dirname(os.path.abspath(path)), name[:-len(suffix)], kind)
+                # datos_raw tiene prioridad sobre posts_selenium: los dos escriben los mismos informes
+                if key not in datasets or suffix == '_datos_raw.csv':
+                    datasets[key] = {'perfil': key[1], 'tipo': kind, 'archivo': os.path.abspath(path)}
+                break
+    return list(datasets.values())
+
+
+def read_summary_rows(path):
+    """Filas 'etiqueta, valor' de un perfil_resumen.csv ({} si no existe)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return {row[0]: row[1] for row in csv.reader(f) if len(row) >= 2}
+
+
+def load_followers(path):
+    """Lee perfil_seguidores_datos.csv con el formato de save_results_to_csv"""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        # Los perfiles que no se pudieron visitar se mantienen como tales (None)
+        return [{'follower_username': row['Username del Seguidor'],
+                 'follower_count': (None if row['Número de Seguidores'] == NOT_VISITED
+                                    else _to_int(row['Número de Seguidores']))}
+                for row in csv.DictReader(f)]
+
+
+def load_posts(path):
+    """Lee perfil_datos_raw.csv o perfil_posts_selenium.csv con los tipos originales"""
+    posts = []
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            for field in INT_FIELDS:
+                # video_views vacío significa que el post no es un vídeo; se deja tal cual
+                if field in row and row[field] != '':
+                    row[field] = _to_int(row[field])
+            if 'is_video' in row:
+                row['is_video'] = row['is_video'] == 'True'
+            posts.append(row)
+    return posts
+
+
+def reanalyze_followers(path, profile, charts=True):
+    summary_rows = read_summary_rows(path[:-len('_seguidores_datos.csv')] + '_resumen.csv')
+    module = importlib.import_module(FOLLOWERS_MODULES['Método de extracción:' in summary_rows])
+    profile_followers = _to_int(summary_rows.get('Seguidores totales del perfil:', 0))
+
+    followers_data = load_followers(path)
+    if not followers_data:
+        raise ValueError("El archivo no tiene seguidores")
+
+    analysis = module.analyze_first_digits(followers_data)
+    if charts:
+        module.create_benford_chart(analysis, profile)
+    module.save_results_to_csv(profile, profile_followers, followers_data, analysis)
+    return {
+        'profile_followers': profile_followers,
+        'followers_analyzed': len(followers_data),
+        'avg_deviation': analysis['avg_deviation'] if analysis else None,
+        'p_value': analysis['p_value'] if analysis else None,
+        'verdict': analysis['verdict'] if analysis else None,
+    }
+
+
+def reanalyze_posts(path, profile):
+    posts_data = load_posts(path)
+    if not posts_data:
+        raise ValueError("El archivo no tiene posts")
+    return importlib.import_module(POSTS_MODULE).generate_benford_report(posts_data, profile)
+
+
+def _run_dataset(dataset, output_dir, charts, logs_dir):
+    """Reanaliza un archivo en un proceso del pool (debe ser una función de módulo)"""
+    # extraer_benford crea su carpeta de depuración al importarse: mejor en el directorio de trabajo
+    if dataset['tipo'] == 'posts':
+        importlib.import_module(POSTS_MODULE)
+
+    os.makedirs(logs_dir, exist_ok=True)
+    log_path = os.path.join(logs_dir, f"{dataset['tipo']}_{dataset['perfil']}.log")
+    started = time.time()
+    previous_dir = os.getcwd()
+    with open(log_path, "a", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        print(f"\n===== {time.strftime('%Y-%m-%d %H:%M:%S')} @{dataset['perfil']} ({dataset['archivo']}) =====")
+        try:
+            target = output_dir or os.path.dirname(dataset['archivo'])
+            os.makedirs(target, exist_ok=True)
+            os.chdir(target)
+            if dataset['tipo'] == 'seguidores':
+                summary = reanalyze_followers(dataset['archivo'], dataset['perfil'], charts)
+            else:
+                summary = reanalyze_posts(dataset['archivo'], dataset['perfil'])
+            return {'estado': 'ok', 'resumen': summary or {}, 'duracion_s': time.time() - started, 'error': ''}
+        except Exception as e:
+            traceback.print_exc()
+            return {'estado': 'error', 'resumen': {}, 'duracion_s': time.time() - started, 'error': str(e)}
+        finally:
+            os.chdir(previous_dir)
+
+
+def write_summary(results, path=SUMMARY_FILE):
+    """Escribe el resumen consolidado de todos los archivos reanalizados"""
+    if not results:
+        return
+    base = ['perfil', 'tipo', 'archivo', 'estado', 'duracion_s', 'error']
+    extra = []
+    for result in results:
+        for key in result['resumen']:
+            if key not in extra:
+                extra.append(key)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=base + extra)
+        writer.writeheader()
+        for result in results:
+            row = {key: result[key] for key in base}
+            row['duracion_s'] = f"{result['duracion_s']:.2f}"
+            row.update(result['resumen'])
+            writer.writerow(row)
+
+
+def reanalyze_all(datasets, workers=None, output_dir=None, charts=True, logs_dir=LOGS_DIR):
+    """Reanaliza los archivos repartiéndolos entre 'workers' procesos"""
+    # La tabla de valores críticos se genera aquí una sola vez, no en cada proceso
+    get_critical_values()
+    output_dir = os.path.abspath(output_dir) if output_dir else None
+    logs_dir = os.path.abspath(logs_dir)
+
+    results = []
+    started = time.time()
+    print(f"📋 Reanálisis: {len(datasets)} archivos | {workers or os.cpu_count()} procesos")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_run_dataset, dataset, output_dir, charts, logs_dir): dataset
+                   for dataset in datasets}
+        for done, future in enumerate(as_completed(futures), 1):
+            dataset = futures[future]
+            try:
+                outcome = future.result()
+            except Exception as e:  # el proceso murió
+                outcome = {'estado': 'error', 'resumen': {}, 'duracion_s': 0.0, 'error': str(e)}
+            icon = '✓' if outcome['estado'] == 'ok' else '❌'
+            print(f"  {icon} [{done}/{len(datasets)}] @{dataset['perfil']} ({dataset['tipo']})")
+            results.append({**dataset, **outcome})
+
+    print(f"⏱ {len(datasets)} archivos en {time.time() - started:.1f}s")
+    return results
+
+
+def print_results(results):
+    print("\n" + "="*70)
+    print("📋 RESUMEN DEL REANÁLISIS")
+    print("="*70)
+    for result in sorted(results, key=lambda r: (r['tipo'], r['perfil'])):
+        detail = result['resumen'].get('verdict') or result['resumen'].get('conclusion') or result['error']
+        print(f"{'✓' if result['estado'] == 'ok' else '❌'} @{result['perfil']:<25} {result['tipo']:<12} {detail}")
+    ok = sum(1 for result in results if result['estado'] == 'ok')
+    print(f"\n✓ {ok}/{len(results)} archivos reanalizados | resumen en {SUMMARY_FILE} | logs en {LOGS_DIR}/")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('rutas', nargs='+', help='Archivos CSV o directorios con CSV de ejecuciones anteriores')
+    parser.add_argument('--workers', type=int, default=None, help='Procesos a la vez (por defecto, uno por CPU)')
+    parser.add_argument('--salida', help='Directorio de los informes (por defecto, el de cada CSV)')
+    parser.add_argument('--sin-graficos', action='store_true', help='No regenerar los gráficos (mucho más rápido)')
+    args = parser.parse_args()
+
+    datasets = find_datasets(args.rutas)
+    if not datasets:
+        print("❌ No se encontraron archivos *_seguidores_datos.csv, *_datos_raw.csv ni *_posts_selenium.csv")
+        return
+
+    results = reanalyze_all(datasets, args.workers and max(1, args.workers), args.salida, not args.sin_graficos)
+    write_summary(results)
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
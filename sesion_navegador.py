@@ -0,0 +1,112 @@
+"""
+Arranque rápido del navegador: chromedriver en caché y sesión de Instagram persistida
+ChromeDriverManager().install() consulta por red la versión de Chrome en cada
+ejecución; aquí la ruta del driver se guarda en un archivo y solo se vuelve a
+instalar si falla al arrancar. Tras un login correcto se guardan las cookies y
+el localStorage; en la siguiente ejecución se restauran y solo se hace login
+de nuevo si la sesión ya no es válida.
+"""
+
+import json
+import os
+import time
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+
+INSTAGRAM_URL = "https://www.instagram.com/"
+DRIVER_PATH_FILE = ".chromedriver_path"
+SESSIONS_DIR = "sesiones"
+
+
+def _install_driver():
+    from webdriver_manager.chrome import ChromeDriverManager
+    path = ChromeDriverManager().install()
+    with open(DRIVER_PATH_FILE, "w", encoding="utf-8") as f:
+        f.write(path)
+    return path
+
+
+def cached_driver_path():
+    """Ruta del chromedriver guardada de una ejecución anterior, o la instala"""
+    if os.path.exists(DRIVER_PATH_FILE):
+        with open(DRIVER_PATH_FILE, "r", encoding="utf-8") as f:
+            path = f.read().strip()
+        if path and os.path.exists(path):
+            return path
+    return _install_driver()
+
+
+def create_chrome(chrome_options):
+    """Crea el driver con el chromedriver en caché; si Chrome se actualizó, lo reinstala"""
+    try:
+        return webdriver.Chrome(service=Service(cached_driver_path()), options=chrome_options)
+    except WebDriverException:
+        print("⚠ El chromedriver en caché no es compatible con Chrome; reinstalando...")
+        return webdriver.Chrome(service=Service(_install_driver()), options=chrome_options)
+
+
+def session_path(username):
+    return os.path.join(SESSIONS_DIR, f"{username}.json")
+
+
+def save_session(driver, username):
+    """Guarda cookies y localStorage de la sesión actual"""
+    try:
+        local_storage = driver.execute_script("return Object.assign({}, window.localStorage);")
+        state = {
+            'saved_at': time.time(),
+            'cookies': driver.get_cookies(),
+            'local_storage': local_storage or {},
+        }
+        os.makedirs(SESSIONS_DIR, exist_ok=True)
+        with open(session_path(username), "w", encoding="utf-8") as f:
+            json.dump(state, f)
+    except Exception as e:
+        print(f"⚠ No se pudo guardar la sesión: {e}")
+
+
+def _session_is_valid(driver):
+    if '/accounts/login' in driver.current_url or '/challenge' in driver.current_url:
+        return False
+    if not any(cookie['name'] == 'sessionid' for cookie in driver.get_cookies()):
+        return False
+    return not driver.execute_script("return !!document.querySelector(\"input[name='username']\");")
+
+
+def restore_session(driver, username):
+    """Restaura la sesión guardada de 'username'; devuelve True si sigue siendo válida"""
+    path = session_path(username)
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    now = time.time()
+    cookies = [c for c in state.get('cookies', []) if c.get('expiry', now + 1) > now]
+    if not any(cookie['name'] == 'sessionid' for cookie in cookies):
+        return False
+
+    try:
+        # Hay que estar en el dominio antes de poder añadir sus cookies
+        driver.get(INSTAGRAM_URL)
+        for cookie in cookies:
+            cookie.pop('sameSite', None)
+            if 'expiry' in cookie:
+                cookie['expiry'] = int(cookie['expiry'])
+            try:
+                driver.add_cookie(cookie)
+            except Exception:
+                continue
+        driver.execute_script(
+            "for (const [k, v] of Object.entries(arguments[0])) window.localStorage.setItem(k, v);",
+            state.get('local_storage', {})
+        )
+        driver.refresh()
+        return _session_is_valid(driver)
+    except Exception:
+        return False
@@ -0,0 +1,250 @@
+"""
+Valores críticos de Benford calibrados por Monte Carlo
+Con pocas muestras (45 números válidos es habitual) una desviación del 5% puede
+ser puro azar, y con miles de muestras un 2% ya es mucho. En vez de umbrales
+fijos, el veredicto se da con el p-valor de la desviación (MAD) o del
+chi-cuadrado para el tamaño de muestra real: la probabilidad de ver una
+desviación igual o mayor si los números siguieran Benford de verdad.
+
+Las distribuciones de MAD y chi-cuadrado bajo Benford se simulan una vez para
+cada prueba (first, second, first_two, last_two) y cada tamaño de SAMPLE_SIZES
+(10.000 réplicas por tamaño, todas a la vez con NumPy; unos segundos en total)
+y se guardan como tabla de cuantiles en valores_criticos_benford.npz. Después
+se cargan al instante. Los tamaños que no están en la tabla se simulan en el
+momento hasta ON_DEMAND_MAX y, por encima, se interpolan (la MAD escala con
+1/raíz(n) y el chi-cuadrado apenas cambia).
+
+Uso:
+    python valores_criticos.py [--regenerar] [--prueba first] [--estadistico mad]
+"""
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from motor_benford import EXPECTED, TEST_NAMES, TESTS
+
+CRITICAL_VALUES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "valores_criticos_benford.npz")
+REPLICATES = 10000
+LEVELS = np.linspace(0, 1, 1001)
+SAMPLE_SIZES = np.unique(np.concatenate([
+    np.arange(5, 31), np.arange(35, 101, 5),
+    [120, 150, 200, 300, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000],
+]))
+# Por debajo de este tamaño, si n no está en la tabla se simula exactamente ese n
+ON_DEMAND_MAX = 1000
+# Hasta este número de dígitos sorteados se simula dígito a dígito; por encima, con multinomial
+SAMPLING_LIMIT = 3_000_000
+STATISTICS = ('mad', 'chi_squared')
+
+VERDICTS = ("REAL", "PROBABLEMENTE REAL", "SOSPECHOSO", "ALTA PROBABILIDAD DE BOTS")
+# p-valor mínimo de cada veredicto: REAL si p >= 0.10, PROBABLEMENTE REAL si p >= 0.05...
+P_VALUE_CUTOFFS = (0.10, 0.05, 0.01)
+
+
+def verdict_for_p_value(p_value, cutoffs=P_VALUE_CUTOFFS):
+    """Veredicto según el p-valor de la desviación"""
+    for verdict, cutoff in zip(VERDICTS, cutoffs):
+        if p_value >= cutoff:
+            return verdict
+    return VERDICTS[-1]
+
+
+def alias_table(probs):
+    """Tabla de alias de Walker: sortear una categoría cuesta un entero y un uniforme"""
+    size = len(probs)
+    scaled = np.asarray(probs, dtype=np.float64) * size / np.sum(probs)
+    alias = np.zeros(size, dtype=np.int64)
+    small = [i for i in range(size) if scaled[i] < 1]
+    large = [i for i in range(size) if scaled[i] >= 1]
+    while small and large:
+        low, high = small.pop(), large.pop()
+        alias[low] = high
+        scaled[high] -= 1 - scaled[low]
+        (small if scaled[high] < 1 else large).append(high)
+    for idx in small + large:
+        scaled[idx] = 1.0
+    return scaled, alias
+
+
+def null_counts(test, n, replicates, rng):
+    """Matriz (réplicas x dígitos) de conteos de n números que siguen Benford"""
+    probs = EXPECTED[test][1] / EXPECTED[test][1].sum()
+    size = len(probs)
+    if n * replicates > SAMPLING_LIMIT:
+        return rng.multinomial(n, probs, size=replicates)
+    accept, alias = alias_table(probs)
+    columns = rng.integers(0, size, (replicates, n))
+    digits = np.where(rng.random((replicates, n)) < accept[columns], columns, alias[columns])
+    # Un único bincount para todas las réplicas: cada fila usa su propio bloque de 'size' casillas
+    digits += np.arange(replicates)[:, None] * size
+    return np.bincount(digits.ravel(), minlength=replicates * size).reshape(replicates, size)
+
+
+def null_statistics(test, n, replicates=REPLICATES, rng=None):
+    """MAD y chi-cuadrado de 'replicates' muestras de tamaño n bajo Benford"""
+    rng = rng or np.random.default_rng()
+    expected = EXPECTED[test][1]
+    counts = null_counts(test, n, replicates, rng).astype(np.float64)
+    mad = np.abs(counts / n - expected).mean(axis=1)
+    # sum((c - np)^2 / np) = sum(c^2 / np) - n
+    chi_squared = (counts * counts) @ (1 / expected) / n - n
+    return {'mad': mad, 'chi_squared': chi_squared}
+
+
+def _quantile_rows(test, n, replicates, rng):
+    stats = null_statistics(test, n, replicates, rng)
+    # La MAD se guarda multiplicada por raíz(n) para poder interpolar entre tamaños
+    return {'mad': np.quantile(stats['mad'], LEVELS) * np.sqrt(n),
+            'chi_squared': np.quantile(stats['chi_squared'], LEVELS)}
+
+
+def build_tables(sizes=SAMPLE_SIZES, replicates=REPLICATES, seed=0):
+    """Cuantiles de MAD y chi-cuadrado bajo Benford: {(prueba, estadístico): tamaños x LEVELS}"""
+    rng = np.random.default_rng(seed)
+    tables = {(test, stat): np.empty((len(sizes), len(LEVELS))) for test in TESTS for stat in STATISTICS}
+    for test in TESTS:
+        for row, n in enumerate(sizes):
+            for stat, quantiles in _quantile_rows(test, int(n), replicates, rng).items():
+                tables[(test, stat)][row] = quantiles
+    return tables
+
+
+class CriticalValues:
+    """Tabla de cuantiles bajo Benford con p-valores y valores críticos por tamaño de muestra"""
+
+    def __init__(self, tables, sizes=SAMPLE_SIZES, replicates=REPLICATES, seed=0):
+        self.tables = tables
+        self.sizes = np.asarray(sizes)
+        self.replicates = replicates
+        self.seed = seed
+        self._on_demand = {}
+
+    @classmethod
+    def build(cls, sizes=SAMPLE_SIZES, replicates=REPLICATES, seed=0):
+        return cls(build_tables(sizes, replicates, seed), sizes, replicates, seed)
+
+    @classmethod
+    def load(cls, path=CRITICAL_VALUES_PATH):
+        with np.load(path) as data:
+            tables = {(test, stat): data[f"{test}__{stat}"] for test in TESTS for stat in STATISTICS}
+            return cls(tables, data['sizes'], int(data['replicates']), int(data['seed']))
+
+    def save(self, path=CRITICAL_VALUES_PATH):
+        """Guarda la tabla de forma atómica (varios procesos del lote pueden generarla a la vez)"""
+        arrays = {f"{test}__{stat}": table for (test, stat), table in self.tables.items()}
+        # Un temporal propio por proceso en el mismo directorio, para que os.replace sea atómico
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(path)), suffix='.npz',
+                                         delete=False) as tmp:
+            try:
+                np.savez_compressed(tmp, sizes=self.sizes, replicates=self.replicates, seed=self.seed, **arrays)
+            except BaseException:
+                tmp.close()
+                os.remove(tmp.name)
+                raise
+        os.replace(tmp.name, path)
+
+    def quantiles(self, test, statistic, n):
+        """Cuantiles (en LEVELS) del estadístico bajo Benford para muestras de tamaño n"""
+        n = max(int(n), 1)
+        row = np.searchsorted(self.sizes, n)
+        if row < len(self.sizes) and self.sizes[row] == n:
+            scaled = self.tables[(test, statistic)][row]
+        elif n <= ON_DEMAND_MAX:
+            key = (test, n)
+            if key not in self._on_demand:
+                rng = np.random.default_rng([self.seed, n])
+                self._on_demand[key] = _quantile_rows(test, n, self.replicates, rng)
+            scaled = self._on_demand[key][statistic]
+        else:
+            # Interpolación lineal en log(n) entre los dos tamaños vecinos (fuera de la tabla, el extremo)
+            log_sizes = np.log(self.sizes)
+            position = np.interp(np.log(n), log_sizes, np.arange(len(self.sizes)))
+            low = int(np.floor(position))
+            high = min(low + 1, len(self.sizes) - 1)
+            weight = position - low
+            table = self.tables[(test, statistic)]
+            scaled = table[low] * (1 - weight) + table[high] * weight
+        return scaled / np.sqrt(n) if statistic == 'mad' else scaled
+
+    def p_value(self, test, statistic, value, n):
+        """Probabilidad de un valor igual o mayor si los datos siguieran Benford"""
+        quantiles = self.quantiles(test, statistic, n)
+        # Margen para que un valor igual al simulado (estadísticos discretos) cuente como empate
+        below = np.searchsorted(quantiles, value - 1e-12, side='left')
+        return float(max(1 - below / len(quantiles), 1 / (self.replicates + 1)))
+
+    def p_values(self, test, statistic, values, sizes):
+        """p_value() de arrays de valores y tamaños (p. ej. réplicas bootstrap); tamaño 0 da 1"""
+        values = np.asarray(values, dtype=np.float64)
+        sizes = np.asarray(sizes)
+        result = np.ones(len(values))
+        for n in np.unique(sizes[sizes > 0]):
+            rows = sizes == n
+            quantiles = self.quantiles(test, statistic, n)
+            below = np.searchsorted(quantiles, values[rows] - 1e-12, side='left')
+            result[rows] = np.maximum(1 - below / len(quantiles), 1 / (self.replicates + 1))
+        return result
+
+    def critical_value(self, test, statistic, n, alpha=0.05):
+        """Valor a partir del cual el estadístico es significativo al nivel alpha"""
+        return float(np.interp(1 - alpha, LEVELS, self.quantiles(test, statistic, n)))
+
+    def add_p_values(self, results):
+        """Añade 'mad_p_value' y 'chi_squared_p_value' a cada prueba de benford_tests()"""
+        for test, stats in results.items():
+            for statistic in STATISTICS:
+                stats[f"{statistic}_p_value"] = (self.p_value(test, statistic, stats[statistic], stats['total'])
+                                                 if stats['total'] else 1.0)
+        return results
+
+
+_critical_values = None
+
+
+def get_critical_values(path=CRITICAL_VALUES_PATH):
+    """Tabla de valores críticos: se carga del disco o se genera (y guarda) la primera vez"""
+    global _critical_values
+    if _critical_values is not None:
+        return _critical_values
+    try:
+        critical_values = CriticalValues.load(path)
+        if not np.array_equal(critical_values.sizes, SAMPLE_SIZES) or critical_values.replicates != REPLICATES:
+            critical_values = None
+    except (OSError, KeyError, ValueError):
+        critical_values = None
+    if critical_values is None:
+        print("🎲 Generando tabla de valores críticos de Benford (solo la primera vez)...")
+        critical_values = CriticalValues.build()
+        try:
+            critical_values.save(path)
+        except OSError as e:
+            print(f"⚠ No se pudo guardar la tabla de valores críticos: {e}")
+    _critical_values = critical_values
+    return critical_values
+
+
+def print_critical_table(critical_values, test, statistic, sizes=(10, 20, 45, 100, 200, 500, 1000, 5000, 100000),
+                         alphas=(0.10, 0.05, 0.01)):
+    print(f"\n{TEST_NAMES[test]} - {statistic} (valores críticos)")
+    print(f"{'n':>8} " + " ".join(f"{f'alpha={alpha}':>12}" for alpha in alphas))
+    for n in sizes:
+        values = [critical_values.critical_value(test, statistic, n, alpha) for alpha in alphas]
+        print(f"{n:>8} " + " ".join(f"{value:>12.4f}" for value in values))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--regenerar', action='store_true', help='Volver a simular la tabla aunque exista')
+    parser.add_argument('--prueba', choices=TESTS, help='Mostrar solo esta prueba')
+    parser.add_argument('--estadistico', choices=STATISTICS, help='Mostrar solo este estadístico')
+    args = parser.parse_args()
+
+    if args.regenerar and os.path.exists(CRITICAL_VALUES_PATH):
+        os.remove(CRITICAL_VALUES_PATH)
+    table = get_critical_values()
+    for test in [args.prueba] if args.prueba else TESTS:
+        for statistic in [args.estadistico] if args.estadistico else STATISTICS:
+            print_critical_table(table, test, statistic)